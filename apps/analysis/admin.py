@@ -3,7 +3,52 @@ from django.contrib import admin
 from django.db import models
 from django.forms import widgets
 
-from apps.analysis.models import PortalEvent
+from apps.analysis.models import AnalysisFact, AnalysisJob, PortalEvent
+
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ("finished_at", "filename", "owner", "paragraphs", "events_found")
+    list_filter = ("finished_at",)
+    search_fields = ("filename", "owner")
+    date_hierarchy = "finished_at"
+    readonly_fields = (
+        "id",
+        "owner",
+        "filename",
+        "paragraphs",
+        "events_found",
+        "metrics",
+        "finished_at",
+    )
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+
+@admin.register(AnalysisFact)
+class AnalysisFactAdmin(admin.ModelAdmin):
+    list_display = (
+        "analyzed_on",
+        "subdivision",
+        "event_type",
+        "event_found",
+        "has_mismatch",
+        "timestamp_status",
+        "subdivision_status",
+        "offenders_status",
+    )
+    list_filter = ("analyzed_on", "event_found", "has_mismatch", "event_type_status")
+    search_fields = ("subdivision", "event_type")
+    date_hierarchy = "analyzed_on"
+    list_select_related = False
+    show_full_result_count = False
+
+    def has_add_permission(self, request) -> bool:
+        return False
+
+    def has_change_permission(self, request, obj=None) -> bool:
+        return False
 
 
 if getattr(settings, "PORTAL_ADMIN_ENABLED", False):
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from functools import partial, wraps
+from itertools import chain
+import json
+import logging
+import uuid
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.urls import reverse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods
+
+from apps.analysis.jobs import (
+    cancel_job,
+    check_upload_format,
+    enqueue_file,
+    submit_paragraphs,
+)
+from apps.analysis.services.history import load_job_data
+from apps.analysis.services.ingest import SNIFF_BYTES, UnsupportedFormatError, detect_format
+from apps.analysis.services.result_store import SUBMISSION_PENDING, ResultStore
+from apps.analysis.services.scheduling import JobScheduler
+from apps.analysis.services.staging import UploadStaging, UploadTooLargeError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# All API clients share one token, so they share one per-user running limit.
+API_JOB_OWNER = "api"
+
+
+def _error(status: int, message: str) -> JsonResponse:
+    return JsonResponse({"error": message}, status=status, json_dumps_params={"ensure_ascii": False})
+
+
+def api_token_required(view: Callable[..., HttpResponse]) -> Callable[..., HttpResponse]:
+    @wraps(view)
+    def wrapped(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        token = settings.API_TOKEN
+        if not token:
+            return _error(403, "API отключён: не задан API_TOKEN.")
+        if request.headers.get("Authorization") != f"Bearer {token}":
+            return _error(401, "Неверный или отсутствующий токен.")
+        return view(request, *args, **kwargs)
+
+    return csrf_exempt(wrapped)
+
+
+def _job_links(job_id: str) -> dict[str, str]:
+    return {
+        "status_url": reverse("api_job_detail", kwargs={"job_id": job_id}),
+        "items_url": reverse("api_job_items", kwargs={"job_id": job_id}),
+    }
+
+
+def _documents(request: HttpRequest) -> list[tuple[str, list[str]]] | None:
+    """(filename, paragraphs) from a JSON body, or None if the body is not valid."""
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    documents = payload.get("documents")
+    if documents is None and "paragraphs" in payload:
+        documents = [payload]
+    if not isinstance(documents, list):
+        return None
+    parsed = []
+    for index, document in enumerate(documents, start=1):
+        paragraphs = document.get("paragraphs") if isinstance(document, dict) else None
+        if not isinstance(paragraphs, list) or not all(isinstance(p, str) for p in paragraphs):
+            return None
+        parsed.append((str(document.get("filename") or f"document_{index}"), paragraphs))
+    return parsed
+
+
+def _uploads(request: HttpRequest) -> list[tuple[str, bytes, Iterable[bytes], int | None]]:
+    """(filename, head, chunks, size) per submitted file, multipart or raw body.
+
+    The raw body is streamed from the request in chunks rather than loaded whole;
+    ``head`` holds its first bytes for format sniffing and is replayed in ``chunks``.
+    """
+    if request.content_type == "multipart/form-data":
+        uploads = []
+        for field in request.FILES:
+            for upload in request.FILES.getlist(field):
+                head = upload.read(SNIFF_BYTES)
+                upload.seek(0)
+                uploads.append((upload.name, head, upload.chunks(), upload.size))
+        return uploads
+    head = request.read(SNIFF_BYTES)
+    if not head:
+        return []
+    filename = request.headers.get("X-Filename") or "upload"
+    content_length = request.headers.get("Content-Length")
+    size = int(content_length) if content_length and content_length.isdigit() else None
+    rest = iter(partial(request.read, UPLOAD_CHUNK_BYTES), b"")
+    return [(filename, head, chain((head,), rest), size)]
+
+
+def _unsupported(filename: str) -> str:
+    return f"Файл {filename}: ожидается DOCX, RTF или TXT."
+
+
+def _cancel_queued(job_ids: list[str]) -> None:
+    for job_id in job_ids:
+        try:
+            cancel_job(job_id)
+        except Exception:
+            logger.exception("Could not cancel job %s of a failed API submission", job_id)
+
+
+def _submit_documents(jobs: list[dict[str, str]], documents: list[tuple[str, list[str]]]) -> None:
+    queued: list[str] = []
+    try:
+        for job, (_filename, paragraphs) in zip(jobs, documents):
+            submit_paragraphs(
+                paragraphs, job_id=job["job_id"], owner=API_JOB_OWNER, filename=job["filename"]
+            )
+            queued.append(job["job_id"])
+    except BaseException:
+        _cancel_queued(queued)
+        raise
+
+
+def _submit_uploads(
+    jobs: list[dict[str, str]], uploads: list[tuple[str, bytes, Iterable[bytes], int | None]]
+) -> None:
+    """Stage every file before queueing any, so a rejected file leaves no job behind.
+
+    If queueing fails part way, the jobs already queued are cancelled and the rest of
+    the staged files discarded: a request either queues all its files or none.
+    """
+    staging = UploadStaging()
+    refs: list[str] = []
+    queued: list[str] = []
+    try:
+        for job, (filename, _head, chunks, size) in zip(jobs, uploads):
+            try:
+                refs.append(staging.stage(job["job_id"], chunks, size=size))
+            except UploadTooLargeError as exc:
+                # Only reachable for bodies sent without Content-Length.
+                raise UploadTooLargeError(f"Файл {filename}: {exc}") from exc
+        for (filename, _head, _chunks, _size), ref in zip(uploads, refs):
+            try:
+                check_upload_format(ref)
+            except UnsupportedFormatError as exc:
+                raise UnsupportedFormatError(_unsupported(filename)) from exc
+        for job, ref in zip(jobs, refs):
+            enqueue_file(job["job_id"], ref, owner=API_JOB_OWNER, filename=job["filename"])
+            queued.append(job["job_id"])
+    except BaseException:
+        _cancel_queued(queued)
+        for ref in refs[len(queued) :]:
+            staging.discard(ref)
+        raise
+
+
+@api_token_required
+@require_http_methods(["POST"])
+def jobs_view(request: HttpRequest) -> HttpResponse:
+    idempotency_key = request.headers.get("Idempotency-Key", "").strip()
+    store = ResultStore()
+    if idempotency_key:
+        previous = store.get_submission(idempotency_key)
+        if previous is not None and previous != SUBMISSION_PENDING:
+            return JsonResponse(previous, status=200, headers={"Idempotent-Replayed": "true"})
+
+    documents = uploads = None
+    if request.content_type == "application/json":
+        documents = _documents(request)
+        if documents is None:
+            return _error(400, "Ожидается JSON вида {\"documents\": [{\"paragraphs\": [...]}]}.")
+        filenames = [filename for filename, _paragraphs in documents]
+    else:
+        uploads = _uploads(request)
+        if len(uploads) > settings.API_MAX_FILES_PER_REQUEST:
+            return _error(400, f"Не более {settings.API_MAX_FILES_PER_REQUEST} файлов за запрос.")
+        staging = UploadStaging()
+        for filename, head, _chunks, size in uploads:
+            if detect_format(head) is None:
+                return _error(415, _unsupported(filename))
+            try:
+                staging.check_size(size)
+            except UploadTooLargeError as exc:
+                return _error(413, f"Файл {filename}: {exc}")
+        filenames = [filename for filename, _head, _chunks, _size in uploads]
+    if not filenames:
+        return _error(400, "Файлы не переданы.")
+    if len(filenames) > settings.API_MAX_FILES_PER_REQUEST:
+        return _error(400, f"Не более {settings.API_MAX_FILES_PER_REQUEST} файлов за запрос.")
+
+    jobs = [{"job_id": str(uuid.uuid4()), "filename": filename} for filename in filenames]
+    response = {"jobs": [{**job, **_job_links(job["job_id"])} for job in jobs]}
+    if idempotency_key:
+        previous = store.claim_submission(idempotency_key)
+        if previous == SUBMISSION_PENDING:
+            return _error(409, "Запрос с этим Idempotency-Key ещё обрабатывается.")
+        if previous is not None:
+            return JsonResponse(previous, status=200, headers={"Idempotent-Replayed": "true"})
+    try:
+        if documents is not None:
+            _submit_documents(jobs, documents)
+        else:
+            _submit_uploads(jobs, uploads)
+    except BaseException as exc:
+        # Nothing was queued, so a retry with the same key must submit again.
+        if idempotency_key:
+            store.release_submission(idempotency_key)
+        if isinstance(exc, UploadTooLargeError):
+            return _error(413, str(exc))
+        if isinstance(exc, UnsupportedFormatError):
+            return _error(415, str(exc))
+        raise
+    if idempotency_key:
+        store.remember_submission(idempotency_key, response)
+    return JsonResponse(response, status=202, json_dumps_params={"ensure_ascii": False})
+
+
+@api_token_required
+@require_http_methods(["GET", "DELETE"])
+def job_detail_view(request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
+    store = ResultStore()
+    data = load_job_data(store, str(job_id))
+    if data["status"] is None:
+        return _error(404, "Задача не найдена или результат истёк.")
+    if request.method == "DELETE":
+        cancel_job(str(job_id))
+        return JsonResponse({"job_id": str(job_id), "status": "cancelled"})
+    result = data["result"] or {}
+    return JsonResponse(
+        {
+            "job_id": str(job_id),
+            "status": data["status"],
+            "progress": data["progress"],
+            "queue": JobScheduler(store).queue_info(str(job_id)),
+            "items_count": len(result.get("items", [])) if data["result"] else None,
+            "metrics": result.get("metrics"),
+            **_job_links(str(job_id)),
+        },
+        json_dumps_params={"ensure_ascii": False},
+    )
+
+
+def _positive_int(value: str | None, default: int) -> int | None:
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        return None
+    return number if number > 0 else None
+
+
+@api_token_required
+@require_http_methods(["GET"])
+def job_items_view(request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
+    page = _positive_int(request.GET.get("page"), 1)
+    page_size = _positive_int(request.GET.get("page_size"), DEFAULT_PAGE_SIZE)
+    if page is None or page_size is None:
+        return _error(400, "page и page_size должны быть положительными целыми.")
+    page_size = min(page_size, MAX_PAGE_SIZE)
+
+    data = load_job_data(ResultStore(), str(job_id))
+    if data["status"] is None:
+        return _error(404, "Задача не найдена или результат истёк.")
+    if data["result"] is None:
+        return _error(409, f"Задача ещё не завершена: {data['status']}.")
+
+    items = data["result"].get("items", [])
+    num_pages = max((len(items) + page_size - 1) // page_size, 1)
+    start = (page - 1) * page_size
+    base_url = reverse("api_job_items", kwargs={"job_id": job_id})
+    return JsonResponse(
+        {
+            "job_id": str(job_id),
+            "count": len(items),
+            "page": page,
+            "page_size": page_size,
+            "num_pages": num_pages,
+            "next": f"{base_url}?page={page + 1}&page_size={page_size}"
+            if page < num_pages
+            else None,
+            "previous": f"{base_url}?page={page - 1}&page_size={page_size}" if page > 1 else None,
+            "items": items[start : start + page_size],
+        },
+        json_dumps_params={"ensure_ascii": False},
+    )
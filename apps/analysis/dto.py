@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import Callable, Iterator, Sequence
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from typing import Any
 
 
-@dataclass(frozen=True)
+def normalize_person_name(value: str) -> str:
+    cleaned = " ".join(value.lower().strip().split())
+    return cleaned.replace("ё", "е")
+
+
+@dataclass(frozen=True, slots=True)
 class Offender:
     first_name: str | None
     middle_name: str | None
@@ -13,15 +19,35 @@ class Offender:
     date_of_birth: date | None = None
     birth_year: int | None = None
     raw: str | None = None
+    # Character offsets of ``raw`` in the source paragraph, when extracted from one.
+    span: tuple[int, int] | None = field(default=None, repr=False, compare=False)
+    # Derived once at construction; compare/dedupe read these instead of re-normalizing.
+    full_name: str = field(init=False, repr=False, compare=False)
+    normalized_name: str = field(init=False, repr=False, compare=False)
+    dob: str | None = field(init=False, repr=False, compare=False)
+    key: str = field(init=False, repr=False, compare=False)
 
-    def display_name(self) -> str:
+    def __post_init__(self) -> None:
         parts = [self.last_name, self.first_name, self.middle_name]
-        name = " ".join(part for part in parts if part)
+        full_name = " ".join(part for part in parts if part)
+        normalized_name = normalize_person_name(full_name)
+        if self.date_of_birth:
+            dob = self.date_of_birth.isoformat()
+        elif self.birth_year:
+            dob = str(self.birth_year)
+        else:
+            dob = None
+        object.__setattr__(self, "full_name", full_name)
+        object.__setattr__(self, "normalized_name", normalized_name)
+        object.__setattr__(self, "dob", dob)
+        object.__setattr__(self, "key", f"{normalized_name}|{dob}" if dob else normalized_name)
+
+    def display_name(self) -> str:
         if self.date_of_birth:
-            return f"{name} ({self.date_of_birth.isoformat()})"
+            return f"{self.full_name} ({self.date_of_birth.isoformat()})"
         if self.birth_year:
-            return f"{name} ({self.birth_year})"
-        return name
+            return f"{self.full_name} ({self.birth_year})"
+        return self.full_name
 
 
 @dataclass
@@ -35,16 +61,58 @@ class ExtractedEvent:
     subdivision_name: str | None
     subdivision_similarity: float | None
     offenders: list[Offender]
+    timestamp_span: tuple[int, int] | None = None
+    subdivision_span: tuple[int, int] | None = None
 
 
-@dataclass
+class LazyOffenders(Sequence[Offender]):
+    """Offender list parsed from the raw portal payload on first access."""
+
+    __slots__ = ("_payload", "_parser", "_items")
+
+    def __init__(self, payload: Any, parser: Callable[[Any], list[Offender]]) -> None:
+        self._payload = payload
+        self._parser = parser
+        self._items: list[Offender] | None = None
+
+    @property
+    def parsed(self) -> bool:
+        return self._items is not None
+
+    def _resolve(self) -> list[Offender]:
+        if self._items is None:
+            self._items = self._parser(self._payload)
+            self._payload = None
+        return self._items
+
+    def __getitem__(self, index):
+        return self._resolve()[index]
+
+    def __len__(self) -> int:
+        return len(self._resolve())
+
+    def __iter__(self) -> Iterator[Offender]:
+        return iter(self._resolve())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyOffenders):
+            other = other._resolve()
+        return self._resolve() == other
+
+    def __repr__(self) -> str:
+        if self._items is None:
+            return "LazyOffenders(<unparsed>)"
+        return f"LazyOffenders({self._items!r})"
+
+
+@dataclass(slots=True)
 class PortalEvent:
     event_id: str
     date_detection: datetime | None
     subdivision_name: str | None
     subdivision_short_name: str | None
     subdivision_full_name: str | None
-    offenders: list[Offender]
+    offenders: Sequence[Offender]
     event_type_name: str | None = None
 
 
@@ -57,6 +125,7 @@ class AttributeStatus:
     diff: dict[str, Any] | None = None
     timestamp_delta_minutes: int | None = None
     timestamp_delta_human: str | None = None
+    time_missing: bool = False
 
 
 @dataclass
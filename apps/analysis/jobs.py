@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+import logging
+import uuid
+
+from kombu.exceptions import KombuError
+
+from apps.analysis.services.history import JobHistory, persistence_enabled
+from apps.analysis.services.ingest import detect_upload
+from apps.analysis.services.scheduling import SMALL_QUEUE, JobScheduler, queue_for
+from apps.analysis.services.staging import UploadStaging
+from apps.analysis.tasks import analyze_docx, analyze_paragraphs
+
+logger = logging.getLogger(__name__)
+
+
+def stage_upload(job_id: str, chunks: Iterable[bytes], size: int | None = None) -> str:
+    return UploadStaging().stage(job_id, chunks, size=size)
+
+
+def check_upload_format(upload_ref: str) -> None:
+    """Raise ``UnsupportedFormatError`` unless the staged upload is DOCX, RTF or TXT."""
+    with UploadStaging().open(upload_ref) as source:
+        detect_upload(source)
+
+
+def submit_file(
+    chunks: Iterable[bytes],
+    job_id: str | None = None,
+    size: int | None = None,
+    owner: str | None = None,
+    filename: str | None = None,
+) -> str:
+    """Stage an uploaded DOCX/RTF/TXT file, register the job and queue ``analyze_docx``.
+
+    The paragraph count is unknown until ingest, so the job starts on the small queue.
+    Raises ``UploadTooLargeError`` if the file exceeds ``UPLOAD_MAX_BYTES`` and
+    ``UnsupportedFormatError`` if it is not DOCX, RTF or TXT.
+    """
+    job_id = job_id or str(uuid.uuid4())
+    upload_ref = stage_upload(job_id, chunks, size=size)
+    try:
+        check_upload_format(upload_ref)
+        return enqueue_file(job_id, upload_ref, owner=owner, filename=filename)
+    except BaseException:
+        UploadStaging().discard(upload_ref)
+        raise
+
+
+def enqueue_file(
+    job_id: str, upload_ref: str, owner: str | None = None, filename: str | None = None
+) -> str:
+    """Register a job for an already staged upload and queue ``analyze_docx``."""
+    scheduler = JobScheduler()
+    scheduler.store.create_job(job_id, owner=owner, filename=filename)
+    scheduler.enqueue(job_id, SMALL_QUEUE)
+    task = analyze_docx.apply_async((job_id, upload_ref), queue=SMALL_QUEUE)
+    scheduler.store.record_task(job_id, task.id)
+    return job_id
+
+
+def submit_paragraphs(
+    paragraphs: list[str],
+    job_id: str | None = None,
+    owner: str | None = None,
+    filename: str | None = None,
+) -> str:
+    job_id = job_id or str(uuid.uuid4())
+    queue = queue_for(len(paragraphs))
+    scheduler = JobScheduler()
+    scheduler.store.create_job(job_id, owner=owner, filename=filename)
+    scheduler.enqueue(job_id, queue)
+    task = analyze_paragraphs.apply_async((job_id, paragraphs), queue=queue)
+    scheduler.store.record_task(job_id, task.id)
+    return job_id
+
+
+def cancel_job(job_id: str) -> None:
+    """Cancel a job: queued tasks are revoked, a running one stops at its next chunk."""
+    scheduler = JobScheduler()
+    store = scheduler.store
+    task_id = store.task_id(job_id)
+    scheduler.dequeue(job_id)
+    store.cancel(job_id)
+    if persistence_enabled():
+        # Otherwise the next result request would restore the job from history.
+        JobHistory().delete(job_id)
+    if task_id is None:
+        return
+    try:
+        analyze_docx.app.control.revoke(task_id)
+    except (KombuError, OSError) as exc:
+        # The cancel flag alone still stops the task once it runs.
+        logger.warning("Could not revoke task %s of job %s: %s", task_id, job_id, exc)
@@ -0,0 +1,68 @@
+# Generated by Django 5.2 on 2026-10-19
+
+from django.db import migrations, models
+import django.core.serializers.json
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analysis", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PortalEvent",
+            fields=[
+                ("id", models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ("detected_at", models.DateTimeField()),
+                ("subdivision_id", models.UUIDField()),
+                ("subdivision_fullname", models.TextField()),
+                ("event_type_id", models.UUIDField(blank=True, null=True)),
+                ("event_type_name", models.TextField(blank=True, null=True)),
+                ("raw_text", models.TextField()),
+                ("offenders", models.JSONField(default=list)),
+                ("is_test", models.BooleanField(default=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "TEST/PORTAL: событие",
+                "verbose_name_plural": "TEST/PORTAL: события",
+                "db_table": "portal_events",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="AnalysisJob",
+            fields=[
+                ("id", models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ("owner", models.CharField(blank=True, db_index=True, default="", max_length=150)),
+                ("filename", models.CharField(blank=True, default="", max_length=255)),
+                ("paragraphs", models.PositiveIntegerField(default=0)),
+                ("events_found", models.PositiveIntegerField(default=0)),
+                ("metrics", models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ("finished_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "verbose_name": "Задача анализа",
+                "verbose_name_plural": "Задачи анализа",
+                "ordering": ["-finished_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="AnalysisItem",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("paragraph_index", models.PositiveIntegerField()),
+                ("data", models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ("job", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="items", to="analysis.analysisjob")),
+            ],
+            options={
+                "verbose_name": "Результат по абзацу",
+                "verbose_name_plural": "Результаты по абзацам",
+                "ordering": ["paragraph_index"],
+                "constraints": [models.UniqueConstraint(fields=("job", "paragraph_index"), name="uq_analysis_item_paragraph")],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("analysis", "0002_analysis_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AnalysisFact",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("paragraph_index", models.PositiveIntegerField()),
+                ("analyzed_on", models.DateField()),
+                ("owner", models.CharField(blank=True, default="", max_length=150)),
+                ("subdivision", models.CharField(blank=True, default="", max_length=255)),
+                ("event_type", models.CharField(blank=True, default="", max_length=512)),
+                ("event_type_status", models.CharField(blank=True, default="", max_length=20)),
+                ("event_found", models.BooleanField(default=False)),
+                ("has_mismatch", models.BooleanField(default=False)),
+                ("timestamp_status", models.CharField(blank=True, default="", max_length=1)),
+                ("subdivision_status", models.CharField(blank=True, default="", max_length=1)),
+                ("offenders_status", models.CharField(blank=True, default="", max_length=1)),
+                ("subdivision_percent", models.FloatField(blank=True, null=True)),
+                ("offenders_percent", models.FloatField(blank=True, null=True)),
+                ("time_delta_minutes", models.FloatField(blank=True, null=True)),
+                ("duplicates_count", models.PositiveIntegerField(default=0)),
+                ("job", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="facts", to="analysis.analysisjob")),
+            ],
+            options={
+                "verbose_name": "Факт анализа",
+                "verbose_name_plural": "Факты анализа",
+                "indexes": [models.Index(fields=["analyzed_on"], name="analysis_fact_day_idx"), models.Index(fields=["subdivision", "analyzed_on"], name="analysis_fact_subdiv_idx"), models.Index(fields=["event_type", "analyzed_on"], name="analysis_fact_evtype_idx")],
+            },
+        ),
+    ]
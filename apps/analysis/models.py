@@ -1,5 +1,6 @@
 import uuid
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 
 from apps.reference.models import EventType
@@ -40,3 +41,73 @@ class PortalEvent(models.Model):
 
     def __str__(self) -> str:
         return f"{self.subdivision_fullname} @ {self.detected_at}"
+
+
+class AnalysisJob(models.Model):
+    id = models.UUIDField(primary_key=True, editable=False)
+    owner = models.CharField(max_length=150, blank=True, default="", db_index=True)
+    filename = models.CharField(max_length=255, blank=True, default="")
+    paragraphs = models.PositiveIntegerField(default=0)
+    events_found = models.PositiveIntegerField(default=0)
+    metrics = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    finished_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-finished_at"]
+        verbose_name = "Задача анализа"
+        verbose_name_plural = "Задачи анализа"
+
+    def __str__(self) -> str:
+        return f"{self.filename or self.id} @ {self.finished_at:%Y-%m-%d %H:%M}"
+
+
+class AnalysisItem(models.Model):
+    job = models.ForeignKey(AnalysisJob, on_delete=models.CASCADE, related_name="items")
+    paragraph_index = models.PositiveIntegerField()
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        ordering = ["paragraph_index"]
+        verbose_name = "Результат по абзацу"
+        verbose_name_plural = "Результаты по абзацам"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["job", "paragraph_index"], name="uq_analysis_item_paragraph"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.job_id} #{self.paragraph_index}"
+
+
+class AnalysisFact(models.Model):
+    """One row per analysed paragraph with the attributes analytics group and filter by."""
+
+    job = models.ForeignKey(AnalysisJob, on_delete=models.CASCADE, related_name="facts")
+    paragraph_index = models.PositiveIntegerField()
+    analyzed_on = models.DateField()
+    owner = models.CharField(max_length=150, blank=True, default="")
+    subdivision = models.CharField(max_length=255, blank=True, default="")
+    event_type = models.CharField(max_length=512, blank=True, default="")
+    event_type_status = models.CharField(max_length=20, blank=True, default="")
+    event_found = models.BooleanField(default=False)
+    has_mismatch = models.BooleanField(default=False)
+    timestamp_status = models.CharField(max_length=1, blank=True, default="")
+    subdivision_status = models.CharField(max_length=1, blank=True, default="")
+    offenders_status = models.CharField(max_length=1, blank=True, default="")
+    subdivision_percent = models.FloatField(null=True, blank=True)
+    offenders_percent = models.FloatField(null=True, blank=True)
+    time_delta_minutes = models.FloatField(null=True, blank=True)
+    duplicates_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Факт анализа"
+        verbose_name_plural = "Факты анализа"
+        indexes = [
+            models.Index(fields=["analyzed_on"], name="analysis_fact_day_idx"),
+            models.Index(fields=["subdivision", "analyzed_on"], name="analysis_fact_subdiv_idx"),
+            models.Index(fields=["event_type", "analyzed_on"], name="analysis_fact_evtype_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.job_id} #{self.paragraph_index}"
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from django.db.models import Avg, Count, F, FloatField, Q, QuerySet
+from django.db.models.functions import Cast, NullIf, Round
+
+from apps.analysis.models import AnalysisFact, AnalysisJob
+
+DIMENSIONS = {
+    "subdivision": "subdivision",
+    "event_type": "event_type",
+    "day": "analyzed_on",
+}
+
+
+def _primary_match(item: dict[str, Any]) -> dict[str, Any]:
+    event_id = item.get("primary_match_id")
+    if not event_id:
+        return {}
+    return next(
+        (match for match in item.get("matches") or [] if match.get("event_id") == event_id), {}
+    )
+
+
+def build_fact(job: AnalysisJob, index: int, item: dict[str, Any]) -> AnalysisFact:
+    attributes = item.get("attributes") or {}
+
+    def attribute(key: str) -> dict[str, Any]:
+        return attributes.get(key) or {}
+
+    event_type = item.get("event_type") or {}
+    match = _primary_match(item)
+    subdivision = match.get("subdivision_name") or ""
+    if not subdivision and attribute("subdivision").get("status") in {"+", "!"}:
+        subdivision = attribute("subdivision").get("value") or ""
+    statuses = {key: attribute(key).get("status") or "" for key in attributes}
+    event_found = bool(item.get("event_found"))
+    time_delta = (item.get("primary_match") or {}).get("time_delta")
+    return AnalysisFact(
+        job=job,
+        paragraph_index=item.get("paragraph_index", index),
+        analyzed_on=job.finished_at.date(),
+        owner=job.owner,
+        subdivision=subdivision[:255],
+        event_type=(event_type.get("stored") or event_type.get("detected") or "")[:512],
+        event_type_status=event_type.get("status") or "",
+        event_found=event_found,
+        has_mismatch=event_found
+        and ("-" in statuses.values() or event_type.get("status") == "mismatch"),
+        timestamp_status=statuses.get("timestamp", ""),
+        subdivision_status=statuses.get("subdivision", ""),
+        offenders_status=statuses.get("offenders", ""),
+        subdivision_percent=attribute("subdivision").get("percent"),
+        offenders_percent=attribute("offenders").get("percent"),
+        time_delta_minutes=float(time_delta) if time_delta is not None else None,
+        duplicates_count=item.get("duplicates_count") or 0,
+    )
+
+
+def aggregate(
+    by: str,
+    since: date | None = None,
+    until: date | None = None,
+    owner: str | None = None,
+) -> QuerySet:
+    """Paragraph, found-event and mismatch counts per dimension, computed in SQL.
+
+    ``mismatched`` counts found events with a failed attribute or a conflicting
+    event type; ``mismatch_rate`` is its share of found events, in percent.
+    """
+    facts = AnalysisFact.objects.all()
+    if since is not None:
+        facts = facts.filter(analyzed_on__gte=since)
+    if until is not None:
+        facts = facts.filter(analyzed_on__lte=until)
+    if owner:
+        facts = facts.filter(owner=owner)
+    column = DIMENSIONS[by]
+    return (
+        facts.values(key=F(column))
+        .annotate(
+            paragraphs=Count("id"),
+            found=Count("id", filter=Q(event_found=True)),
+            mismatched=Count("id", filter=Q(has_mismatch=True)),
+            timestamp_failed=Count("id", filter=Q(event_found=True, timestamp_status="-")),
+            subdivision_failed=Count("id", filter=Q(event_found=True, subdivision_status="-")),
+            offenders_failed=Count("id", filter=Q(event_found=True, offenders_status="-")),
+            event_type_mismatched=Count("id", filter=Q(event_type_status="mismatch")),
+            avg_time_delta=Round(Avg("time_delta_minutes"), 1),
+        )
+        .annotate(
+            mismatch_rate=Round(
+                100.0 * Cast("mismatched", FloatField()) / NullIf(F("found"), 0), 1
+            )
+        )
+        .order_by("key")
+    )
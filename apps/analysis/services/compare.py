@@ -2,73 +2,56 @@ from __future__ import annotations
 
 from dataclasses import asdict
 from datetime import datetime
-import html
-import os
+from typing import Any
+import numpy as np
 
-from apps.analysis.dto import AttributeStatus, ExtractedEvent, MatchResult, Offender, PortalEvent
-from apps.analysis.services.semantic import normalize_subdivision
-
-
-def _is_truthy(value: str | None) -> bool:
-    if value is None:
-        return False
-    return value.strip().lower() in {"1", "true", "yes", "on"}
-
-
-def _show_debug_extract() -> bool:
-    return _is_truthy(os.environ.get("DEBUG")) or _is_truthy(
-        os.environ.get("SHOW_DEBUG_EXTRACT")
-    )
+from apps.analysis.dto import (
+    AttributeStatus,
+    ExtractedEvent,
+    MatchResult,
+    Offender,
+    PortalEvent,
+    normalize_person_name,
+)
+from apps.analysis.services.metrics import OFFENDER_EVALUATIONS
+from apps.analysis.services.timings import StageTimings
 
 
 def normalize_name(value: str) -> str:
-    cleaned = " ".join(value.lower().strip().split())
-    return cleaned.replace("ё", "е")
+    return normalize_person_name(value)
 
 
 def offender_name(offender: Offender) -> str:
-    parts = [offender.last_name, offender.first_name, offender.middle_name]
-    return " ".join(part for part in parts if part)
+    return offender.full_name
 
 
 def offender_dob(offender: Offender) -> str | None:
-    if offender.date_of_birth:
-        return offender.date_of_birth.isoformat()
-    if offender.birth_year:
-        return str(offender.birth_year)
-    return None
+    return offender.dob
 
 
 def offender_key(offender: Offender) -> str:
-    name = normalize_name(offender_name(offender))
-    dob = offender_dob(offender)
-    return f"{name}|{dob}" if dob else name
+    return offender.key
 
 
 def dedupe_offenders(values: list[Offender]) -> list[Offender]:
     seen: set[str] = set()
     deduped: list[Offender] = []
     for offender in values:
-        if not offender_name(offender):
+        if not offender.full_name:
             continue
-        key = offender_key(offender)
-        if key in seen:
+        if offender.key in seen:
             continue
-        seen.add(key)
+        seen.add(offender.key)
         deduped.append(offender)
     return deduped
 
 
 def normalize_offenders(values: list[Offender]) -> set[str]:
-    return {offender_key(value) for value in dedupe_offenders(values)}
+    return {value.key for value in values if value.full_name}
 
 
 def normalize_offender_names(values: list[Offender]) -> set[str]:
-    return {
-        normalize_name(offender_name(value))
-        for value in dedupe_offenders(values)
-        if offender_name(value)
-    }
+    return {value.normalized_name for value in values if value.full_name}
 
 
 def jaccard_similarity(a: set[str], b: set[str]) -> float:
@@ -104,10 +87,7 @@ def evaluate_time(
     value = extracted.isoformat(sep=" ", timespec="minutes")
     if not has_time:
         return AttributeStatus(
-            label="timestamp",
-            status="!",
-            percent=None,
-            value=f"{value} (время отсутствует)",
+            label="timestamp", status="!", percent=None, value=value, time_missing=True
         )
     if candidate is None:
         return AttributeStatus(label="timestamp", status="-", percent=None, value=value)
@@ -133,17 +113,20 @@ def evaluate_time(
     return AttributeStatus(label="timestamp", status="-", percent=None, value=value)
 
 
-def offenders_diff(extracted: list[Offender], matched: list[Offender]) -> dict[str, list[str]]:
+def offenders_diff(extracted: list[Offender], matched: list[Offender]) -> dict[str, list]:
+    """Names missing from or extra in the extraction, and date-of-birth conflicts.
+
+    ``mismatch`` entries are facts, not text: ``name``, ``status`` (a
+    ``compare_offender_dob`` result), ``extracted_dob`` and ``stored_dobs``.
+    """
     extracted_deduped = dedupe_offenders(extracted)
     matched_deduped = dedupe_offenders(matched)
     extracted_by_name: dict[str, list[Offender]] = {}
     matched_by_name: dict[str, list[Offender]] = {}
     for offender in extracted_deduped:
-        name = normalize_name(offender_name(offender))
-        extracted_by_name.setdefault(name, []).append(offender)
+        extracted_by_name.setdefault(offender.normalized_name, []).append(offender)
     for offender in matched_deduped:
-        name = normalize_name(offender_name(offender))
-        matched_by_name.setdefault(name, []).append(offender)
+        matched_by_name.setdefault(offender.normalized_name, []).append(offender)
 
     missing = [
         offender.display_name()
@@ -157,23 +140,19 @@ def offenders_diff(extracted: list[Offender], matched: list[Offender]) -> dict[s
         if name not in matched_by_name
         for offender in offenders
     ]
-    mismatch: list[str] = []
+    mismatch: list[dict[str, Any]] = []
     for name in sorted(set(extracted_by_name) & set(matched_by_name)):
         for extracted_offender in extracted_by_name[name]:
             matched_offenders = matched_by_name[name]
             dob_status = compare_offender_dob(extracted_offender, matched_offenders)
-            if dob_status == "missing_extracted":
-                mismatch.append(f"{name}: в сводке ДР не указана")
-            elif dob_status == "missing_portal":
-                mismatch.append(f"{name}: в БД ДР не указана")
-            elif dob_status == "mismatch":
-                extracted_label = offender_dob(extracted_offender) or "-"
-                matched_labels = sorted(
-                    {offender_dob(off) or "-" for off in matched_offenders}
-                )
+            if dob_status is not None:
                 mismatch.append(
-                    f"Несовпадение ДР для {name}: извлечено {extracted_label}, "
-                    f"в БД {matched_labels}"
+                    {
+                        "name": name,
+                        "status": dob_status,
+                        "extracted_dob": extracted_offender.dob,
+                        "stored_dobs": sorted({off.dob for off in matched_offenders if off.dob}),
+                    }
                 )
     return {"missing": sorted(missing), "extra": sorted(extra), "mismatch": mismatch}
 
@@ -181,8 +160,8 @@ def offenders_diff(extracted: list[Offender], matched: list[Offender]) -> dict[s
 def compare_offender_dob(
     extracted: Offender, matched_list: list[Offender]
 ) -> str | None:
-    extracted_dob = offender_dob(extracted)
-    matched_dobs = [offender_dob(offender) for offender in matched_list]
+    extracted_dob = extracted.dob
+    matched_dobs = [offender.dob for offender in matched_list]
     if extracted_dob is None:
         if any(dob for dob in matched_dobs):
             return "missing_extracted"
@@ -209,23 +188,13 @@ def compare_offender_dob(
 
 def evaluate_offenders(extracted: list[Offender], matched: list[Offender]) -> AttributeStatus:
     if not extracted:
-        return AttributeStatus(
-            label="offenders",
-            status=None,
-            percent=None,
-            value="не указаны/не обнаружены",
-        )
+        return AttributeStatus(label="offenders", status=None, percent=None, value=None)
     extracted_deduped = dedupe_offenders(extracted)
     matched_deduped = dedupe_offenders(matched)
     extracted_names = normalize_offender_names(extracted_deduped)
     matched_names = normalize_offender_names(matched_deduped)
     if not extracted_names:
-        return AttributeStatus(
-            label="offenders",
-            status=None,
-            percent=None,
-            value="не указаны/не обнаружены",
-        )
+        return AttributeStatus(label="offenders", status=None, percent=None, value=None)
     overlap = len(extracted_names & matched_names) / len(extracted_names)
     diff = offenders_diff(extracted_deduped, matched_deduped)
     if overlap == 1.0 and not any(diff.values()):
@@ -250,9 +219,9 @@ def evaluate_subdivision(
     threshold: float,
 ) -> AttributeStatus:
     if not extracted:
-        return AttributeStatus(label="subdivision", status=None, percent=None, value="не определено")
+        return AttributeStatus(label="subdivision", status=None, percent=None, value=None)
     if similarity is None or similarity < threshold:
-        return AttributeStatus(label="subdivision", status="-", percent=0.0, value="не определено")
+        return AttributeStatus(label="subdivision", status="-", percent=0.0, value=None)
     status = "+" if matched and extracted == matched else "!"
     percent = round(similarity * 100, 2)
     return AttributeStatus(label="subdivision", status=status, percent=percent, value=extracted)
@@ -317,29 +286,38 @@ def serialize_match(result: MatchResult) -> dict:
     }
 
 
-def highlight_text(raw_text: str, highlights: list[tuple[str, str | None]]) -> str:
-    escaped = html.escape(raw_text)
-    ordered = sorted(
-        [(text, status) for text, status in highlights if text],
-        key=lambda item: len(item[0]),
-        reverse=True,
+def locate_span(
+    raw_text: str, text: str | None, span: tuple[int, int] | None
+) -> tuple[int, int] | None:
+    """Return ``span`` if it still points at ``text``, else the first occurrence of ``text``."""
+    if not text:
+        return None
+    if span and raw_text[span[0] : span[1]] == text:
+        return span
+    position = raw_text.find(text)
+    return (position, position + len(text)) if position >= 0 else None
+
+
+def candidate_time_deltas(reference: datetime, candidates: list[PortalEvent]) -> np.ndarray:
+    """Absolute minutes between ``reference`` and each candidate; inf where unknown."""
+    # Converting datetimes to datetime64 costs more than the subtraction itself,
+    # so deltas are taken per object and only the comparisons run vectorized.
+    return np.array(
+        [
+            abs((candidate.date_detection - reference).total_seconds()) / 60
+            if candidate.date_detection
+            else np.inf
+            for candidate in candidates
+        ],
+        dtype=float,
     )
-    for text, status in ordered:
-        if not status:
-            continue
-        class_name = {
-            "+": "highlight-plus",
-            "!": "highlight-warn",
-            "-": "highlight-fail",
-        }.get(status, "highlight-none")
-        escaped_text = html.escape(text)
-        escaped = escaped.replace(
-            escaped_text, f'<span class="highlight {class_name}">{escaped_text}</span>'
-        )
-    return escaped
 
 
 class CompareService:
+    def __init__(self, timings: StageTimings | None = None) -> None:
+        self.timings = timings or StageTimings()
+        self.offender_evaluations = {"evaluated": 0, "skipped": 0}
+
     def compare(
         self,
         extracted: ExtractedEvent,
@@ -347,6 +325,71 @@ class CompareService:
         threshold: float,
         window_minutes: int,
         offenders_min_overlap: float = 0.5,
+    ) -> dict:
+        with self.timings.stage("compare", len(candidates)):
+            return self._compare(
+                extracted, candidates, threshold, window_minutes, offenders_min_overlap
+            )
+
+    def _offender_overlaps(
+        self,
+        candidates: list[PortalEvent],
+        cheap_flags: list[tuple[bool, bool]],
+        deltas: list[float],
+        extracted_names: set[str],
+        offenders_min_overlap: float,
+    ) -> dict[int, float]:
+        overlaps: dict[int, float] = {}
+        if not extracted_names:
+            self._count_offender_evaluations(0, len(candidates))
+            return overlaps
+        total = len(extracted_names)
+
+        # One cheap flag: offenders decide whether the candidate matches at all.
+        # Ranking keys mirror the primary-match sort: (-count_true, Δt, -overlap, position).
+        best: tuple[int, float, float, int] | None = None
+        both: list[int] = []
+        for index, (time_match, subdivision_match) in enumerate(cheap_flags):
+            if time_match and subdivision_match:
+                both.append(index)
+            elif time_match or subdivision_match:
+                names = normalize_offender_names(candidates[index].offenders)
+                overlap = len(extracted_names & names) / total
+                overlaps[index] = overlap
+                if overlap >= offenders_min_overlap:
+                    key = (-2, deltas[index], -overlap, index)
+                    if best is None or key < best:
+                        best = key
+
+        # Two cheap flags: already a match, overlap only moves the primary ranking.
+        # Ranking is keyed by event_id, so duplicates keep the exhaustive path.
+        unique_ids = len({candidate.event_id for candidate in candidates}) == len(candidates)
+        for index in sorted(both, key=lambda item: (deltas[item], item)):
+            if unique_ids and best is not None and best < (-3, deltas[index], -1.0, index):
+                continue
+            names = normalize_offender_names(candidates[index].offenders)
+            overlap = len(extracted_names & names) / total
+            overlaps[index] = overlap
+            key = (-3 if overlap >= offenders_min_overlap else -2, deltas[index], -overlap, index)
+            if best is None or key < best:
+                best = key
+
+        self._count_offender_evaluations(len(overlaps), len(candidates) - len(overlaps))
+        return overlaps
+
+    def _count_offender_evaluations(self, evaluated: int, skipped: int) -> None:
+        self.offender_evaluations["evaluated"] += evaluated
+        self.offender_evaluations["skipped"] += skipped
+        OFFENDER_EVALUATIONS.labels(result="evaluated").inc(evaluated)
+        OFFENDER_EVALUATIONS.labels(result="skipped").inc(skipped)
+
+    def _compare(
+        self,
+        extracted: ExtractedEvent,
+        candidates: list[PortalEvent],
+        threshold: float,
+        window_minutes: int,
+        offenders_min_overlap: float,
     ) -> dict:
         valid_subdivision = (
             extracted.subdivision_similarity is not None
@@ -356,37 +399,46 @@ class CompareService:
         extracted_offenders = dedupe_offenders(extracted.offenders)
         extracted_offenders_names = normalize_offender_names(extracted_offenders)
 
+        time_deltas = None
+        if extracted.timestamp_has_time and extracted.timestamp:
+            time_deltas = candidate_time_deltas(extracted.timestamp, candidates)
+
+        # Phase 1: cheap time/subdivision flags for every candidate.
+        if time_deltas is not None:
+            deltas = time_deltas.tolist()
+            time_flags = (time_deltas <= window_minutes).tolist()
+        else:
+            deltas = [float("inf")] * len(candidates)
+            time_flags = [False] * len(candidates)
+        subdivision_flags = [
+            bool(extracted_subdivision and candidate.subdivision_name == extracted_subdivision)
+            for candidate in candidates
+        ]
+        cheap_flags = list(zip(time_flags, subdivision_flags))
+
+        # Phase 2: offender overlap only where it can change membership or ranking.
+        overlaps = self._offender_overlaps(
+            candidates,
+            cheap_flags,
+            deltas,
+            extracted_offenders_names,
+            offenders_min_overlap,
+        )
+
         matches: list[PortalEvent] = []
         match_metrics: dict[str, dict[str, float | int | bool]] = {}
-        for candidate in candidates:
-            candidate_offenders = dedupe_offenders(candidate.offenders)
-            time_match = False
-            time_delta = None
-            if extracted.timestamp_has_time and extracted.timestamp and candidate.date_detection:
-                delta = abs(
-                    (candidate.date_detection - extracted.timestamp).total_seconds()
-                ) / 60
-                time_delta = delta
-                time_match = delta <= window_minutes
-            subdivision_match = bool(
-                extracted_subdivision
-                and candidate.subdivision_name == extracted_subdivision
-            )
-            offenders_overlap = 0.0
-            offenders_match = False
-            if extracted_offenders_names:
-                candidate_names = normalize_offender_names(candidate_offenders)
-                if extracted_offenders_names:
-                    offenders_overlap = len(
-                        extracted_offenders_names & candidate_names
-                    ) / len(extracted_offenders_names)
-                offenders_match = offenders_overlap >= offenders_min_overlap
+        for index, (time_match, subdivision_match) in enumerate(cheap_flags):
+            if not (time_match or subdivision_match):
+                continue
+            offenders_overlap = overlaps.get(index, 0.0)
+            offenders_match = index in overlaps and offenders_overlap >= offenders_min_overlap
             if rule_two_of_three(time_match, subdivision_match, offenders_match):
-                candidate.offenders = candidate_offenders
+                candidate = candidates[index]
+                candidate.offenders = dedupe_offenders(candidate.offenders)
                 matches.append(candidate)
                 match_metrics[candidate.event_id] = {
                     "count_true": sum([time_match, subdivision_match, offenders_match]),
-                    "time_delta": time_delta if time_delta is not None else float("inf"),
+                    "time_delta": deltas[index],
                     "subdivision_similarity": extracted.subdivision_similarity or 0.0,
                     "offenders_overlap": offenders_overlap,
                     "time_match": time_match,
@@ -411,25 +463,10 @@ class CompareService:
         time_candidate = None
         if primary_match:
             time_candidate = primary_match
-        elif extracted.timestamp and extracted.timestamp_has_time and candidates:
-            time_candidate = min(
-                candidates,
-                key=lambda candidate: abs(
-                    (candidate.date_detection - extracted.timestamp).total_seconds()
-                )
-                if candidate.date_detection
-                else float("inf"),
-            )
-            if (
-                time_candidate
-                and time_candidate.date_detection
-                and abs(
-                    (time_candidate.date_detection - extracted.timestamp).total_seconds()
-                )
-                / 60
-                > window_minutes
-            ):
-                time_candidate = None
+        elif time_deltas is not None and candidates:
+            nearest = int(np.argmin(time_deltas))
+            if np.isfinite(time_deltas[nearest]) and time_deltas[nearest] <= window_minutes:
+                time_candidate = candidates[nearest]
 
         time_status = evaluate_time(
             extracted.timestamp,
@@ -447,95 +484,46 @@ class CompareService:
             extracted_offenders, primary_match.offenders if primary_match else []
         )
 
-        highlights: list[tuple[str, str | None]] = []
-        if extracted.timestamp_text:
-            highlights.append((extracted.timestamp_text, time_status.status))
-        if extracted.subdivision_text:
-            highlights.append((extracted.subdivision_text, subdivision_status.status))
-        for offender in extracted_offenders:
-            if offender.raw:
-                highlights.append((offender.raw, offenders_status.status))
-        highlighted_text = highlight_text(extracted.raw_text, highlights)
-
-        match_lines: list[str] = []
-        summary_lines: list[str] = []
-        diff_lines: list[str] = []
-        extra_lines: list[str] = []
-        if primary_match:
-            metrics = match_metrics.get(primary_match.event_id, {})
-            matched_flags = []
-            if metrics.get("time_match"):
-                matched_flags.append("time")
-            if metrics.get("subdivision_match"):
-                matched_flags.append("subdivision")
-            if metrics.get("offenders_match"):
-                matched_flags.append("offenders")
-            match_lines.append("Определено по: " + (", ".join(matched_flags) or "нет"))
-            if metrics.get("time_delta") is not None and metrics.get("time_delta") != float("inf"):
-                match_lines.append(f"Δt: {round(float(metrics['time_delta']))} мин")
-            portal_offenders = ", ".join(
-                offender.display_name()
-                for offender in dedupe_offenders(primary_match.offenders)
-            )
-            match_lines.append(
-                f"Нарушители в БД портала (event_id={primary_match.event_id}): "
-                f"{portal_offenders or 'не указаны/не обнаружены'}"
+        raw_text = extracted.raw_text
+        timestamp_span = locate_span(raw_text, extracted.timestamp_text, extracted.timestamp_span)
+        subdivision_span = locate_span(
+            raw_text, extracted.subdivision_text, extracted.subdivision_span
+        )
+        offender_spans = [
+            span
+            for span in (
+                locate_span(raw_text, offender.raw, offender.span)
+                for offender in extracted.offenders
             )
+            if span
+        ]
 
-        extracted_offenders_display = ", ".join(
-            offender.display_name() for offender in extracted_offenders
-        )
-        summary_lines.append(
-            f"Нарушители в сводке: {extracted_offenders_display or 'не указаны/не обнаружены'}"
+        primary_facts = None
+        if primary_match:
+            metrics = match_metrics[primary_match.event_id]
+            time_delta = metrics["time_delta"]
+            primary_facts = {
+                "time_match": metrics["time_match"],
+                "subdivision_match": metrics["subdivision_match"],
+                "offenders_match": metrics["offenders_match"],
+                "time_delta": time_delta if time_delta != float("inf") else None,
+            }
+        matched_names = (
+            normalize_offender_names(primary_match.offenders) if primary_match else set()
         )
-        if extracted_offenders:
-            overlap_value = offenders_status.percent
-            match_count = 0
-            extracted_names = normalize_offender_names(extracted_offenders)
-            matched_names = normalize_offender_names(primary_match.offenders) if primary_match else set()
-            if extracted_names:
-                match_count = len(extracted_names & matched_names)
-            total_count = len(extracted_names)
-            if total_count:
-                summary_lines.append(
-                    f"Совпадение нарушителей: {round(overlap_value or 0.0, 2)}% "
-                    f"(совпало {match_count} из {total_count})"
-                )
-                if match_count == 0:
-                    summary_lines.append(
-                        "Возможная ошибка внесения нарушителей в БД (0% совпадения)"
-                    )
-        else:
-            summary_lines.append("Совпадение нарушителей: n/a")
-        if (
-            extracted.subdivision_text
-            and extracted.subdivision_similarity is not None
-            and extracted.subdivision_similarity < threshold
-        ):
-            summary_lines.append("Подразделение не удалось определить (ниже порога)")
-        if _show_debug_extract() and extracted.subdivision_text:
-            summary_lines.append(f"subdivision_raw: {extracted.subdivision_text}")
-            summary_lines.append(
-                f"subdivision_norm: {normalize_subdivision(extracted.subdivision_text)}"
-            )
-        if offenders_status.diff:
-            diff = offenders_status.diff
-            if diff.get("missing"):
-                diff_lines.append(f"Отсутствуют в извлечении: {', '.join(diff['missing'])}")
-            if diff.get("mismatch"):
-                diff_lines.append("; ".join(diff["mismatch"]))
-            if diff.get("extra"):
-                extra_lines.append(f"Лишние в извлечении: {', '.join(diff['extra'])}")
-
-        notes = summary_lines + diff_lines + extra_lines
-        explanation = match_lines + notes
 
         return {
             "extracted": {
                 "paragraph_index": extracted.paragraph_index,
-                "raw_text": extracted.raw_text,
+                "raw_text": raw_text,
+                "subdivision_text": extracted.subdivision_text,
+                "offenders": [offender.display_name() for offender in extracted_offenders],
+                "spans": {
+                    "timestamp": timestamp_span,
+                    "subdivision": subdivision_span,
+                    "offenders": offender_spans,
+                },
             },
-            "highlighted_text": highlighted_text,
             "attributes": {
                 "timestamp": asdict(time_status),
                 "subdivision": asdict(subdivision_status),
@@ -544,6 +532,16 @@ class CompareService:
             "event_found": found,
             "duplicates_count": duplicates_count,
             "primary_match_id": primary_match.event_id if primary_match else None,
+            "primary_match": primary_facts,
+            "offenders_overlap": {
+                "matched": len(extracted_offenders_names & matched_names),
+                "total": len(extracted_offenders_names),
+            },
+            "subdivision_below_threshold": bool(
+                extracted.subdivision_text
+                and extracted.subdivision_similarity is not None
+                and extracted.subdivision_similarity < threshold
+            ),
             "matches": [
                 {
                     "event_id": match.event_id,
@@ -552,14 +550,8 @@ class CompareService:
                     "subdivision_short_name": match.subdivision_short_name,
                     "subdivision_full_name": match.subdivision_full_name,
                     "event_type_name": match.event_type_name,
-                    "offenders": [
-                        offender.display_name()
-                        for offender in dedupe_offenders(match.offenders)
-                    ],
+                    "offenders": [offender.display_name() for offender in match.offenders],
                 }
                 for match in (matches if matches else [])
             ],
-            "match_lines": match_lines,
-            "notes": notes,
-            "explanation": explanation,
         }
@@ -1,7 +1,22 @@
+import time
+from typing import IO
+
 from docx import Document
 
+from apps.analysis.services.timings import StageTimings
+
+
+def docx_paragraphs(source: str | IO[bytes]) -> list[str]:
+    document = Document(source)
+    return [paragraph.text.strip() for paragraph in document.paragraphs if paragraph.text.strip()]
+
 
 class DocxIngestService:
+    def __init__(self, timings: StageTimings | None = None) -> None:
+        self.timings = timings or StageTimings()
+
     def read_paragraphs(self, path: str) -> list[str]:
-        document = Document(path)
-        return [paragraph.text.strip() for paragraph in document.paragraphs if paragraph.text.strip()]
+        start = time.perf_counter()
+        paragraphs = docx_paragraphs(path)
+        self.timings.record("ingest", time.perf_counter() - start, len(paragraphs))
+        return paragraphs
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import logging
+import threading
+
+import numpy as np
+import redis
+from django.conf import settings
+
+from apps.analysis.services import metrics
+
+logger = logging.getLogger(__name__)
+
+_STAT_KEYS = ("local_hits", "shared_hits", "misses")
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        max_entries: int,
+        redis_url: str | None = None,
+        redis_ttl: int = 0,
+    ) -> None:
+        self.max_entries = max(max_entries, 0)
+        self.redis_ttl = redis_ttl
+        self._entries: OrderedDict[tuple[str, bool, str], np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(_STAT_KEYS, 0)
+        self.client = (
+            redis.Redis.from_url(redis_url, decode_responses=False) if redis_url else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _shared_key(namespace: str, normalize: bool, text: str) -> str:
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return f"emb:{namespace}:{'n' if normalize else 'r'}:{digest}"
+
+    def get_many(
+        self, namespace: str, texts: list[str], normalize: bool
+    ) -> dict[str, np.ndarray]:
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for text in texts:
+                key = (namespace, normalize, text)
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    found[text] = vector
+            self._stats["local_hits"] += len(found)
+        local_hits = len(found)
+        missing = [text for text in texts if text not in found]
+        if missing and self.client is not None:
+            shared = self._get_shared(namespace, missing, normalize)
+            if shared:
+                self._put_local(namespace, normalize, shared)
+                found.update(shared)
+                with self._lock:
+                    self._stats["shared_hits"] += len(shared)
+        with self._lock:
+            self._stats["misses"] += len(texts) - len(found)
+        shared_hits = len(found) - local_hits
+        metrics.EMBEDDING_CACHE_LOOKUPS.labels(result="local_hit").inc(local_hits)
+        metrics.EMBEDDING_CACHE_LOOKUPS.labels(result="shared_hit").inc(shared_hits)
+        metrics.EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc(len(texts) - len(found))
+        return found
+
+    def set_many(self, namespace: str, normalize: bool, vectors: dict[str, np.ndarray]) -> None:
+        if not vectors:
+            return
+        self._put_local(namespace, normalize, vectors)
+        if self.client is not None:
+            self._set_shared(namespace, normalize, vectors)
+
+    def _put_local(self, namespace: str, normalize: bool, vectors: dict[str, np.ndarray]) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            for text, vector in vectors.items():
+                key = (namespace, normalize, text)
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _get_shared(
+        self, namespace: str, texts: list[str], normalize: bool
+    ) -> dict[str, np.ndarray]:
+        keys = [self._shared_key(namespace, normalize, text) for text in texts]
+        try:
+            payloads = self.client.mget(keys)
+        except redis.RedisError as exc:
+            logger.warning("Shared embedding cache unavailable: %s", exc)
+            return {}
+        return {
+            text: np.frombuffer(payload, dtype=np.float32)
+            for text, payload in zip(texts, payloads)
+            if payload
+        }
+
+    def _set_shared(self, namespace: str, normalize: bool, vectors: dict[str, np.ndarray]) -> None:
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for text, vector in vectors.items():
+                payload = np.asarray(vector, dtype=np.float32).tobytes()
+                key = self._shared_key(namespace, normalize, text)
+                if self.redis_ttl:
+                    pipeline.set(key, payload, ex=self.redis_ttl)
+                else:
+                    pipeline.set(key, payload)
+            pipeline.execute()
+        except redis.RedisError as exc:
+            logger.warning("Shared embedding cache unavailable: %s", exc)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def stats_since(self, before: dict[str, int]) -> dict[str, float | int]:
+        current = self.stats()
+        delta = {key: current[key] - before.get(key, 0) for key in _STAT_KEYS}
+        lookups = sum(delta.values())
+        hits = delta["local_hits"] + delta["shared_hits"]
+        return {
+            **delta,
+            "hits": hits,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "size": len(self),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._stats = dict.fromkeys(_STAT_KEYS, 0)
+
+
+class CachedEncoder:
+    def __init__(self, model, namespace: str, cache: EmbeddingCache | None = None) -> None:
+        self.model = model
+        self.namespace = namespace
+        self.cache = cache if cache is not None else get_embedding_cache()
+
+    def encode(self, sentences, normalize_embeddings: bool = False):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return self.model.encode(texts, normalize_embeddings=normalize_embeddings)
+        found = self.cache.get_many(self.namespace, texts, normalize_embeddings)
+        missing = list(dict.fromkeys(text for text in texts if text not in found))
+        if missing:
+            metrics.ENCODE_BATCH_SIZE.observe(len(missing))
+            encoded = np.asarray(
+                self.model.encode(missing, normalize_embeddings=normalize_embeddings)
+            )
+            fresh = {text: encoded[index] for index, text in enumerate(missing)}
+            self.cache.set_many(self.namespace, normalize_embeddings, fresh)
+            found.update(fresh)
+        vectors = np.stack([np.asarray(found[text]) for text in texts])
+        return vectors[0] if single else vectors
+
+
+_cache: EmbeddingCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                redis_url = None
+                if getattr(settings, "SEMANTIC_EMBEDDING_CACHE_REDIS", False):
+                    redis_url = settings.REDIS_URL
+                _cache = EmbeddingCache(
+                    max_entries=int(getattr(settings, "SEMANTIC_EMBEDDING_CACHE_SIZE", 0)),
+                    redis_url=redis_url,
+                    redis_ttl=int(getattr(settings, "SEMANTIC_EMBEDDING_CACHE_REDIS_TTL", 0)),
+                )
+    return _cache
+
+
+def reset_embedding_cache() -> None:
+    global _cache
+    with _cache_lock:
+        _cache = None
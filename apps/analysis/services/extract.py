@@ -16,6 +16,7 @@ from natasha import (
 from pymorphy2 import MorphAnalyzer
 
 from apps.analysis.dto import Offender
+from apps.analysis.services.timings import StageTimings
 from apps.reference.models import SubdivisionRef
 
 
@@ -26,13 +27,16 @@ class ExtractedAttributes:
     timestamp_text: str | None
     subdivision_text: str | None
     offenders: list[Offender]
+    timestamp_span: tuple[int, int] | None = None
+    subdivision_span: tuple[int, int] | None = None
 
 
 class ExtractService:
     _morph_analyzer: MorphAnalyzer | None = None
     _subdivision_token_stoplist: set[str] | None = None
 
-    def __init__(self) -> None:
+    def __init__(self, timings: StageTimings | None = None) -> None:
+        self.timings = timings or StageTimings()
         self.segmenter = Segmenter()
         self.morph_vocab = MorphVocab()
         self.embedding = NewsEmbedding()
@@ -66,39 +70,45 @@ class ExtractService:
         )
 
     def extract(self, text: str) -> ExtractedAttributes:
-        doc = Doc(text)
-        doc.segment(self.segmenter)
-        doc.tag_ner(self.tagger)
-        offenders = self._extract_offenders(text, doc)
-        subdivision_text = self._extract_subdivision(doc)
-        timestamp, timestamp_has_time, timestamp_text = self._extract_timestamp(text)
+        with self.timings.stage("ner"):
+            doc = Doc(text)
+            doc.segment(self.segmenter)
+            doc.tag_ner(self.tagger)
+        with self.timings.stage("extract"):
+            offenders = self._extract_offenders(text, doc)
+            subdivision_span = self._extract_subdivision(doc)
+            timestamp, timestamp_has_time, timestamp_span = self._extract_timestamp(text)
 
         return ExtractedAttributes(
             timestamp=timestamp,
             timestamp_has_time=timestamp_has_time,
-            timestamp_text=timestamp_text,
-            subdivision_text=subdivision_text,
+            timestamp_text=text[slice(*timestamp_span)] if timestamp_span else None,
+            subdivision_text=text[slice(*subdivision_span)] if subdivision_span else None,
             offenders=offenders,
+            timestamp_span=timestamp_span,
+            subdivision_span=subdivision_span,
         )
 
-    def _extract_subdivision(self, doc: Doc) -> str | None:
-        subdivision_text = self._extract_subdivision_text(doc.text)
-        if subdivision_text:
-            return subdivision_text
+    def _extract_subdivision(self, doc: Doc) -> tuple[int, int] | None:
+        subdivision_span = self._extract_subdivision_span(doc.text)
+        if subdivision_span:
+            return subdivision_span
         for span in doc.spans:
             if span.type == "ORG":
-                return span.text
+                return span.start, span.stop
         return None
 
-    def _extract_timestamp(self, text: str) -> tuple[datetime | None, bool, str | None]:
+    def _extract_timestamp(
+        self, text: str
+    ) -> tuple[datetime | None, bool, tuple[int, int] | None]:
         candidates = self._extract_datetime_candidates(text)
         if candidates:
             candidate = candidates[0]
-            return candidate["timestamp"], True, candidate["raw"]
+            return candidate["timestamp"], True, candidate["span"]
 
         date_only = self._extract_date_only(text)
         if date_only:
-            return date_only["timestamp"], False, date_only["raw"]
+            return date_only["timestamp"], False, date_only["span"]
 
         return None, False, None
 
@@ -116,6 +126,7 @@ class ExtractService:
             )
             context = text[name_end: min(next_name_start, name_end + 80)]
             birth_date, birth_year = self._extract_birth_from_context(context)
+            name_span = (span.start + start, name_end)
             offenders.append(
                 Offender(
                     first_name=first_name,
@@ -124,6 +135,7 @@ class ExtractService:
                     date_of_birth=birth_date,
                     birth_year=birth_year,
                     raw=raw_name,
+                    span=name_span if start >= 0 and text[slice(*name_span)] == raw_name else None,
                 )
             )
 
@@ -170,6 +182,7 @@ class ExtractService:
                     date_of_birth=birth_date,
                     birth_year=birth_year,
                     raw=match.group(0),
+                    span=match.span(),
                 )
             )
         return offenders
@@ -230,8 +243,16 @@ class ExtractService:
     def _overlaps(self, start: int, stop: int, span: tuple[int, int]) -> bool:
         return not (stop <= span[0] or start >= span[1])
 
-    def _extract_subdivision_text(self, text: str) -> str | None:
-        window = self.extract_subdivision_window(text)
+    @staticmethod
+    def _strip_span(text: str, start: int, end: int, chars: str) -> tuple[int, int] | None:
+        while start < end and text[start] in chars:
+            start += 1
+        while end > start and text[end - 1] in chars:
+            end -= 1
+        return (start, end) if start < end else None
+
+    def _extract_subdivision_span(self, text: str) -> tuple[int, int] | None:
+        window = self.subdivision_window_span(text)
         if window:
             return window
         marker_groups: list[list[str]] = [
@@ -259,13 +280,17 @@ class ExtractService:
                 window = text[best_match.end():window_end]
                 cutoff_match = re.search(r"[.;\n]", window)
                 if cutoff_match:
-                    window = window[:cutoff_match.start()]
-                candidate = window.strip(" ,:\t")
+                    window_end = best_match.end() + cutoff_match.start()
+                candidate = self._strip_span(text, best_match.end(), window_end, " ,:\t")
                 if candidate:
                     return candidate
         return None
 
     def extract_subdivision_window(self, full_text: str) -> str | None:
+        span = self.subdivision_window_span(full_text)
+        return full_text[slice(*span)] if span else None
+
+    def subdivision_window_span(self, full_text: str) -> tuple[int, int] | None:
         markers = ["ПОГЗ", "ПЗ", "ОПК", "ОП", "ПОГК", "ПОГО"]
         marker_pattern = re.compile(r"\b(" + "|".join(markers) + r")\b", re.IGNORECASE)
         match = marker_pattern.search(full_text)
@@ -275,15 +300,17 @@ class ExtractService:
         right_window = 80
         start = max(0, match.start() - left_window)
         end = min(len(full_text), match.end() + right_window)
-        window = full_text[start:end]
-        window = re.sub(r"^[\d\s:.,-]+", "", window)
+        prefix = re.match(r"[\d\s:.,-]+", full_text[start:end])
+        if prefix:
+            start += prefix.end()
         split_pattern = re.compile(
             r"(?:[.,;]|\bг\.?\s*р\.?\b|\bрод\.?\b|\bпаспорт\b|\bграждан\w*\b|\bвыявлен\w*\b)",
             re.IGNORECASE,
         )
-        parts = re.split(split_pattern, window, maxsplit=1)
-        candidate = parts[0].strip(" ,:\t\n")
-        return candidate or None
+        separator = split_pattern.search(full_text[start:end])
+        if separator:
+            end = start + separator.start()
+        return self._strip_span(full_text, start, end, " ,:\t\n")
 
     def _extract_birth_from_context(self, context: str) -> tuple[date | None, int | None]:
         birth_date = None
@@ -453,6 +480,7 @@ class ExtractService:
                         "start": match.start(),
                         "timestamp": timestamp,
                         "raw": match.group(0),
+                        "span": match.span(),
                     }
                 )
         candidates.sort(key=lambda item: item["start"])
@@ -466,7 +494,7 @@ class ExtractService:
                 timestamp = datetime.strptime(match.group(0), "%d.%m.%Y")
             except ValueError:
                 continue
-            return {"timestamp": timestamp, "raw": match.group(0)}
+            return {"timestamp": timestamp, "raw": match.group(0), "span": match.span()}
         return None
 
     def _is_birth_context(self, text: str, start: int, end: int) -> bool:
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.db import DatabaseError, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from apps.analysis.models import AnalysisFact, AnalysisItem, AnalysisJob
+from apps.analysis.services.analytics import build_fact
+from apps.analysis.services.result_store import ResultStore
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = 500
+
+
+def persistence_enabled() -> bool:
+    return settings.RESULT_PERSIST
+
+
+def load_job_data(
+    store: ResultStore, job_id: str, user: AbstractBaseUser | None = None
+) -> dict[str, Any]:
+    """``ResultStore.get`` that falls back to history once Redis has expired the job.
+
+    With ``user``, history only serves that user's jobs (all jobs for superusers).
+    Cancelled jobs are never restored. A result read from app_db is written back
+    to Redis for the next requests.
+    """
+    data = store.get(job_id)
+    if data["status"] is not None or not persistence_enabled():
+        return data
+    if store.is_cancelled(job_id):
+        return data
+    result = JobHistory().load_result(job_id, user)
+    if result is None:
+        return data
+    store.set_result(job_id, result)
+    return {"status": "done", "progress": 100, "result": result}
+
+
+def user_owns_job(store: ResultStore, job_id: str, user: AbstractBaseUser) -> bool:
+    """Whether ``user`` may act on the job: its owner, or any superuser.
+
+    The owner comes from the Redis job hash or, once that has expired, from history.
+    """
+    if user.is_superuser:
+        return True
+    owner = store.job_meta(job_id).get("owner")
+    if owner is not None:
+        return owner == user.get_username()
+    return persistence_enabled() and JobHistory.jobs_for(user).filter(id=job_id).exists()
+
+
+class JobHistory:
+    """Finished jobs in app_db; Redis stays the hot cache for fresh results."""
+
+    def save(
+        self,
+        job_id: str,
+        result: dict[str, Any],
+        owner: str | None = None,
+        filename: str | None = None,
+    ) -> bool:
+        items = result.get("items", [])
+        try:
+            if AnalysisJob.objects.filter(id=job_id).exists():
+                # A redelivered task may finish the same job twice.
+                return True
+            with transaction.atomic():
+                job = AnalysisJob.objects.create(
+                    id=job_id,
+                    owner=owner or "",
+                    filename=(filename or "")[:255],
+                    paragraphs=len(items),
+                    events_found=sum(1 for item in items if item.get("event_found")),
+                    metrics=result.get("metrics") or {},
+                )
+                AnalysisItem.objects.bulk_create(
+                    (
+                        AnalysisItem(
+                            job=job,
+                            paragraph_index=item.get("paragraph_index", index),
+                            data=item,
+                        )
+                        for index, item in enumerate(items)
+                    ),
+                    batch_size=BULK_BATCH_SIZE,
+                )
+                AnalysisFact.objects.bulk_create(
+                    (build_fact(job, index, item) for index, item in enumerate(items)),
+                    batch_size=BULK_BATCH_SIZE,
+                )
+        except DatabaseError:
+            # The result is already in Redis; losing the history row must not fail the job.
+            logger.exception("Could not persist job %s to history", job_id)
+            return False
+        return True
+
+    def load_result(
+        self, job_id: str, user: AbstractBaseUser | None = None
+    ) -> dict[str, Any] | None:
+        jobs = self.jobs_for(user) if user is not None else AnalysisJob.objects.all()
+        job = jobs.filter(id=job_id).first()
+        if job is None:
+            return None
+        items = list(
+            AnalysisItem.objects.filter(job=job)
+            .order_by("paragraph_index")
+            .values_list("data", flat=True)
+        )
+        return {"items": items, "metrics": job.metrics}
+
+    @staticmethod
+    def jobs_for(user: AbstractBaseUser) -> QuerySet[AnalysisJob]:
+        jobs = AnalysisJob.objects.all()
+        if not user.is_superuser:
+            jobs = jobs.filter(owner=user.get_username())
+        return jobs
+
+    def delete(self, job_id: str) -> None:
+        with transaction.atomic():
+            AnalysisItem.objects.filter(job_id=job_id).delete()
+            AnalysisFact.objects.filter(job_id=job_id).delete()
+            AnalysisJob.objects.filter(id=job_id).delete()
+
+    def purge(self, retention_days: int | None = None) -> tuple[int, int]:
+        """Delete jobs finished more than ``retention_days`` ago; returns (jobs, items)."""
+        days = settings.RESULT_RETENTION_DAYS if retention_days is None else retention_days
+        cutoff = timezone.now() - timedelta(days=days)
+        with transaction.atomic():
+            # Items and facts first, as single DELETEs, so the cascade does not load them.
+            items, _ = AnalysisItem.objects.filter(job__finished_at__lt=cutoff).delete()
+            AnalysisFact.objects.filter(job__finished_at__lt=cutoff).delete()
+            jobs, _ = AnalysisJob.objects.filter(finished_at__lt=cutoff).delete()
+        return jobs, items
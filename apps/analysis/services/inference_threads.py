@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+import json
+import logging
+import os
+import sys
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ThreadConfig:
+    intra_op_threads: int
+    inter_op_threads: int
+    tokenizers_parallelism: bool
+    worker_concurrency: int
+    cpu_count: int
+    auto: bool
+
+
+_applied: ThreadConfig | None = None
+
+# Hash of worker hostname -> JSON of the thread settings its processes applied.
+WORKER_THREADS_KEY = "workers:threads"
+
+
+def _cpu_count() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return max(len(os.sched_getaffinity(0)), 1)
+        except OSError:
+            pass
+    return max(os.cpu_count() or 1, 1)
+
+
+def worker_concurrency() -> int:
+    configured = int(getattr(settings, "CELERY_WORKER_CONCURRENCY", 0) or 0)
+    if configured > 0:
+        return configured
+    return _cpu_count()
+
+
+def resolve_thread_config(concurrency: int | None = None) -> ThreadConfig:
+    cpu_count = _cpu_count()
+    concurrency = max(concurrency or worker_concurrency(), 1)
+    intra_op = int(getattr(settings, "TORCH_INTRA_OP_THREADS", 0) or 0)
+    inter_op = int(getattr(settings, "TORCH_INTER_OP_THREADS", 0) or 0)
+    auto = intra_op <= 0
+    if intra_op <= 0:
+        intra_op = max(cpu_count // concurrency, 1)
+    if inter_op <= 0:
+        inter_op = 1
+    return ThreadConfig(
+        intra_op_threads=intra_op,
+        inter_op_threads=inter_op,
+        tokenizers_parallelism=bool(getattr(settings, "TOKENIZERS_PARALLELISM", False)),
+        worker_concurrency=concurrency,
+        cpu_count=cpu_count,
+        auto=auto,
+    )
+
+
+def apply_thread_config(concurrency: int | None = None, force: bool = False) -> ThreadConfig:
+    global _applied
+    if _applied is not None and not force:
+        return _applied
+    config = resolve_thread_config(concurrency)
+    os.environ["TOKENIZERS_PARALLELISM"] = "true" if config.tokenizers_parallelism else "false"
+    try:
+        import torch
+    except ImportError:
+        torch = None
+    if torch is not None:
+        torch.set_num_threads(config.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(config.inter_op_threads)
+        except RuntimeError:
+            # Inter-op pool size is fixed once torch has run parallel work.
+            logger.warning(
+                "torch inter-op threads already initialized (%s); keeping current value.",
+                torch.get_num_interop_threads(),
+            )
+    logger.info(
+        "Inference threads: intra_op=%s inter_op=%s tokenizers_parallelism=%s "
+        "(concurrency=%s, cpus=%s, auto=%s)",
+        config.intra_op_threads,
+        config.inter_op_threads,
+        config.tokenizers_parallelism,
+        config.worker_concurrency,
+        config.cpu_count,
+        config.auto,
+    )
+    _applied = config
+    return config
+
+
+def _client() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def publish_thread_config(hostname: str, config: ThreadConfig) -> None:
+    """Record the thread settings a worker applied, for /health on the web app."""
+    info: dict[str, object] = asdict(config)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        info["torch_num_threads"] = torch.get_num_threads()
+        info["torch_num_interop_threads"] = torch.get_num_interop_threads()
+    info["published_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    try:
+        _client().hset(WORKER_THREADS_KEY, hostname, json.dumps(info))
+    except redis.RedisError as exc:
+        logger.warning("Could not publish inference threads of %s: %s", hostname, exc)
+
+
+def forget_worker_threads(hostname: str) -> None:
+    try:
+        _client().hdel(WORKER_THREADS_KEY, hostname)
+    except redis.RedisError as exc:
+        logger.warning("Could not drop inference threads of %s: %s", hostname, exc)
+
+
+def worker_thread_configs() -> dict[str, dict[str, object]]:
+    """Thread settings published by running workers, by worker hostname."""
+    try:
+        published = _client().hgetall(WORKER_THREADS_KEY)
+    except redis.RedisError as exc:
+        logger.warning("Worker inference threads unavailable: %s", exc)
+        return {}
+    return {
+        hostname.decode("utf-8"): json.loads(payload)
+        for hostname, payload in sorted(published.items())
+    }
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import io
+from pathlib import Path
+import re
+import time
+from typing import IO
+import zipfile
+
+from apps.analysis.services.docx_ingest import docx_paragraphs
+from apps.analysis.services.timings import StageTimings
+
+SNIFF_BYTES = 512
+UNSUPPORTED_FORMAT_MESSAGE = "Формат файла не распознан: ожидается DOCX, RTF или TXT."
+
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class IngestFormat:
+    name: str
+    sniff: Callable[[bytes], bool]
+    read: Callable[[bytes], list[str]]
+    # Optional check of the whole (seekable) file once ``sniff`` accepted its head.
+    verify: Callable[[IO[bytes]], bool] | None = None
+
+
+def decode_text(data: bytes) -> str:
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp1251")
+
+
+def text_paragraphs(text: str, per_line: bool = False) -> list[str]:
+    """Blank-line separated blocks; one paragraph per line when there are no blank lines."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    blocks = text.split("\n") if per_line else re.split(r"\n[^\S\n]*\n", text)
+    if len(blocks) == 1:
+        blocks = text.split("\n")
+    chunks = (" ".join(block.split()) for block in blocks)
+    return [chunk for chunk in chunks if chunk]
+
+
+_RTF_TOKEN = re.compile(
+    r"\\([a-z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|(.)",
+    re.IGNORECASE | re.DOTALL,
+)
+_RTF_SKIP_DESTINATIONS = frozenset(
+    {
+        "colortbl",
+        "datastore",
+        "fonttbl",
+        "footer",
+        "footerl",
+        "footerr",
+        "generator",
+        "header",
+        "headerl",
+        "headerr",
+        "info",
+        "latentstyles",
+        "listoverridetable",
+        "listtable",
+        "object",
+        "pict",
+        "rsidtbl",
+        "stylesheet",
+        "themedata",
+        "xmlnstbl",
+    }
+)
+_RTF_CHARACTERS = {
+    "par": "\n",
+    "line": "\n",
+    "row": "\n",
+    "sect": "\n",
+    "page": "\n",
+    "tab": "\t",
+    "cell": " ",
+    "emdash": "—",
+    "endash": "–",
+    "lquote": "‘",
+    "rquote": "’",
+    "ldblquote": "“",
+    "rdblquote": "”",
+    "bullet": "•",
+}
+
+
+def rtf_to_text(data: bytes) -> str:
+    """Plain text of an RTF document; formatting and non-text destinations are dropped."""
+    codepage = "cp1251"
+    stack: list[tuple[int, bool]] = []
+    ignorable = False
+    unicode_skip = 1
+    pending_skip = 0
+    out: list[str] = []
+
+    def emit(value: str) -> None:
+        nonlocal pending_skip
+        if pending_skip:
+            pending_skip -= 1
+        elif not ignorable:
+            out.append(value)
+
+    for match in _RTF_TOKEN.finditer(data.decode("latin-1")):
+        word, argument, hex_code, symbol, brace, char = match.groups()
+        if brace:
+            pending_skip = 0
+            if brace == "{":
+                stack.append((unicode_skip, ignorable))
+            elif stack:
+                unicode_skip, ignorable = stack.pop()
+        elif symbol:
+            pending_skip = 0
+            if symbol == "*":
+                ignorable = True
+            elif symbol == "~":
+                emit("\xa0")
+            elif symbol in "{}\\":
+                emit(symbol)
+            elif symbol in "\r\n":
+                emit("\n")
+        elif word:
+            pending_skip = 0
+            if word in _RTF_SKIP_DESTINATIONS:
+                ignorable = True
+            elif word == "ansicpg" and argument:
+                codepage = f"cp{argument}"
+            elif word == "uc" and argument:
+                unicode_skip = int(argument)
+            elif word == "u" and argument:
+                code = int(argument)
+                emit(chr(code + 0x10000 if code < 0 else code))
+                pending_skip = unicode_skip
+            elif word in _RTF_CHARACTERS:
+                emit(_RTF_CHARACTERS[word])
+        elif hex_code:
+            emit(bytes([int(hex_code, 16)]).decode(codepage, errors="replace"))
+        elif char:
+            emit(char.encode("latin-1").decode(codepage, errors="replace"))
+    return "".join(out)
+
+
+# Leading bytes of common binary formats; cp1251 would decode them as text otherwise.
+BINARY_SIGNATURES = (
+    b"%PDF",
+    b"\xff\xd8\xff",  # JPEG
+    b"\x89PNG",
+    b"GIF8",
+    b"\xd0\xcf\x11\xe0",  # OLE: legacy .doc/.xls
+    b"\x1f\x8b",  # gzip
+    b"Rar!",
+    b"7z\xbc\xaf",
+    b"\x7fELF",
+    b"II*\x00",  # TIFF
+    b"MM\x00*",
+)
+_TEXT_CONTROLS = {"\t", "\n", "\r", "\f"}
+
+
+def _printable(text: str) -> bool:
+    return not any(ord(char) < 32 and char not in _TEXT_CONTROLS for char in text)
+
+
+def _is_text(head: bytes) -> bool:
+    if b"\x00" in head or head.startswith(BINARY_SIGNATURES):
+        return False
+    try:
+        return _printable(head.decode("utf-8-sig"))
+    except UnicodeDecodeError as exc:
+        # A multi-byte character cut at the sniff boundary is still UTF-8.
+        if exc.reason == "unexpected end of data":
+            return _printable(head[: exc.start].decode("utf-8-sig"))
+    try:
+        # cp1251 maps almost every byte to a letter; control characters give binary away.
+        return _printable(head.decode("cp1251"))
+    except UnicodeDecodeError:
+        return False
+
+
+def _is_docx(source: IO[bytes]) -> bool:
+    # Any ZIP (xlsx, odt, plain archives) shares the head; only DOCX has the main part.
+    try:
+        with zipfile.ZipFile(source) as archive:
+            return "word/document.xml" in archive.namelist()
+    except zipfile.BadZipFile:
+        return False
+
+
+INGEST_FORMATS: list[IngestFormat] = [
+    IngestFormat(
+        "docx",
+        lambda head: head.startswith(b"PK\x03\x04"),
+        lambda data: docx_paragraphs(io.BytesIO(data)),
+        verify=_is_docx,
+    ),
+    IngestFormat(
+        "rtf",
+        lambda head: head.lstrip().startswith(b"{\\rtf"),
+        lambda data: text_paragraphs(rtf_to_text(data), per_line=True),
+    ),
+    IngestFormat("txt", _is_text, lambda data: text_paragraphs(decode_text(data))),
+]
+
+
+def register_format(ingest_format: IngestFormat) -> None:
+    """Add a reader; formats registered later are sniffed before the built-in ones."""
+    INGEST_FORMATS.insert(0, ingest_format)
+
+
+def detect_format(head: bytes) -> IngestFormat | None:
+    for ingest_format in INGEST_FORMATS:
+        if ingest_format.sniff(head):
+            return ingest_format
+    return None
+
+
+def detect_upload(source: IO[bytes]) -> IngestFormat:
+    """Format of a whole seekable upload: its head, then the format's own check.
+
+    Raises ``UnsupportedFormatError`` if no format accepts it.
+    """
+    head = source.read(SNIFF_BYTES)
+    source.seek(0)
+    ingest_format = detect_format(head)
+    if ingest_format is not None and ingest_format.verify is not None:
+        verified = ingest_format.verify(source)
+        source.seek(0)
+        if not verified:
+            ingest_format = None
+    if ingest_format is None:
+        raise UnsupportedFormatError(UNSUPPORTED_FORMAT_MESSAGE)
+    return ingest_format
+
+
+class IngestService:
+    """Reads summary paragraphs from DOCX, RTF or plain text, chosen by content sniffing."""
+
+    def __init__(self, timings: StageTimings | None = None) -> None:
+        self.timings = timings or StageTimings()
+
+    def read_paragraphs(self, path: str | Path) -> list[str]:
+        return self.read_bytes(Path(path).read_bytes())
+
+    def read_bytes(self, data: bytes) -> list[str]:
+        start = time.perf_counter()
+        ingest_format = detect_upload(io.BytesIO(data))
+        paragraphs = ingest_format.read(data)
+        self.timings.record("ingest", time.perf_counter() - start, len(paragraphs))
+        return paragraphs
@@ -3,6 +3,7 @@ from __future__ import annotations
 from apps.analysis.dto import ExtractedEvent
 from apps.analysis.services.compare import CompareService
 from apps.analysis.services.portal_repo import PortalRepository
+from apps.analysis.services.timings import StageTimings
 from django.conf import settings
 
 from apps.analysis.services.semantic import (
@@ -17,10 +18,12 @@ class MatchService:
         semantic_service: SubdivisionSemanticService,
         portal_repo: PortalRepository,
         event_type_service: EventTypeSemanticService,
+        timings: StageTimings | None = None,
     ) -> None:
+        self.timings = timings or StageTimings()
         self.semantic_service = semantic_service
         self.portal_repo = portal_repo
-        self.compare_service = CompareService()
+        self.compare_service = CompareService(timings=self.timings)
         self.event_type_service = event_type_service
 
     def match_event(self, extracted: ExtractedEvent) -> dict:
@@ -35,7 +38,8 @@ class MatchService:
         if not subdivision_source and extracted.raw_text:
             subdivision_source = extracted.raw_text[:200].strip()
         if subdivision_source:
-            subdivision_match = self.semantic_service.match(subdivision_source)
+            with self.timings.stage("subdivision_match"):
+                subdivision_match = self.semantic_service.match(subdivision_source)
             extracted.subdivision_name = (
                 subdivision_match.subdivision.full_name
                 if subdivision_match.subdivision
@@ -54,12 +58,14 @@ class MatchService:
             window,
             offenders_min_overlap=offenders_min_overlap,
         )
-        event_type_result = self._match_event_type(
-            extracted.raw_text, candidates, result.get("primary_match_id"), event_type_threshold
-        )
+        with self.timings.stage("event_type_match"):
+            event_type_result = self._match_event_type(
+                extracted.raw_text,
+                candidates,
+                result.get("primary_match_id"),
+                event_type_threshold,
+            )
         result["event_type"] = event_type_result
-        if result["duplicates_count"] > 1:
-            result["message"] = f"Найдено несколько записей: {result['duplicates_count']}"
         return result
 
     def _settings(self) -> dict[str, float]:
@@ -105,19 +111,14 @@ class MatchService:
 
         if detected and stored:
             if detected == stored:
-                message = "Совпадает с записью в БД"
                 status = "match"
             else:
-                message = "Несовпадение: в БД указан другой тип события"
                 status = "mismatch"
         elif detected and not stored:
-            message = "В БД не задан, определен автоматически"
             status = "detected_only"
         elif stored and not detected:
-            message = "В БД задан, но не подтверждён автоматически"
             status = "stored_only"
         else:
-            message = "Не удалось идентифицировать"
             status = "none"
 
         return {
@@ -125,5 +126,4 @@ class MatchService:
             "detected_score": detected_score,
             "stored": stored,
             "status": status,
-            "message": message,
         }
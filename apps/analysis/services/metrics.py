@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import logging
+import os
+
+import redis
+from django.conf import settings
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_DURATION_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 900)
+THROUGHPUT_BUCKETS = (0.5, 1, 2, 5, 10, 20, 50, 100)
+COUNT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+JOBS = Counter("analysis_jobs_total", "Finished analysis jobs.", ["status"])
+JOB_DURATION = Histogram(
+    "analysis_job_duration_seconds", "Analysis job wall time.", buckets=JOB_DURATION_BUCKETS
+)
+PARAGRAPHS = Counter("analysis_paragraphs_total", "Processed summary paragraphs.")
+JOB_THROUGHPUT = Histogram(
+    "analysis_job_paragraphs_per_second",
+    "Paragraphs processed per second, per job.",
+    buckets=THROUGHPUT_BUCKETS,
+)
+STAGE_DURATION = Histogram(
+    "analysis_stage_duration_seconds",
+    "Pipeline stage latency per call.",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+ENCODE_BATCH_SIZE = Histogram(
+    "semantic_encode_batch_size",
+    "Texts sent to model.encode after the embedding cache.",
+    buckets=COUNT_BUCKETS,
+)
+EMBEDDING_CACHE_LOOKUPS = Counter(
+    "semantic_embedding_cache_lookups_total",
+    "Embedding cache lookups by outcome.",
+    ["result"],
+)
+ALIAS_LOOKUPS = Counter(
+    "semantic_subdivision_alias_lookups_total",
+    "Exact subdivision alias lookups by outcome.",
+    ["result"],
+)
+OFFENDER_EVALUATIONS = Counter(
+    "analysis_offender_evaluations_total",
+    "Candidate offender overlap evaluations in compare, evaluated or skipped.",
+    ["result"],
+)
+JOB_WAIT = Histogram(
+    "analysis_job_wait_seconds",
+    "Time from enqueue to start of a job, per queue.",
+    ["queue"],
+    buckets=JOB_DURATION_BUCKETS,
+)
+JOB_DEFERRALS = Counter(
+    "analysis_job_deferrals_total",
+    "Job starts postponed because the owner hit the per-user running limit.",
+)
+PORTAL_QUERY_DURATION = Histogram(
+    "portal_query_duration_seconds",
+    "find_candidates query latency.",
+    buckets=LATENCY_BUCKETS,
+)
+PORTAL_CANDIDATES = Histogram(
+    "portal_query_candidates",
+    "Portal events returned by find_candidates.",
+    buckets=COUNT_BUCKETS,
+)
+RESULT_SIZE = Histogram(
+    "analysis_result_size_bytes",
+    "Serialized job result stored in Redis.",
+    buckets=SIZE_BUCKETS,
+)
+
+
+def observe_job(
+    status: str,
+    metrics: dict | None = None,
+    samples: dict[str, list[float]] | None = None,
+) -> None:
+    JOBS.labels(status=status).inc()
+    if metrics:
+        JOB_DURATION.observe(float(metrics.get("total_ms", 0.0)) / 1000)
+        PARAGRAPHS.inc(int(metrics.get("paragraphs", 0)))
+        JOB_THROUGHPUT.observe(float(metrics.get("paragraphs_per_s", 0.0)))
+    for stage, values in (samples or {}).items():
+        histogram = STAGE_DURATION.labels(stage=stage)
+        for seconds in values:
+            histogram.observe(seconds)
+
+
+def queue_names() -> list[str]:
+    return list(getattr(settings, "METRICS_QUEUE_NAMES", None) or ["celery"])
+
+
+class QueueDepthCollector:
+    """Reads Celery queue lengths from the Redis broker at scrape time."""
+
+    def collect(self):
+        gauge = GaugeMetricFamily(
+            "analysis_queue_depth", "Tasks waiting in the Celery queue.", labels=["queue"]
+        )
+        try:
+            client = redis.Redis.from_url(settings.CELERY_BROKER_URL)
+            for queue in queue_names():
+                gauge.add_metric([queue], client.llen(queue))
+        except redis.RedisError as exc:
+            logger.warning("Queue depth unavailable: %s", exc)
+        yield gauge
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def process_registry() -> CollectorRegistry:
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics(include_queue_depth: bool = True) -> tuple[bytes, str]:
+    payload = generate_latest(process_registry())
+    if include_queue_depth:
+        queue_registry = CollectorRegistry()
+        queue_registry.register(QueueDepthCollector())
+        payload += generate_latest(queue_registry)
+    return payload, CONTENT_TYPE_LATEST
+
+
+def start_worker_exporter(port: int) -> None:
+    if port <= 0:
+        return
+    start_http_server(port, registry=process_registry())
+    logger.info("Worker metrics exporter listening on port %s", port)
+
+
+def mark_process_dead(pid: int) -> None:
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import inspect
+import json
+import logging
+from pathlib import Path
+import shutil
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILE = "model.int8.onnx"
+ONNX_MANIFEST_FILE = "onnx_manifest.json"
+ONNX_OPSET = 17
+
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as exc:
+        raise ValueError(
+            "SEMANTIC_MODEL_BACKEND=onnx requires onnxruntime. "
+            "Install requirements.onnx.txt or switch the backend to torch."
+        ) from exc
+    return onnxruntime
+
+
+def onnx_export_dir(cache_dir: str | Path, model_name: str, revision: str | None) -> Path:
+    slug = model_name.strip("/").replace("/", "--")
+    return Path(cache_dir) / "onnx" / f"models--{slug}" / (revision or "default")
+
+
+def read_manifest(export_dir: Path) -> dict | None:
+    manifest_path = export_dir / ONNX_MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    try:
+        return json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def export_is_ready(export_dir: Path, quantize: bool) -> bool:
+    manifest = read_manifest(export_dir)
+    if not manifest:
+        return False
+    model_file = ONNX_QUANTIZED_MODEL_FILE if quantize else ONNX_MODEL_FILE
+    return (export_dir / model_file).exists() and (export_dir / "tokenizer").exists()
+
+
+def export_onnx_model(
+    model,
+    export_dir: Path,
+    source: str,
+    revision: str | None,
+    quantize: bool,
+) -> Path:
+    import torch
+
+    transformer = model[0]
+    auto_model = transformer.auto_model
+    tokenizer = transformer.tokenizer
+    export_dir.mkdir(parents=True, exist_ok=True)
+    tmp_dir = export_dir.with_name(export_dir.name + ".tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+
+    sample = tokenizer(["пограничная застава"], return_tensors="pt")
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample
+    ]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    class _KeywordInputs(torch.nn.Module):
+        def __init__(self, wrapped) -> None:
+            super().__init__()
+            self.wrapped = wrapped
+
+        def forward(self, *inputs):
+            return self.wrapped(**dict(zip(input_names, inputs)), return_dict=True)[0]
+
+    export_kwargs: dict[str, object] = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False
+    auto_model.eval()
+    with torch.no_grad():
+        torch.onnx.export(
+            _KeywordInputs(auto_model),
+            tuple(sample[name] for name in input_names),
+            str(tmp_dir / ONNX_MODEL_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+            **export_kwargs,
+        )
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(
+            str(tmp_dir / ONNX_MODEL_FILE),
+            str(tmp_dir / ONNX_QUANTIZED_MODEL_FILE),
+            weight_type=QuantType.QInt8,
+        )
+    tokenizer.save_pretrained(str(tmp_dir / "tokenizer"))
+
+    pooling_mode = "mean"
+    if len(model) > 1 and getattr(model[1], "pooling_mode_cls_token", False):
+        pooling_mode = "cls"
+    manifest = {
+        "source": source,
+        "revision": revision,
+        "quantized": quantize,
+        "opset": ONNX_OPSET,
+        "input_names": input_names,
+        "pooling_mode": pooling_mode,
+        "max_seq_length": int(getattr(model, "max_seq_length", 128) or 128),
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+    }
+    (tmp_dir / ONNX_MANIFEST_FILE).write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    shutil.rmtree(export_dir, ignore_errors=True)
+    tmp_dir.rename(export_dir)
+    logger.info(
+        "Exported semantic model %s to ONNX at %s (quantized=%s).",
+        source,
+        export_dir,
+        quantize,
+    )
+    return export_dir
+
+
+class OnnxSentenceEncoder:
+    def __init__(
+        self,
+        session,
+        tokenizer,
+        input_names: list[str],
+        pooling_mode: str = "mean",
+        max_seq_length: int = 128,
+    ) -> None:
+        self.session = session
+        self.tokenizer = tokenizer
+        self.input_names = input_names
+        self.pooling_mode = pooling_mode
+        self.max_seq_length = max_seq_length
+
+    @classmethod
+    def from_directory(
+        cls,
+        export_dir: Path,
+        quantize: bool,
+        intra_op_threads: int | None = None,
+        inter_op_threads: int | None = None,
+    ) -> "OnnxSentenceEncoder":
+        onnxruntime = _import_onnxruntime()
+        from transformers import AutoTokenizer
+
+        manifest = read_manifest(export_dir) or {}
+        model_file = ONNX_QUANTIZED_MODEL_FILE if quantize else ONNX_MODEL_FILE
+        options = onnxruntime.SessionOptions()
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            options.inter_op_num_threads = inter_op_threads
+        session = onnxruntime.InferenceSession(
+            str(export_dir / model_file),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+        tokenizer = AutoTokenizer.from_pretrained(str(export_dir / "tokenizer"))
+        return cls(
+            session=session,
+            tokenizer=tokenizer,
+            input_names=list(manifest.get("input_names") or ["input_ids", "attention_mask"]),
+            pooling_mode=manifest.get("pooling_mode", "mean"),
+            max_seq_length=int(manifest.get("max_seq_length") or 128),
+        )
+
+    def encode(
+        self,
+        sentences: str | list[str],
+        normalize_embeddings: bool = False,
+        batch_size: int = 32,
+        **_kwargs,
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        batches: list[np.ndarray] = []
+        for start in range(0, len(texts), batch_size):
+            batches.append(self._encode_batch(texts[start:start + batch_size]))
+        embeddings = np.concatenate(batches, axis=0)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.clip(norms, 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        encoded = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feed = {
+            name: np.asarray(encoded[name], dtype=np.int64)
+            for name in self.input_names
+            if name in encoded
+        }
+        token_embeddings = self.session.run(None, feed)[0]
+        if self.pooling_mode == "cls":
+            return token_embeddings[:, 0].astype(np.float32)
+        mask = np.asarray(encoded["attention_mask"], dtype=np.float32)[..., None]
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        return (summed / counts).astype(np.float32)
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from django.conf import settings
+
+from apps.analysis.dto import ExtractedEvent
+from apps.analysis.services.extract import ExtractService
+from apps.analysis.services.match import MatchService
+from apps.analysis.services.portal_repo import PortalRepository
+from apps.analysis.services.semantic import (
+    EventTypeSemanticService,
+    SubdivisionSemanticService,
+    generate_candidates,
+)
+from apps.analysis.services.timings import StageTimings
+
+
+class AnalysisPipeline:
+    """Extract → match → compare for single paragraphs, sharing one set of services."""
+
+    def __init__(self, timings: StageTimings | None = None) -> None:
+        self.timings = timings or StageTimings()
+        with self.timings.stage("setup"):
+            self.extract_service = ExtractService(timings=self.timings)
+            self.semantic_service = SubdivisionSemanticService(settings.SEMANTIC_MODEL_NAME)
+            self.portal_repo = PortalRepository(timings=self.timings)
+            self.event_type_service = EventTypeSemanticService(settings.SEMANTIC_MODEL_NAME)
+            self.match_service = MatchService(
+                self.semantic_service,
+                self.portal_repo,
+                self.event_type_service,
+                timings=self.timings,
+            )
+
+    def extract(self, index: int, paragraph: str) -> ExtractedEvent:
+        attrs = self.extract_service.extract(paragraph)
+        return ExtractedEvent(
+            paragraph_index=index,
+            raw_text=paragraph,
+            timestamp=attrs.timestamp,
+            timestamp_has_time=attrs.timestamp_has_time,
+            timestamp_text=attrs.timestamp_text,
+            subdivision_text=attrs.subdivision_text,
+            subdivision_name=None,
+            subdivision_similarity=None,
+            offenders=attrs.offenders,
+            timestamp_span=attrs.timestamp_span,
+            subdivision_span=attrs.subdivision_span,
+        )
+
+    def match(self, extracted: ExtractedEvent) -> dict:
+        return self.match_service.match_event(extracted)
+
+    def process(self, index: int, paragraph: str) -> dict:
+        return self.match(self.extract(index, paragraph))
+
+    def prefetch_embeddings(self, events: list[ExtractedEvent]) -> None:
+        """Encode every text the matchers will ask for in one batch to warm the cache."""
+        subdivision_texts: list[str] = []
+        event_texts: list[str] = []
+        for extracted in events:
+            source = extracted.subdivision_text or (extracted.raw_text or "")[:200].strip()
+            if source:
+                subdivision_texts.extend(generate_candidates(source))
+            if extracted.raw_text:
+                event_texts.append(extracted.raw_text)
+        with self.timings.stage("prefetch", len(subdivision_texts) + len(event_texts)):
+            if subdivision_texts:
+                self.semantic_service.model.encode(
+                    list(dict.fromkeys(subdivision_texts)), normalize_embeddings=True
+                )
+            if event_texts:
+                self.event_type_service.model.encode(
+                    list(dict.fromkeys(event_texts)), normalize_embeddings=True
+                )
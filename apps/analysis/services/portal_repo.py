@@ -2,17 +2,49 @@ from __future__ import annotations
 
 from datetime import date, datetime, timedelta
 import json
+import time
 
 from django.db import connections
 
-from apps.analysis.dto import Offender, PortalEvent
+from apps.analysis.dto import LazyOffenders, Offender, PortalEvent
+from apps.analysis.services import metrics
+from apps.analysis.services.compare import dedupe_offenders
 from apps.analysis.services.portal_queries import get_portal_query
+from apps.analysis.services.timings import StageTimings
+
+
+class StringInternTable:
+    """Shares one str object per distinct subdivision name / event type across fetches."""
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._values: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def intern(self, value: str | None) -> str | None:
+        if value is None:
+            return None
+        existing = self._values.get(value)
+        if existing is not None:
+            return existing
+        if len(self._values) >= self.max_entries:
+            return value
+        self._values[value] = value
+        return value
 
 
 class PortalRepository:
+    _strings = StringInternTable()
+
+    def __init__(self, timings: StageTimings | None = None) -> None:
+        self.timings = timings or StageTimings()
+
     def fetch_candidates(
         self, timestamp: datetime | None, window_minutes: int
     ) -> list[PortalEvent]:
+        start = time.perf_counter()
         events: list[PortalEvent] = []
         with connections["portal"].cursor() as cursor:
             find_candidates_query = get_portal_query("find_candidates")
@@ -34,6 +66,7 @@ class PortalRepository:
                     "limit": 200,
                 },
             )
+            intern = self._strings.intern
             for (
                 event_id,
                 detected_at,
@@ -42,21 +75,27 @@ class PortalRepository:
                 offenders_payload,
                 event_type_name,
             ) in cursor.fetchall():
-                event_key = str(event_id)
-                offenders = self._parse_offenders(offenders_payload)
+                subdivision_name = intern(subdivision_fullname)
                 events.append(
                     PortalEvent(
-                        event_id=event_key,
+                        event_id=str(event_id),
                         date_detection=detected_at,
-                        subdivision_name=subdivision_fullname,
-                        subdivision_short_name=subdivision_fullname,
-                        subdivision_full_name=subdivision_fullname,
-                        offenders=offenders,
-                        event_type_name=event_type_name,
+                        subdivision_name=subdivision_name,
+                        subdivision_short_name=subdivision_name,
+                        subdivision_full_name=subdivision_name,
+                        offenders=LazyOffenders(offenders_payload, self._load_offenders),
+                        event_type_name=intern(event_type_name),
                     )
                 )
+        elapsed = time.perf_counter() - start
+        self.timings.record("portal_query", elapsed, len(events))
+        metrics.PORTAL_QUERY_DURATION.observe(elapsed)
+        metrics.PORTAL_CANDIDATES.observe(len(events))
         return events
 
+    def _load_offenders(self, payload) -> list[Offender]:
+        return dedupe_offenders(self._parse_offenders(payload))
+
     def _parse_offenders(self, payload) -> list[Offender]:
         offenders: list[Offender] = []
         if not payload:
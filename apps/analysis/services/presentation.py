@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import html
+import os
+
+from apps.analysis.services.semantic import normalize_subdivision
+
+HIGHLIGHT_CLASSES = {
+    "+": "highlight-plus",
+    "!": "highlight-warn",
+    "-": "highlight-fail",
+}
+
+EVENT_TYPE_MESSAGES = {
+    "match": "Совпадает с записью в БД",
+    "mismatch": "Несовпадение: в БД указан другой тип события",
+    "detected_only": "В БД не задан, определен автоматически",
+    "stored_only": "В БД задан, но не подтверждён автоматически",
+    "none": "Не удалось идентифицировать",
+}
+
+EMPTY_ATTRIBUTE_VALUES = {
+    "subdivision": "не определено",
+    "offenders": "не указаны/не обнаружены",
+}
+
+
+def _is_truthy(value: str | None) -> bool:
+    if value is None:
+        return False
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _show_debug_extract() -> bool:
+    return _is_truthy(os.environ.get("DEBUG")) or _is_truthy(
+        os.environ.get("SHOW_DEBUG_EXTRACT")
+    )
+
+
+def highlight_spans(
+    raw_text: str, highlights: list[tuple[tuple[int, int] | None, str | None]]
+) -> str:
+    """Escape ``raw_text`` and wrap each ``(start, end)`` span in a single left-to-right pass.
+
+    Spans never nest: on overlap the span starting first (the longer one on a tie)
+    wins and the other keeps only the part after it.
+    """
+    ordered = sorted(
+        (span[0], -span[1], status)
+        for span, status in highlights
+        if span and status and span[0] < span[1]
+    )
+    parts: list[str] = []
+    cursor = 0
+    for start, negative_end, status in ordered:
+        end = -negative_end
+        start = max(start, cursor)
+        if start >= end:
+            continue
+        class_name = HIGHLIGHT_CLASSES.get(status, "highlight-none")
+        parts.append(html.escape(raw_text[cursor:start]))
+        parts.append(
+            f'<span class="highlight {class_name}">{html.escape(raw_text[start:end])}</span>'
+        )
+        cursor = end
+    parts.append(html.escape(raw_text[cursor:]))
+    return "".join(parts)
+
+
+def _highlighted_text(item: dict) -> str:
+    extracted = item.get("extracted") or {}
+    spans = extracted.get("spans") or {}
+    attributes = item.get("attributes") or {}
+
+    def status(key: str) -> str | None:
+        return (attributes.get(key) or {}).get("status")
+
+    highlights = [
+        (spans.get("timestamp"), status("timestamp")),
+        (spans.get("subdivision"), status("subdivision")),
+    ]
+    highlights.extend((span, status("offenders")) for span in spans.get("offenders") or [])
+    return highlight_spans(extracted.get("raw_text") or "", highlights)
+
+
+def _match_lines(item: dict) -> list[str]:
+    primary = item.get("primary_match")
+    if not primary:
+        return []
+    matched_flags = [
+        name
+        for name, flag in (
+            ("time", primary.get("time_match")),
+            ("subdivision", primary.get("subdivision_match")),
+            ("offenders", primary.get("offenders_match")),
+        )
+        if flag
+    ]
+    lines = ["Определено по: " + (", ".join(matched_flags) or "нет")]
+    if primary.get("time_delta") is not None:
+        lines.append(f"Δt: {round(float(primary['time_delta']))} мин")
+    event_id = item.get("primary_match_id")
+    match = next(
+        (match for match in item.get("matches") or [] if match.get("event_id") == event_id),
+        {},
+    )
+    portal_offenders = ", ".join(match.get("offenders") or [])
+    lines.append(
+        f"Нарушители в БД портала (event_id={event_id}): "
+        f"{portal_offenders or 'не указаны/не обнаружены'}"
+    )
+    return lines
+
+
+def _attributes(item: dict) -> dict:
+    attributes = {key: dict(value or {}) for key, value in (item.get("attributes") or {}).items()}
+    timestamp = attributes.get("timestamp")
+    if timestamp and timestamp.get("time_missing") and timestamp.get("value"):
+        timestamp["value"] = f"{timestamp['value']} (время отсутствует)"
+    for key, placeholder in EMPTY_ATTRIBUTE_VALUES.items():
+        if key in attributes and not attributes[key].get("value"):
+            attributes[key]["value"] = placeholder
+    return attributes
+
+
+def _dob_note(entry: dict | str) -> str:
+    # Results stored before the facts were structured keep the finished sentence.
+    if isinstance(entry, str):
+        return entry
+    name = entry.get("name")
+    if entry.get("status") == "missing_extracted":
+        return f"{name}: в сводке ДР не указана"
+    if entry.get("status") == "missing_portal":
+        return f"{name}: в БД ДР не указана"
+    extracted = entry.get("extracted_dob") or "-"
+    stored = ", ".join(entry.get("stored_dobs") or []) or "-"
+    return f"Несовпадение ДР для {name}: извлечено {extracted}, в БД {stored}"
+
+
+def _notes(item: dict) -> list[str]:
+    extracted = item.get("extracted") or {}
+    offenders = extracted.get("offenders") or []
+    lines = [f"Нарушители в сводке: {', '.join(offenders) or 'не указаны/не обнаружены'}"]
+    overlap = item.get("offenders_overlap")
+    if offenders:
+        if overlap and overlap.get("total"):
+            percent = ((item.get("attributes") or {}).get("offenders") or {}).get("percent")
+            lines.append(
+                f"Совпадение нарушителей: {round(percent or 0.0, 2)}% "
+                f"(совпало {overlap['matched']} из {overlap['total']})"
+            )
+            if overlap["matched"] == 0:
+                lines.append("Возможная ошибка внесения нарушителей в БД (0% совпадения)")
+    else:
+        lines.append("Совпадение нарушителей: n/a")
+    if item.get("subdivision_below_threshold"):
+        lines.append("Подразделение не удалось определить (ниже порога)")
+    subdivision_text = extracted.get("subdivision_text")
+    if _show_debug_extract() and subdivision_text:
+        lines.append(f"subdivision_raw: {subdivision_text}")
+        lines.append(f"subdivision_norm: {normalize_subdivision(subdivision_text)}")
+
+    diff = ((item.get("attributes") or {}).get("offenders") or {}).get("diff") or {}
+    if diff.get("missing"):
+        lines.append(f"Отсутствуют в извлечении: {', '.join(diff['missing'])}")
+    if diff.get("mismatch"):
+        lines.append("; ".join(_dob_note(entry) for entry in diff["mismatch"]))
+    if diff.get("extra"):
+        lines.append(f"Лишние в извлечении: {', '.join(diff['extra'])}")
+    return lines
+
+
+def render_item(item: dict) -> dict:
+    """Add the HTML and Russian wording the result page shows to a stored result item.
+
+    Items stored before rendering moved out of the worker already carry these
+    fields and are returned unchanged.
+    """
+    if "highlighted_text" in item:
+        return item
+    rendered = dict(item)
+    rendered["highlighted_text"] = _highlighted_text(item)
+    rendered["attributes"] = _attributes(item)
+    rendered["match_lines"] = _match_lines(item)
+    rendered["notes"] = _notes(item)
+    rendered["explanation"] = rendered["match_lines"] + rendered["notes"]
+    duplicates_count = item.get("duplicates_count") or 0
+    if duplicates_count > 1 and not item.get("message"):
+        rendered["message"] = f"Найдено несколько записей: {duplicates_count}"
+    event_type = item.get("event_type")
+    if event_type and "message" not in event_type:
+        rendered["event_type"] = {
+            **event_type,
+            "message": EVENT_TYPE_MESSAGES.get(event_type.get("status"), ""),
+        }
+    return rendered
+
+
+def render_items(items: list[dict]) -> list[dict]:
+    return [render_item(item) for item in items]
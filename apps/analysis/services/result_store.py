@@ -5,10 +5,23 @@ from datetime import date, datetime
 from dataclasses import asdict
 from typing import Any
 from uuid import UUID
+import zlib
 
+import msgpack
 import redis
 from django.conf import settings
 
+from apps.analysis.services import metrics
+
+RESULT_MAGIC = b"ARS"
+# Version 1 is the original headerless UTF-8 JSON; version 2 is zlib-compressed msgpack.
+RESULT_SCHEMA_VERSION = 2
+SUBMISSION_PENDING = {"pending": True}
+
+
+class JobCancelled(Exception):
+    """Raised inside a task once its job has been cancelled."""
+
 
 class ResultStore:
     @staticmethod
@@ -21,31 +34,177 @@ class ResultStore:
             return str(value)
         raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
+    @classmethod
+    def encode_result(cls, result: dict[str, Any], encoding: str = "msgpack") -> bytes:
+        if encoding == "json":
+            return json.dumps(result, ensure_ascii=False, default=cls._json_serializer).encode(
+                "utf-8"
+            )
+        # Level 1 deflate folds the keys repeated in every item at C speed.
+        body = msgpack.packb(result, default=cls._json_serializer)
+        return RESULT_MAGIC + bytes([RESULT_SCHEMA_VERSION]) + zlib.compress(body, 1)
+
+    @staticmethod
+    def decode_result(payload: bytes) -> dict[str, Any]:
+        if not payload.startswith(RESULT_MAGIC):
+            return json.loads(payload)
+        version = payload[len(RESULT_MAGIC)]
+        if version != RESULT_SCHEMA_VERSION:
+            raise ValueError(f"Unsupported result schema version: {version}")
+        body = zlib.decompress(payload[len(RESULT_MAGIC) + 1 :])
+        return msgpack.unpackb(body, strict_map_key=False)
+
     def __init__(self) -> None:
-        self.client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        # Results are binary, so values are decoded per field rather than by the client.
+        self.client = redis.Redis.from_url(settings.REDIS_URL)
         self.ttl = settings.RESULT_TTL_SECONDS
+        self.encoding = getattr(settings, "RESULT_ENCODING", "msgpack")
 
-    def create_job(self, job_id: str) -> None:
-        self.client.hset(job_id, mapping={"status": "pending", "progress": 0})
+    def create_job(
+        self, job_id: str, owner: str | None = None, filename: str | None = None
+    ) -> None:
+        mapping = {"status": "pending", "progress": 0}
+        if owner:
+            mapping["owner"] = owner
+        if filename:
+            mapping["filename"] = filename
+        self.client.hset(job_id, mapping=mapping)
         self.client.expire(job_id, self.ttl)
 
     def update_progress(self, job_id: str, status: str, progress: int) -> None:
         self.client.hset(job_id, mapping={"status": status, "progress": progress})
         self.client.expire(job_id, self.ttl)
 
+    def record_delivery(self, job_id: str) -> int:
+        """Count one more delivery of the job's task and return the total."""
+        deliveries = self.client.hincrby(job_id, "deliveries", 1)
+        self.client.expire(job_id, self.ttl)
+        return deliveries
+
+    def reset_deliveries(self, job_id: str) -> None:
+        self.client.hdel(job_id, "deliveries")
+
+    def mark_failed(self, job_id: str) -> None:
+        """Mark the job failed for good; its checkpoints will never be resumed."""
+        self.client.hset(job_id, mapping={"status": "failed"})
+        self.client.expire(job_id, self.ttl)
+        self.client.delete(self._checkpoint_key(job_id))
+
     def set_result(self, job_id: str, result: dict[str, Any]) -> None:
-        payload = json.dumps(result, ensure_ascii=False, default=self._json_serializer)
+        payload = self.encode_result(result, self.encoding)
+        metrics.RESULT_SIZE.observe(len(payload))
         self.client.hset(job_id, mapping={"status": "done", "progress": 100, "result": payload})
         self.client.expire(job_id, self.ttl)
+        self.client.delete(self._checkpoint_key(job_id))
+
+    @staticmethod
+    def _checkpoint_key(job_id: str) -> str:
+        return f"checkpoint:{job_id}"
+
+    def save_chunk(
+        self, job_id: str, chunk_size: int, chunk_index: int, items: list[dict[str, Any]]
+    ) -> None:
+        """Checkpoint the results of one finished chunk of paragraphs."""
+        key = self._checkpoint_key(job_id)
+        payload = self.encode_result({"items": items}, self.encoding)
+        self.client.hset(key, mapping={"chunk_size": chunk_size, chunk_index: payload})
+        self.client.expire(key, self.ttl)
+
+    def load_chunks(self, job_id: str, chunk_size: int) -> dict[int, list[dict[str, Any]]]:
+        """Checkpointed chunks by index; empty if they were cut with another chunk size."""
+        data = self.client.hgetall(self._checkpoint_key(job_id))
+        if int(data.pop(b"chunk_size", 0)) != chunk_size:
+            return {}
+        return {int(field): self.decode_result(payload)["items"] for field, payload in data.items()}
 
     def get(self, job_id: str) -> dict[str, Any]:
         data = self.client.hgetall(job_id)
-        result = data.get("result")
+        status = data.get(b"status")
+        result = data.get(b"result")
+        return {
+            "status": status.decode("utf-8") if status is not None else None,
+            "progress": int(data.get(b"progress", 0)),
+            "result": self.decode_result(result) if result else None,
+        }
+
+    def job_meta(self, job_id: str) -> dict[str, str]:
+        """Bookkeeping fields of the job hash (owner, filename, queue...), without the result."""
         return {
-            "status": data.get("status"),
-            "progress": int(data.get("progress", 0)),
-            "result": json.loads(result) if result else None,
+            field.decode("utf-8"): value.decode("utf-8")
+            for field, value in self.client.hgetall(job_id).items()
+            if field != b"result"
         }
 
+    @classmethod
+    def dumps_json(cls, result: dict[str, Any]) -> str:
+        return json.dumps(result, ensure_ascii=False, indent=2, default=cls._json_serializer)
+
+    def export_json(self, job_id: str) -> str | None:
+        result = self.client.hget(job_id, "result")
+        if not result:
+            return None
+        return self.dumps_json(self.decode_result(result))
+
+    @staticmethod
+    def _submission_key(idempotency_key: str) -> str:
+        return f"idempotency:{idempotency_key}"
+
+    def get_submission(self, idempotency_key: str) -> dict[str, Any] | None:
+        payload = self.client.get(self._submission_key(idempotency_key))
+        return json.loads(payload) if payload else None
+
+    def claim_submission(self, idempotency_key: str) -> dict[str, Any] | None:
+        """Reserve a key for a submission in progress; return the earlier entry if taken.
+
+        The entry stays ``SUBMISSION_PENDING`` until ``remember_submission`` stores the
+        response, or is dropped by ``release_submission`` if the submission fails.
+        """
+        stored = self.client.set(
+            self._submission_key(idempotency_key),
+            json.dumps(SUBMISSION_PENDING),
+            nx=True,
+            ex=self.ttl,
+        )
+        return None if stored else self.get_submission(idempotency_key)
+
+    def remember_submission(self, idempotency_key: str, response: dict[str, Any]) -> None:
+        self.client.set(
+            self._submission_key(idempotency_key),
+            json.dumps(response, ensure_ascii=False),
+            ex=self.ttl,
+        )
+
+    def release_submission(self, idempotency_key: str) -> None:
+        self.client.delete(self._submission_key(idempotency_key))
+
+    def record_task(self, job_id: str, task_id: str) -> None:
+        self.client.hset(job_id, mapping={"task_id": task_id})
+
+    def task_id(self, job_id: str) -> str | None:
+        task_id = self.client.hget(job_id, "task_id")
+        return task_id.decode("utf-8") if task_id is not None else None
+
+    @staticmethod
+    def _cancel_key(job_id: str) -> str:
+        return f"cancel:{job_id}"
+
+    def cancel(self, job_id: str) -> None:
+        """Flag the job as cancelled and drop its state.
+
+        The flag outlives the job hash, so a task still running sees it at its next
+        check and stops instead of writing progress or a result back.
+        """
+        self.client.set(self._cancel_key(job_id), 1, ex=self.ttl)
+        self.clear(job_id)
+
+    def is_cancelled(self, job_id: str) -> bool:
+        return bool(self.client.exists(self._cancel_key(job_id)))
+
+    def ensure_active(self, job_id: str) -> None:
+        if self.is_cancelled(job_id):
+            # A write may have raced with cancel() and recreated the hash.
+            self.clear(job_id)
+            raise JobCancelled(job_id)
+
     def clear(self, job_id: str) -> None:
-        self.client.delete(job_id)
+        self.client.delete(job_id, self._checkpoint_key(job_id))
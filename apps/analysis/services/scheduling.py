@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from django.conf import settings
+
+from apps.analysis.services import metrics
+from apps.analysis.services.result_store import ResultStore
+
+SMALL_QUEUE = "small"
+LARGE_QUEUE = "large"
+JOB_QUEUES = (SMALL_QUEUE, LARGE_QUEUE)
+
+WAITING_PREFIX = "queue:waiting:"
+RUNNING_PREFIX = "running:"
+
+
+def queue_for(paragraphs: int) -> str:
+    return LARGE_QUEUE if paragraphs > settings.ANALYSIS_LARGE_JOB_PARAGRAPHS else SMALL_QUEUE
+
+
+def _text(value: bytes | None) -> str | None:
+    return value.decode("utf-8") if value is not None else None
+
+
+class JobScheduler:
+    """Queue bookkeeping and per-user concurrency caps, kept next to job state in Redis.
+
+    Each queue keeps a sorted set of waiting jobs scored by enqueue time; a job
+    leaves it when it starts, is cancelled or moves to another queue, and its rank
+    is its position. Running jobs are tracked per owner in a sorted set of job ids
+    scored by slot expiry, and a task that would exceed ``ANALYSIS_USER_MAX_RUNNING``
+    is deferred by its caller.
+    """
+
+    def __init__(self, store: ResultStore | None = None) -> None:
+        self.store = store or ResultStore()
+        self.client = self.store.client
+        self.user_max_running = settings.ANALYSIS_USER_MAX_RUNNING
+        # A worker killed mid-task cannot release its slot; the slot expires instead.
+        self.running_ttl = settings.CELERY_TASK_TIME_LIMIT + 60
+        self._held: dict[str, str] = {}
+
+    def enqueue(self, job_id: str, queue: str) -> None:
+        self.dequeue(job_id)
+        now = time.time()
+        waiting = f"{WAITING_PREFIX}{queue}"
+        # Jobs whose hash has expired can no longer start; drop them from the count.
+        self.client.zremrangebyscore(waiting, "-inf", now - self.store.ttl)
+        self.client.zadd(waiting, {job_id: now})
+        self.client.hset(job_id, mapping={"queue": queue, "queued_at": now})
+        self.client.hdel(job_id, "started_at")
+        self.client.expire(job_id, self.store.ttl)
+
+    def dequeue(self, job_id: str) -> bool:
+        """Take a job out of its queue's waiting set; False if it was not waiting."""
+        queue = _text(self.client.hget(job_id, "queue"))
+        if not queue:
+            return False
+        return bool(self.client.zrem(f"{WAITING_PREFIX}{queue}", job_id))
+
+    def acquire(self, job_id: str) -> bool:
+        """Take a running slot for the job's owner; False means the task should wait."""
+        job = self.client.hgetall(job_id)
+        owner = _text(job.get(b"owner"))
+        if owner and self.user_max_running > 0:
+            key = f"{RUNNING_PREFIX}{owner}"
+            now = time.time()
+            self.client.zremrangebyscore(key, "-inf", now)
+            # A redelivered task takes over the slot its dead worker left behind.
+            held = self.client.zscore(key, job_id) is not None
+            self.client.zadd(key, {job_id: now + self.running_ttl})
+            if not held and self.client.zcard(key) > self.user_max_running:
+                self.client.zrem(key, job_id)
+                metrics.JOB_DEFERRALS.inc()
+                return False
+            self.client.expire(key, self.running_ttl)
+            self._held[job_id] = key
+
+        now = time.time()
+        queue = _text(job.get(b"queue"))
+        # A redelivered task finds its job already out of the set and records no wait.
+        if queue and self.client.zrem(f"{WAITING_PREFIX}{queue}", job_id):
+            queued_at = job.get(b"queued_at")
+            if queued_at is not None:
+                metrics.JOB_WAIT.labels(queue=queue).observe(max(now - float(queued_at), 0.0))
+        if job:
+            self.client.hset(job_id, mapping={"started_at": now})
+        return True
+
+    def release(self, job_id: str) -> None:
+        key = self._held.pop(job_id, None)
+        if key is not None:
+            self.client.zrem(key, job_id)
+
+    def queue_info(self, job_id: str) -> dict[str, Any] | None:
+        """Queue, position (1 = next to start, None once started) and wait in seconds."""
+        job = self.client.hgetall(job_id)
+        queue = _text(job.get(b"queue"))
+        if not queue or b"queued_at" not in job:
+            return None
+        queued_at = float(job[b"queued_at"])
+        started_at = job.get(b"started_at")
+        position = None
+        if started_at is None:
+            rank = self.client.zrank(f"{WAITING_PREFIX}{queue}", job_id)
+            position = rank + 1 if rank is not None else None
+        waited = (float(started_at) if started_at is not None else time.time()) - queued_at
+        return {"queue": queue, "position": position, "wait_seconds": round(max(waited, 0.0))}
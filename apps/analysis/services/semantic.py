@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import fcntl
+import hashlib
 import json
 import logging
 import os
@@ -8,16 +10,30 @@ from pathlib import Path
 import re
 import string
 import tempfile
+import threading
 import time
 from contextlib import contextmanager
 
+import numpy as np
 from sentence_transformers import SentenceTransformer, util
 
+from django.conf import settings
+from django.db import connection
 from django.db.models import Count, Max, TextField
 from django.db.models.functions import Cast, Length, Trim
-from django.db.utils import OperationalError, ProgrammingError
-
+from django.db.utils import DatabaseError, OperationalError, ProgrammingError
+
+from apps.analysis.services import metrics
+from apps.analysis.services.embedding_cache import CachedEncoder
+from apps.analysis.services.inference_threads import apply_thread_config
+from apps.analysis.services.onnx_encoder import (
+    OnnxSentenceEncoder,
+    export_is_ready,
+    export_onnx_model,
+    onnx_export_dir,
+)
 from apps.reference.models import EventType, EventTypePattern, SubdivisionRef
+from apps.reference.services.subdivision_version import subdivisions_version
 
 logger = logging.getLogger(__name__)
 
@@ -28,10 +44,8 @@ def _is_truthy(value: str | None) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
-def _resolve_model_path(
-    model_name: str, cache_dir: str | None, lock_file: str | None
-) -> str | None:
-    if not cache_dir or not lock_file:
+def _lock_revision(model_name: str, lock_file: str | None) -> str | None:
+    if not lock_file:
         return None
     lock_path = Path(lock_file)
     if not lock_path.exists():
@@ -44,11 +58,20 @@ def _resolve_model_path(
         lock = json.loads(data)
     except ValueError:
         return None
-    revision = None
     for entry in lock.get("models", []):
         if entry.get("repo_id") == model_name:
-            revision = entry.get("revision")
-            break
+            return entry.get("revision")
+    return None
+
+
+def _resolve_model_path(
+    model_name: str, cache_dir: str | None, lock_file: str | None
+) -> str | None:
+    if not cache_dir or not lock_file:
+        return None
+    if not Path(lock_file).exists():
+        return None
+    revision = _lock_revision(model_name, lock_file)
     snapshots_root = (
         Path(cache_dir)
         / f"models--{model_name.replace('/', '--')}"
@@ -65,7 +88,39 @@ def _resolve_model_path(
     return None
 
 
-def load_semantic_model(model_name: str) -> SentenceTransformer:
+def semantic_backend() -> str:
+    backend = (os.environ.get("SEMANTIC_MODEL_BACKEND") or "torch").strip().lower()
+    if backend not in {"torch", "onnx"}:
+        raise ValueError(
+            f"Unknown SEMANTIC_MODEL_BACKEND '{backend}'. Use 'torch' or 'onnx'."
+        )
+    return backend
+
+
+def embedding_namespace(model_name: str) -> str:
+    """Cache namespace of the model actually loaded, so upgrades never mix vectors.
+
+    Besides the name and backend it carries a short hash of the locked revision and
+    of ``SEMANTIC_MODEL_PATH``: a new snapshot or local copy starts a fresh namespace.
+    """
+    backend = semantic_backend()
+    if backend == "onnx" and _is_truthy(os.environ.get("SEMANTIC_MODEL_ONNX_QUANTIZE")):
+        backend = "onnx-int8"
+    lock_file = os.environ.get("SEMANTIC_MODEL_LOCK_FILE", "models/model_lock.json")
+    revision = _lock_revision(model_name, lock_file) or ""
+    explicit_path = os.environ.get("SEMANTIC_MODEL_PATH") or ""
+    if explicit_path and Path(explicit_path).exists():
+        explicit_path = str(Path(explicit_path).resolve())
+    else:
+        explicit_path = ""
+    fingerprint = hashlib.sha1(f"{revision}\n{explicit_path}".encode("utf-8")).hexdigest()[:12]
+    return f"{model_name}:{backend}:{fingerprint}"
+
+
+def load_semantic_model(
+    model_name: str, backend: str | None = None, quantize: bool | None = None
+):
+    repo_id = model_name
     cache_dir = os.environ.get("SEMANTIC_MODEL_CACHE_DIR")
     local_only = _is_truthy(os.environ.get("SEMANTIC_MODEL_LOCAL_ONLY"))
     explicit_path = os.environ.get("SEMANTIC_MODEL_PATH")
@@ -81,6 +136,19 @@ def load_semantic_model(model_name: str) -> SentenceTransformer:
         init_kwargs["cache_folder"] = cache_dir
     if local_only:
         init_kwargs["local_files_only"] = True
+    apply_thread_config()
+    if (backend or semantic_backend()) == "onnx":
+        if quantize is None:
+            quantize = _is_truthy(os.environ.get("SEMANTIC_MODEL_ONNX_QUANTIZE"))
+        return _load_onnx_model(
+            repo_id, model_name, init_kwargs, cache_dir, lock_file, quantize
+        )
+    return _load_sentence_transformer(model_name, init_kwargs, local_only)
+
+
+def _load_sentence_transformer(
+    model_name: str, init_kwargs: dict[str, object], local_only: bool
+) -> SentenceTransformer:
     try:
         return SentenceTransformer(model_name, **init_kwargs)
     except OSError as exc:
@@ -94,6 +162,67 @@ def load_semantic_model(model_name: str) -> SentenceTransformer:
         raise
 
 
+def _load_onnx_model(
+    repo_id: str,
+    model_name: str,
+    init_kwargs: dict[str, object],
+    cache_dir: str | None,
+    lock_file: str | None,
+    quantize: bool,
+) -> OnnxSentenceEncoder:
+    revision = _lock_revision(repo_id, lock_file)
+    export_dir = onnx_export_dir(cache_dir or "models/hf", repo_id, revision)
+    with _onnx_export_lock(export_dir):
+        if not export_is_ready(export_dir, quantize):
+            local_only = bool(init_kwargs.get("local_files_only"))
+            model = _load_sentence_transformer(model_name, init_kwargs, local_only)
+            export_onnx_model(model, export_dir, repo_id, revision, quantize)
+    threads = apply_thread_config()
+    return OnnxSentenceEncoder.from_directory(
+        export_dir,
+        quantize,
+        intra_op_threads=threads.intra_op_threads,
+        inter_op_threads=threads.inter_op_threads,
+    )
+
+
+@contextmanager
+def _file_lock(lock_path: Path, timeout: float, interval: float):
+    """Cross-process ``flock`` on ``lock_path``; yields whether it was acquired.
+
+    The kernel drops the lock when its holder exits, so a crashed process never
+    leaves it behind. The file itself stays: unlinking it would let a waiter lock
+    a fresh file while another still holds the old one.
+    """
+    start = time.monotonic()
+    fd = os.open(lock_path, os.O_CREAT | os.O_RDWR, 0o644)
+    acquired = False
+    try:
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                acquired = True
+                break
+            except BlockingIOError:
+                if time.monotonic() - start >= timeout:
+                    break
+                time.sleep(interval)
+        yield acquired
+    finally:
+        # Closing the descriptor releases the lock.
+        os.close(fd)
+
+
+@contextmanager
+def _onnx_export_lock(export_dir: Path, timeout: float = 600.0, interval: float = 0.5):
+    export_dir.parent.mkdir(parents=True, exist_ok=True)
+    lock_path = export_dir.with_name(export_dir.name + ".lock")
+    with _file_lock(lock_path, timeout, interval) as acquired:
+        if not acquired:
+            raise TimeoutError(f"ONNX export lock {lock_path} not acquired in {timeout:.0f}s")
+        yield
+
+
 @dataclass
 class SemanticMatch:
     subdivision: SubdivisionRef | None
@@ -192,6 +321,18 @@ def generate_candidates(text: str) -> list[str]:
     return candidates
 
 
+def extract_subdivision_numbers(value: str | None) -> set[str]:
+    return set(re.findall(r"\d+", normalize_subdivision(value)))
+
+
+def build_number_index(texts: list[str]) -> dict[str, frozenset[int]]:
+    index: dict[str, set[int]] = {}
+    for row_id, text in enumerate(texts):
+        for number in extract_subdivision_numbers(text):
+            index.setdefault(number, set()).add(row_id)
+    return {number: frozenset(row_ids) for number, row_ids in index.items()}
+
+
 def _embeddings_empty(embeddings: object) -> bool:
     if hasattr(embeddings, "size"):
         return embeddings.size == 0
@@ -199,15 +340,34 @@ def _embeddings_empty(embeddings: object) -> bool:
 
 
 class SubdivisionSemanticService:
+    """Subdivision matcher over a per-process index of names, aliases and embeddings.
+
+    The index follows the subdivision reference version bumped by ``sync_divisions``
+    and admin saves: once it changes, a background thread builds a new index and
+    swaps it in under ``_swap_lock``, so ``match`` sees either the old or the new
+    index, never a mix.
+    """
+
     _cached_subdivisions: list[SubdivisionRef] | None = None
     _cached_embeddings: object | None = None
     _cached_embedding_entries: list[SubdivisionRef] | None = None
     _cached_embedding_texts: list[str] | None = None
     _cached_normalized_entries: list[tuple[str, SubdivisionRef]] | None = None
+    _cached_number_index: dict[str, frozenset[int]] | None = None
+    _cached_number_index_texts: list[str] | None = None
+    _cached_version: str | None = None
+    _version_checked_at: float | None = None
+    _reload_thread: threading.Thread | None = None
+    _swap_lock = threading.Lock()
 
     def __init__(self, model_name: str) -> None:
-        self.model = load_semantic_model(model_name)
+        self.model = CachedEncoder(
+            load_semantic_model(model_name), embedding_namespace(model_name)
+        )
         if self.__class__._cached_subdivisions is None:
+            # Read the version first: a bump during the load then triggers a reload.
+            self.__class__._cached_version = subdivisions_version()
+            self.__class__._version_checked_at = time.monotonic()
             self.__class__._cached_subdivisions = list(SubdivisionRef.objects.all())
 
         cached_subdivisions = self.__class__._cached_subdivisions
@@ -217,19 +377,7 @@ class SubdivisionSemanticService:
             or self.__class__._cached_embedding_entries is None
             or self.__class__._cached_embedding_texts is None
         ):
-            texts: list[str] = []
-            entries: list[SubdivisionRef] = []
-            for subdivision in cached_subdivisions:
-                aliases = self._extract_aliases(subdivision)
-                if subdivision.short_name:
-                    texts.append(subdivision.short_name)
-                    entries.append(subdivision)
-                if subdivision.full_name:
-                    texts.append(subdivision.full_name)
-                    entries.append(subdivision)
-                for alias in aliases:
-                    texts.append(alias)
-                    entries.append(subdivision)
+            texts, entries = self._embedding_rows(cached_subdivisions)
             if texts:
                 self.__class__._cached_embeddings = self.model.encode(texts)
                 self.__class__._cached_embedding_entries = entries
@@ -238,6 +386,7 @@ class SubdivisionSemanticService:
                 self.__class__._cached_embeddings = []
                 self.__class__._cached_embedding_entries = []
                 self.__class__._cached_embedding_texts = []
+        self._number_index()
 
         normalized_entries_cached = self.__class__._cached_normalized_entries
         needs_normalized_refresh = normalized_entries_cached is None
@@ -252,17 +401,146 @@ class SubdivisionSemanticService:
             )
 
         if needs_normalized_refresh:
-            normalized_entries: list[tuple[str, SubdivisionRef]] = []
-            for subdivision in cached_subdivisions:
-                aliases = self._extract_aliases(subdivision)
-                candidates = [subdivision.short_name, subdivision.full_name]
-                candidates.extend(aliases)
-                candidates.extend(self._generate_aliases(subdivision.full_name))
-                for candidate in candidates:
-                    normalized = self._normalize(candidate)
-                    if normalized:
-                        normalized_entries.append((normalized, subdivision))
-            self.__class__._cached_normalized_entries = normalized_entries
+            self.__class__._cached_normalized_entries = self._normalized_rows(
+                cached_subdivisions
+            )
+        self._refresh_if_stale()
+
+    @classmethod
+    def _embedding_rows(
+        cls, subdivisions: list[SubdivisionRef]
+    ) -> tuple[list[str], list[SubdivisionRef]]:
+        texts: list[str] = []
+        entries: list[SubdivisionRef] = []
+        for subdivision in subdivisions:
+            aliases = cls._extract_aliases(subdivision)
+            if subdivision.short_name:
+                texts.append(subdivision.short_name)
+                entries.append(subdivision)
+            if subdivision.full_name:
+                texts.append(subdivision.full_name)
+                entries.append(subdivision)
+            for alias in aliases:
+                texts.append(alias)
+                entries.append(subdivision)
+        return texts, entries
+
+    @classmethod
+    def _normalized_rows(
+        cls, subdivisions: list[SubdivisionRef]
+    ) -> list[tuple[str, SubdivisionRef]]:
+        normalized_entries: list[tuple[str, SubdivisionRef]] = []
+        for subdivision in subdivisions:
+            aliases = cls._extract_aliases(subdivision)
+            candidates = [subdivision.short_name, subdivision.full_name]
+            candidates.extend(aliases)
+            candidates.extend(cls._generate_aliases(subdivision.full_name))
+            for candidate in candidates:
+                normalized = cls._normalize(candidate)
+                if normalized:
+                    normalized_entries.append((normalized, subdivision))
+        return normalized_entries
+
+    def _refresh_if_stale(self) -> None:
+        """Start a background reload if the reference version moved on since the last load.
+
+        The version is read at most once per ``SUBDIVISION_VERSION_CHECK_SECONDS``;
+        0 turns reloading off.
+        """
+        cls = self.__class__
+        interval = settings.SUBDIVISION_VERSION_CHECK_SECONDS
+        if interval <= 0:
+            return
+        now = time.monotonic()
+        if cls._version_checked_at is not None and now - cls._version_checked_at < interval:
+            return
+        cls._version_checked_at = now
+        version = subdivisions_version()
+        if version is None or version == cls._cached_version:
+            return
+        with cls._swap_lock:
+            if cls._reload_thread is not None and cls._reload_thread.is_alive():
+                return
+            cls._reload_thread = threading.Thread(
+                target=self._reload_in_background,
+                args=(version,),
+                name="subdivision-reload",
+                daemon=True,
+            )
+            cls._reload_thread.start()
+
+    def _reload_in_background(self, version: str) -> None:
+        try:
+            self._reload(version)
+        finally:
+            # The thread's own DB connection would otherwise stay open.
+            connection.close()
+
+    def _reload(self, version: str) -> int:
+        """Rebuild the index from app_db and swap it in; returns how many texts were encoded.
+
+        Vectors of names and aliases already in the current index are reused, so only
+        new or changed texts go through the model.
+        """
+        cls = self.__class__
+        try:
+            subdivisions = list(SubdivisionRef.objects.all())
+        except DatabaseError:
+            logger.exception("Subdivision reference reload failed; keeping the current index")
+            return 0
+        texts, entries = self._embedding_rows(subdivisions)
+        previous = cls._cached_embeddings
+        if previous is None or _embeddings_empty(previous):
+            previous = []
+        known = dict(zip(cls._cached_embedding_texts or [], previous))
+        missing = list(dict.fromkeys(text for text in texts if text not in known))
+        if missing:
+            known.update(zip(missing, self.model.encode(missing)))
+        embeddings = np.asarray([known[text] for text in texts]) if texts else []
+        normalized_entries = self._normalized_rows(subdivisions)
+        number_index = build_number_index(texts)
+        with cls._swap_lock:
+            cls._cached_subdivisions = subdivisions
+            cls._cached_embeddings = embeddings
+            cls._cached_embedding_entries = entries
+            cls._cached_embedding_texts = texts
+            cls._cached_normalized_entries = normalized_entries
+            cls._cached_number_index = number_index
+            cls._cached_number_index_texts = texts
+            cls._cached_version = version
+        logger.info(
+            "Subdivision index reloaded for version %s: %s texts, %s encoded",
+            version,
+            len(texts),
+            len(missing),
+        )
+        return len(missing)
+
+    @classmethod
+    def _number_index(cls) -> dict[str, frozenset[int]]:
+        texts = cls._cached_embedding_texts
+        if texts is None:
+            return {}
+        if cls._cached_number_index is None or cls._cached_number_index_texts is not texts:
+            cls._cached_number_index = build_number_index(texts)
+            cls._cached_number_index_texts = texts
+        return cls._cached_number_index
+
+    @classmethod
+    def _filter_rows_by_numbers(
+        cls, numbers: list[str], index: dict[str, frozenset[int]] | None = None
+    ) -> list[int] | None:
+        if index is None:
+            index = cls._number_index()
+        row_ids: frozenset[int] | None = None
+        for number in set(numbers):
+            matched = index.get(number)
+            if not matched:
+                return None
+            row_ids = matched if row_ids is None else row_ids & matched
+            if not row_ids:
+                return None
+        return sorted(row_ids) if row_ids else None
 
     @staticmethod
     def _pre_normalize(value: str) -> str:
@@ -335,11 +613,16 @@ class SubdivisionSemanticService:
         return []
 
     def match(self, text: str) -> SemanticMatch:
-        cached_subdivisions = self.__class__._cached_subdivisions
-        cached_embeddings = self.__class__._cached_embeddings
-        cached_entries = self.__class__._cached_embedding_entries
-        cached_texts = self.__class__._cached_embedding_texts
-        normalized_entries = self.__class__._cached_normalized_entries
+        self._refresh_if_stale()
+        cls = self.__class__
+        # One consistent snapshot: a reload may swap the index while this call runs.
+        with cls._swap_lock:
+            cached_subdivisions = cls._cached_subdivisions
+            cached_embeddings = cls._cached_embeddings
+            cached_entries = cls._cached_embedding_entries
+            cached_texts = cls._cached_embedding_texts
+            normalized_entries = cls._cached_normalized_entries
+            number_index = cls._number_index()
         subdivisions = cached_subdivisions if cached_subdivisions is not None else []
         embeddings = cached_embeddings if cached_embeddings is not None else []
         entries = cached_entries if cached_entries is not None else []
@@ -352,26 +635,19 @@ class SubdivisionSemanticService:
         numbers = re.findall(r"\b\d+\b", normalized_for_numbers)
         for normalized_candidate, subdivision in normalized_entries:
             if normalized_text == normalized_candidate:
+                metrics.ALIAS_LOOKUPS.labels(result="hit").inc()
                 return SemanticMatch(subdivision=subdivision, similarity=1.0)
+        metrics.ALIAS_LOOKUPS.labels(result="miss").inc()
         if _embeddings_empty(embeddings):
             return SemanticMatch(subdivision=None, similarity=0.0)
         filtered_entries = entries
         filtered_embeddings = embeddings
-        filtered_texts = entry_texts
         number_filtered = False
         if numbers and entries and entry_texts:
-            filtered = [
-                (entry, embedding, entry_text)
-                for entry, embedding, entry_text in zip(entries, embeddings, entry_texts)
-                if all(
-                    number in normalize_subdivision(entry_text)
-                    for number in numbers
-                )
-            ]
-            if filtered:
-                filtered_entries = [item[0] for item in filtered]
-                filtered_embeddings = [item[1] for item in filtered]
-                filtered_texts = [item[2] for item in filtered]
+            row_ids = self._filter_rows_by_numbers(numbers, number_index)
+            if row_ids:
+                filtered_entries = [entries[row_id] for row_id in row_ids]
+                filtered_embeddings = np.asarray(embeddings)[row_ids]
                 number_filtered = True
         if number_filtered:
             logger.debug(
@@ -412,7 +688,9 @@ class EventTypeSemanticService:
     _cached_fingerprint: tuple[int, str | None] | None = None
 
     def __init__(self, model_name: str) -> None:
-        self.model = load_semantic_model(model_name)
+        self.model = CachedEncoder(
+            load_semantic_model(model_name), embedding_namespace(model_name)
+        )
         self._refresh_cache_if_needed()
 
     def _pattern_queryset(self):
@@ -453,33 +731,8 @@ class EventTypeSemanticService:
 
     @contextmanager
     def _cache_lock(self, timeout: float = 10.0, interval: float = 0.2):
-        lock_path = self._cache_lock_path()
-        start = time.monotonic()
-        fd = None
-        while fd is None:
-            try:
-                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-            except FileExistsError:
-                try:
-                    stale_seconds = 300
-                    mtime = lock_path.stat().st_mtime
-                    if time.time() - mtime > stale_seconds:
-                        lock_path.unlink(missing_ok=True)
-                        continue
-                except FileNotFoundError:
-                    continue
-                if time.monotonic() - start >= timeout:
-                    break
-                time.sleep(interval)
-        try:
-            yield fd is not None
-        finally:
-            if fd is not None:
-                os.close(fd)
-                try:
-                    lock_path.unlink()
-                except FileNotFoundError:
-                    pass
+        with _file_lock(self._cache_lock_path(), timeout, interval) as acquired:
+            yield acquired
 
     def _rebuild_cache(self, fingerprint: tuple[int, str | None]) -> None:
         cls = self.__class__
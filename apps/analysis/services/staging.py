@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+import io
+import logging
+from pathlib import Path
+import time
+from typing import IO
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STAGING_BACKENDS = ("filesystem", "redis", "auto")
+REDIS_KEY_PREFIX = "upload:"
+
+
+class UploadTooLargeError(ValueError):
+    pass
+
+
+class UploadStaging:
+    """Hands uploaded summaries from web to workers.
+
+    Files go to a volume shared by web and workers (``UPLOAD_STAGING_DIR``) or, for
+    small uploads, to Redis. The task receives a reference (``file:<path>`` or
+    ``redis:<key>``) instead of a local path, so web and workers may run on
+    different hosts.
+    """
+
+    def __init__(self) -> None:
+        self.backend = settings.UPLOAD_STAGING_BACKEND
+        if self.backend not in STAGING_BACKENDS:
+            raise ValueError(f"Unknown UPLOAD_STAGING_BACKEND: {self.backend}")
+        self.root = Path(settings.UPLOAD_STAGING_DIR)
+        self.max_bytes = settings.UPLOAD_MAX_BYTES
+        self.redis_max_bytes = settings.UPLOAD_STAGING_REDIS_MAX_BYTES
+        self.ttl = settings.UPLOAD_STAGING_TTL_SECONDS
+        self._client: redis.Redis | None = None
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(settings.REDIS_URL)
+        return self._client
+
+    def check_size(self, size: int | None) -> None:
+        if size is not None and size > self.max_bytes:
+            raise UploadTooLargeError(
+                f"Файл больше допустимого размера ({self.max_bytes // (1024 * 1024)} МБ)."
+            )
+
+    def stage(self, job_id: str, chunks: Iterable[bytes], size: int | None = None) -> str:
+        self.check_size(size)
+        use_redis = self.backend == "redis" or (
+            self.backend == "auto" and size is not None and size <= self.redis_max_bytes
+        )
+        if use_redis:
+            return self._stage_redis(job_id, chunks)
+        return self._stage_file(job_id, chunks)
+
+    def _stage_file(self, job_id: str, chunks: Iterable[bytes]) -> str:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{job_id}.upload"
+        partial = self.root / f"{job_id}.part"
+        written = 0
+        try:
+            with partial.open("wb") as handle:
+                for chunk in chunks:
+                    written += len(chunk)
+                    self.check_size(written)
+                    handle.write(chunk)
+            partial.replace(path)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        return f"file:{path}"
+
+    def _stage_redis(self, job_id: str, chunks: Iterable[bytes]) -> str:
+        key = f"{REDIS_KEY_PREFIX}{job_id}"
+        written = 0
+        try:
+            self.client.delete(key)
+            for chunk in chunks:
+                written += len(chunk)
+                self.check_size(written)
+                self.client.append(key, chunk)
+            self.client.expire(key, self.ttl)
+        except BaseException:
+            self.client.delete(key)
+            raise
+        return f"redis:{key}"
+
+    def read(self, ref: str) -> bytes:
+        scheme, _, location = ref.partition(":")
+        if scheme == "redis":
+            data = self.client.get(location)
+            if data is None:
+                raise FileNotFoundError(f"Staged upload expired or missing: {ref}")
+            return data
+        if scheme == "file":
+            return Path(location).read_bytes()
+        # Bare paths were queued before staging references existed.
+        return Path(ref).read_bytes()
+
+    def open(self, ref: str) -> IO[bytes]:
+        """Staged upload as a seekable binary file; files on disk are not read whole."""
+        scheme, _, location = ref.partition(":")
+        if scheme == "redis":
+            return io.BytesIO(self.read(ref))
+        return open(location if scheme == "file" else ref, "rb")
+
+    def discard(self, ref: str) -> None:
+        """Drop a staged upload; bare paths belong to the caller and are left alone."""
+        scheme, _, location = ref.partition(":")
+        if scheme == "redis":
+            self.client.delete(location)
+        elif scheme == "file":
+            Path(location).unlink(missing_ok=True)
+
+    def purge_stale(self, max_age_seconds: int | None = None) -> int:
+        """Remove staged files older than the TTL; Redis entries expire by themselves."""
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - (self.ttl if max_age_seconds is None else max_age_seconds)
+        removed = 0
+        for path in self.root.iterdir():
+            if path.suffix in {".upload", ".part"} and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info("Removed %s stale staged uploads from %s", removed, self.root)
+        return removed
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import json
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger("apps.analysis.metrics")
+
+PIPELINE_STAGES = (
+    "staging",
+    "ingest",
+    "ner",
+    "extract",
+    "subdivision_match",
+    "portal_query",
+    "compare",
+    "event_type_match",
+)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class StageTimings:
+    def __init__(self) -> None:
+        self._samples: dict[str, list[float]] = {}
+        self._items: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, items: int | None = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, items)
+
+    def record(self, name: str, seconds: float, items: int | None = None) -> None:
+        with self._lock:
+            self._samples.setdefault(name, []).append(seconds)
+            self._items[name] = self._items.get(name, 0) + (1 if items is None else items)
+
+    def samples(self) -> dict[str, list[float]]:
+        with self._lock:
+            return {name: list(values) for name, values in self._samples.items()}
+
+    def summary(self) -> dict[str, dict[str, float | int]]:
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            items = dict(self._items)
+        ordered = [name for name in PIPELINE_STAGES if name in samples]
+        ordered += sorted(name for name in samples if name not in PIPELINE_STAGES)
+        summary: dict[str, dict[str, float | int]] = {}
+        for name in ordered:
+            values = samples[name]
+            total = sum(values)
+            summary[name] = {
+                "calls": len(values),
+                "items": items.get(name, 0),
+                "total_ms": round(total * 1000, 2),
+                "mean_ms": round(total / len(values) * 1000, 3),
+                "p50_ms": round(percentile(values, 0.5) * 1000, 3),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+                "max_ms": round(values[-1] * 1000, 3),
+            }
+        return summary
+
+
+def log_job_metrics(job_id: str, metrics: dict) -> None:
+    for stage, values in (metrics.get("stages") or {}).items():
+        logger.info(
+            json.dumps(
+                {"event": "job_stage", "job_id": job_id, "stage": stage, **values},
+                ensure_ascii=False,
+            )
+        )
+    summary = {key: value for key, value in metrics.items() if key != "stages"}
+    logger.info(
+        json.dumps({"event": "job_metrics", "job_id": job_id, **summary}, ensure_ascii=False)
+    )
@@ -1,51 +1,175 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+import logging
+import time
+
 from celery import shared_task
 from django.conf import settings
 
-from apps.analysis.dto import ExtractedEvent
-from apps.analysis.services.docx_ingest import DocxIngestService
-from apps.analysis.services.extract import ExtractService
-from apps.analysis.services.match import MatchService
-from apps.analysis.services.portal_repo import PortalRepository
-from apps.analysis.services.result_store import ResultStore
-from apps.analysis.services.semantic import (
-    EventTypeSemanticService,
-    SubdivisionSemanticService,
-)
+from apps.analysis.services import metrics as job_metrics
+from apps.analysis.services.embedding_cache import get_embedding_cache
+from apps.analysis.services.history import JobHistory, persistence_enabled
+from apps.analysis.services.ingest import IngestService
+from apps.analysis.services.pipeline import AnalysisPipeline
+from apps.analysis.services.result_store import JobCancelled, ResultStore
+from apps.analysis.services.scheduling import JobScheduler, queue_for
+from apps.analysis.services.staging import UploadStaging
+from apps.analysis.services.timings import StageTimings, log_job_metrics
 
+logger = logging.getLogger(__name__)
 
-@shared_task(bind=True)
-def analyze_docx(self, job_id: str, file_path: str) -> None:
+
+def run_analysis(
+    job_id: str,
+    load_paragraphs: Callable[[StageTimings], list[str]],
+    reroute: Callable[[list[str]], bool] | None = None,
+) -> None:
+    """Analyze a job's paragraphs; ``reroute`` may hand them to another queue instead.
+
+    Paragraphs are processed in chunks of ``ANALYSIS_CHUNK_PARAGRAPHS``; progress is
+    written and the cancel flag checked between chunks, so a cancelled job frees its
+    worker after at most one chunk. Finished chunks are checkpointed: a task
+    redelivered after its worker died reuses them and redoes only the rest. A job
+    whose task keeps killing its worker is marked failed after
+    ``ANALYSIS_MAX_DELIVERIES`` deliveries instead of being redelivered forever.
+    """
     store = ResultStore()
-    store.update_progress(job_id, "started", 5)
-
-    ingest = DocxIngestService()
-    extract_service = ExtractService()
-    semantic_service = SubdivisionSemanticService(settings.SEMANTIC_MODEL_NAME)
-    portal_repo = PortalRepository()
-    event_type_service = EventTypeSemanticService(settings.SEMANTIC_MODEL_NAME)
-    match_service = MatchService(semantic_service, portal_repo, event_type_service)
-
-    paragraphs = ingest.read_paragraphs(file_path)
-    results = []
-    total = max(len(paragraphs), 1)
-    for index, paragraph in enumerate(paragraphs):
-        attrs = extract_service.extract(paragraph)
-        extracted = ExtractedEvent(
-            paragraph_index=index,
-            raw_text=paragraph,
-            timestamp=attrs.timestamp,
-            timestamp_has_time=attrs.timestamp_has_time,
-            timestamp_text=attrs.timestamp_text,
-            subdivision_text=attrs.subdivision_text,
-            subdivision_name=None,
-            subdivision_similarity=None,
-            offenders=attrs.offenders,
-        )
-        match = match_service.match_event(extracted)
-        results.append(match)
-        progress = int(((index + 1) / total) * 90) + 5
-        store.update_progress(job_id, "processing", progress)
-
-    store.set_result(job_id, {"items": results})
+    job_start = time.perf_counter()
+    timings = StageTimings()
+    embedding_cache = get_embedding_cache()
+    cache_stats_before = embedding_cache.stats()
+
+    try:
+        store.ensure_active(job_id)
+        deliveries = store.record_delivery(job_id)
+        if deliveries > settings.ANALYSIS_MAX_DELIVERIES:
+            logger.error(
+                "Job %s failed: task delivered %s times, its worker was lost every time",
+                job_id,
+                deliveries,
+            )
+            store.mark_failed(job_id)
+            job_metrics.observe_job("failure", samples=timings.samples())
+            return
+        store.update_progress(job_id, "started", 5)
+        paragraphs = load_paragraphs(timings)
+        if reroute is not None and reroute(paragraphs):
+            return
+        pipeline = AnalysisPipeline(timings=timings)
+
+        results = []
+        total = max(len(paragraphs), 1)
+        chunk_size = max(settings.ANALYSIS_CHUNK_PARAGRAPHS, 1)
+        checkpoints = store.load_chunks(job_id, chunk_size)
+        resumed = 0
+        for chunk_index, start in enumerate(range(0, len(paragraphs), chunk_size)):
+            store.ensure_active(job_id)
+            chunk = paragraphs[start : start + chunk_size]
+            items = checkpoints.get(chunk_index)
+            if items is not None and len(items) == len(chunk):
+                resumed += len(chunk)
+            else:
+                items = [
+                    pipeline.process(index, paragraph)
+                    for index, paragraph in enumerate(chunk, start=start)
+                ]
+                if start + chunk_size < len(paragraphs):
+                    store.save_chunk(job_id, chunk_size, chunk_index, items)
+            results.extend(items)
+            progress = int(((start + len(chunk)) / total) * 90) + 5
+            store.update_progress(job_id, "processing", progress)
+        store.ensure_active(job_id)
+        if resumed:
+            logger.info("Job %s resumed: %s paragraphs taken from checkpoints", job_id, resumed)
+    except JobCancelled:
+        logger.info("Job %s cancelled", job_id)
+        job_metrics.observe_job("cancelled", samples=timings.samples())
+        return
+    except Exception:
+        # The task is acknowledged and not redelivered, so the job will not resume.
+        if not store.is_cancelled(job_id):
+            store.mark_failed(job_id)
+        job_metrics.observe_job("failure", samples=timings.samples())
+        raise
+
+    elapsed = time.perf_counter() - job_start
+    metrics = {
+        "paragraphs": len(paragraphs),
+        "total_ms": round(elapsed * 1000, 2),
+        "paragraphs_per_s": round(len(paragraphs) / elapsed, 3) if elapsed else 0.0,
+        "stages": timings.summary(),
+        "embedding_cache": embedding_cache.stats_since(cache_stats_before),
+        "offender_evaluations": pipeline.match_service.compare_service.offender_evaluations,
+        "resumed_paragraphs": resumed,
+    }
+    log_job_metrics(job_id, metrics)
+    job_metrics.observe_job("success", metrics, timings.samples())
+    meta = store.job_meta(job_id)
+    result = {"items": results, "metrics": metrics}
+    store.set_result(job_id, result)
+    if store.is_cancelled(job_id):
+        store.clear(job_id)
+        return
+    if persistence_enabled():
+        JobHistory().save(job_id, result, owner=meta.get("owner"), filename=meta.get("filename"))
+
+
+def _delivery_queue(task) -> str | None:
+    return (task.request.delivery_info or {}).get("routing_key")
+
+
+@shared_task(bind=True)
+def analyze_docx(self, job_id: str, upload_ref: str) -> None:
+    """Analyze an uploaded file; DOCX, RTF and TXT are told apart by content.
+
+    ``upload_ref`` is an ``UploadStaging`` reference or a plain local path. Uploads
+    always land on the small queue; once ingest shows a large job, its paragraphs
+    move to the large queue.
+    """
+    scheduler = JobScheduler()
+    if not scheduler.acquire(job_id):
+        raise self.retry(countdown=settings.ANALYSIS_USER_DEFER_SECONDS, max_retries=None)
+    staging = UploadStaging()
+
+    def load(timings: StageTimings) -> list[str]:
+        with timings.stage("staging"):
+            data = staging.read(upload_ref)
+        return IngestService(timings=timings).read_bytes(data)
+
+    def reroute(paragraphs: list[str]) -> bool:
+        queue = queue_for(len(paragraphs))
+        current = _delivery_queue(self)
+        if current is None or queue == current:
+            return False
+        scheduler.release(job_id)
+        scheduler.store.update_progress(job_id, "pending", 5)
+        scheduler.store.reset_deliveries(job_id)
+        scheduler.enqueue(job_id, queue)
+        task = analyze_paragraphs.apply_async((job_id, paragraphs), queue=queue)
+        scheduler.store.record_task(job_id, task.id)
+        return True
+
+    try:
+        run_analysis(job_id, load, reroute)
+    finally:
+        scheduler.release(job_id)
+        staging.discard(upload_ref)
+
+
+@shared_task(bind=True)
+def analyze_paragraphs(self, job_id: str, paragraphs: list[str]) -> None:
+    scheduler = JobScheduler()
+    if not scheduler.acquire(job_id):
+        raise self.retry(countdown=settings.ANALYSIS_USER_DEFER_SECONDS, max_retries=None)
+
+    def load(timings: StageTimings) -> list[str]:
+        with timings.stage("ingest", len(paragraphs)):
+            return [
+                paragraph.strip() for paragraph in paragraphs if paragraph and paragraph.strip()
+            ]
+
+    try:
+        run_analysis(job_id, load)
+    finally:
+        scheduler.release(job_id)
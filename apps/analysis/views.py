@@ -1,15 +1,26 @@
 from __future__ import annotations
 
 import uuid
-from pathlib import Path
 
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.core.paginator import Paginator
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse
 from django.shortcuts import redirect, render
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import require_http_methods, require_POST
 
+from apps.analysis.jobs import cancel_job, submit_file
+from apps.analysis.services.history import (
+    JobHistory,
+    load_job_data,
+    persistence_enabled,
+    user_owns_job,
+)
+from apps.analysis.services.ingest import UnsupportedFormatError, detect_upload
+from apps.analysis.services.presentation import render_items
 from apps.analysis.services.result_store import ResultStore
-from apps.analysis.tasks import analyze_docx
+from apps.analysis.services.scheduling import JobScheduler
+from apps.analysis.services.staging import UploadTooLargeError
 
 
 @login_required
@@ -19,14 +30,19 @@ def upload_view(request: HttpRequest) -> HttpResponse:
         file = request.FILES.get("docx")
         if not file:
             return render(request, "upload.html", {"error": "Файл не выбран"})
-        job_id = uuid.uuid4()
-        temp_path = Path("/tmp") / f"{job_id}.docx"
-        with temp_path.open("wb") as handle:
-            for chunk in file.chunks():
-                handle.write(chunk)
-        store = ResultStore()
-        store.create_job(str(job_id))
-        analyze_docx.delay(str(job_id), str(temp_path))
+        unsupported = {"error": "Неподдерживаемый формат файла: ожидается DOCX, RTF или TXT."}
+        try:
+            detect_upload(file)
+            job_id = submit_file(
+                file.chunks(),
+                size=file.size,
+                owner=request.user.get_username(),
+                filename=file.name,
+            )
+        except UnsupportedFormatError:
+            return render(request, "upload.html", unsupported, status=415)
+        except UploadTooLargeError as exc:
+            return render(request, "upload.html", {"error": str(exc)}, status=413)
         return redirect("progress", job_id=job_id)
     return render(request, "upload.html")
 
@@ -35,6 +51,7 @@ def upload_view(request: HttpRequest) -> HttpResponse:
 def progress_view(request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
     store = ResultStore()
     data = store.get(str(job_id))
+    data["queue"] = JobScheduler(store).queue_info(str(job_id))
     if request.GET.get("format") == "json":
         return JsonResponse(data)
     return render(request, "progress.html", {"job_id": job_id, "data": data})
@@ -43,12 +60,38 @@ def progress_view(request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
 @login_required
 def result_view(request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
     store = ResultStore()
-    data = store.get(str(job_id))
+    data = load_job_data(store, str(job_id), request.user)
+    result = data.get("result")
+    if result:
+        data["result"] = {**result, "items": render_items(result.get("items", []))}
     return render(request, "result.html", {"job_id": job_id, "data": data})
 
 
 @login_required
-def clear_view(request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
+def result_export_view(request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
     store = ResultStore()
-    store.clear(str(job_id))
+    result = load_job_data(store, str(job_id), request.user)["result"]
+    if result is None:
+        raise Http404("Результат не найден или истёк.")
+    payload = store.dumps_json(result)
+    response = HttpResponse(payload, content_type="application/json; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="result_{job_id}.json"'
+    return response
+
+
+@login_required
+def history_view(request: HttpRequest) -> HttpResponse:
+    if not persistence_enabled():
+        return render(request, "history.html", {"page": None})
+    paginator = Paginator(JobHistory.jobs_for(request.user), settings.HISTORY_PAGE_SIZE)
+    page = paginator.get_page(request.GET.get("page"))
+    return render(request, "history.html", {"page": page})
+
+
+@login_required
+@require_POST
+def clear_view(request: HttpRequest, job_id: uuid.UUID) -> HttpResponse:
+    if not user_owns_job(ResultStore(), str(job_id), request.user):
+        raise Http404("Задача не найдена.")
+    cancel_job(str(job_id))
     return redirect("upload")
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import csv
+from datetime import date
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analysis.services.analytics import DIMENSIONS, aggregate
+
+COLUMNS = (
+    "key",
+    "paragraphs",
+    "found",
+    "mismatched",
+    "mismatch_rate",
+    "timestamp_failed",
+    "subdivision_failed",
+    "offenders_failed",
+    "event_type_mismatched",
+    "avg_time_delta",
+)
+
+
+def _parse_date(value: str | None, option: str) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError as exc:
+        raise CommandError(f"{option}: ожидается дата YYYY-MM-DD, получено {value!r}.") from exc
+
+
+class Command(BaseCommand):
+    help = (
+        "Aggregate stored match results (AnalysisFact) per subdivision, event type or day: "
+        "found events, mismatches and failed attributes."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--by",
+            choices=sorted(DIMENSIONS),
+            default="subdivision",
+            help="Группировка: subdivision, event_type или day (по умолчанию subdivision).",
+        )
+        parser.add_argument(
+            "--since", default="", help="С даты анализа включительно (YYYY-MM-DD)."
+        )
+        parser.add_argument(
+            "--until", default="", help="По дату анализа включительно (YYYY-MM-DD)."
+        )
+        parser.add_argument("--owner", default="", help="Только задачи этого пользователя.")
+        parser.add_argument(
+            "--format",
+            choices=("table", "csv", "json"),
+            default="table",
+            help="Формат вывода (по умолчанию table).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        rows = list(
+            aggregate(
+                options["by"],
+                since=_parse_date(options["since"], "--since"),
+                until=_parse_date(options["until"], "--until"),
+                owner=options["owner"] or None,
+            )
+        )
+        for row in rows:
+            row["key"] = str(row["key"]) if row["key"] else "не определено"
+
+        if options["format"] == "json":
+            self.stdout.write(json.dumps(rows, ensure_ascii=False, indent=2))
+        elif options["format"] == "csv":
+            writer = csv.DictWriter(self.stdout, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            self._write_table(rows)
+
+    def _write_table(self, rows: list[dict]) -> None:
+        if not rows:
+            self.stdout.write("Нет данных за выбранный период.")
+            return
+        cells = [
+            [str(row[column]) if row[column] is not None else "—" for column in COLUMNS]
+            for row in rows
+        ]
+        widths = [
+            max(len(column), *(len(line[position]) for line in cells))
+            for position, column in enumerate(COLUMNS)
+        ]
+        self.stdout.write("  ".join(column.ljust(width) for column, width in zip(COLUMNS, widths)))
+        for line in cells:
+            self.stdout.write("  ".join(cell.ljust(width) for cell, width in zip(line, widths)))
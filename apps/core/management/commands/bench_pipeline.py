@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+from pathlib import Path
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analysis.services.embedding_cache import get_embedding_cache
+from apps.analysis.services.pipeline import AnalysisPipeline
+from apps.analysis.services.semantic import semantic_backend
+from apps.analysis.services.timings import StageTimings
+from apps.core.management.synthetic_summaries import build_synthetic_summary
+
+MODES = ("sequential", "batched", "pooled")
+
+
+def _resolve_path(path_value: str) -> Path:
+    path = Path(path_value)
+    if path.is_absolute():
+        return path
+    return Path(settings.BASE_DIR) / path
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def _git_revision() -> str | None:
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the analysis pipeline in-process on synthetic summaries: "
+        "paragraphs/s, per-stage p50/p95 and peak RSS as JSON."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--paragraphs",
+            type=int,
+            default=200,
+            help="Размер синтетической сводки в абзацах (по умолчанию 200).",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=MODES,
+            default="sequential",
+            help="sequential — по одному абзацу, batched — пакетный прогрев эмбеддингов, "
+            "pooled — пул потоков.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=32,
+            help="Размер пакета для режима batched (по умолчанию 32).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Число потоков для режима pooled (по умолчанию 4).",
+        )
+        parser.add_argument(
+            "--fixtures",
+            default="fixtures/text",
+            help="Каталог с TXT-фикстурами (по умолчанию fixtures/text).",
+        )
+        parser.add_argument(
+            "--divisions",
+            default="configs/divisions.yaml",
+            help="YAML справочника подразделений (по умолчанию configs/divisions.yaml).",
+        )
+        parser.add_argument(
+            "--fixture-ratio",
+            type=float,
+            default=0.1,
+            help="Доля абзацев, взятых из фикстур без пары в портале (по умолчанию 0.1).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed генератора синтетических сводок.",
+        )
+        parser.add_argument(
+            "--skip-portal-seed",
+            action="store_true",
+            help="Не пересоздавать тестовые данные портала через bootstrap_local_portal.",
+        )
+        parser.add_argument(
+            "--output",
+            default="",
+            help="Куда сохранить JSON-отчёт (по умолчанию только stdout).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        if options["paragraphs"] <= 0:
+            raise CommandError("--paragraphs должен быть больше нуля.")
+        divisions_path = _resolve_path(options["divisions"])
+        if not divisions_path.exists():
+            raise CommandError(f"Файл справочника не найден: {divisions_path}")
+
+        paragraphs = build_synthetic_summary(
+            options["paragraphs"],
+            divisions_path,
+            _resolve_path(options["fixtures"]),
+            fixture_ratio=options["fixture_ratio"],
+            seed=options["seed"],
+        )
+        if not options["skip_portal_seed"]:
+            call_command(
+                "bootstrap_local_portal",
+                reset=True,
+                scale=options["paragraphs"],
+                divisions=str(divisions_path),
+                stdout=self.stderr,
+            )
+
+        timings = StageTimings()
+        embedding_cache = get_embedding_cache()
+        cache_stats_before = embedding_cache.stats()
+
+        start = time.perf_counter()
+        runner = getattr(self, f"_run_{options['mode']}")
+        results = runner(timings, paragraphs, options)
+        elapsed = time.perf_counter() - start
+
+        report = {
+            "revision": _git_revision(),
+            "mode": options["mode"],
+            "batch_size": options["batch_size"] if options["mode"] == "batched" else None,
+            "workers": options["workers"] if options["mode"] == "pooled" else None,
+            "semantic_backend": semantic_backend(),
+            "paragraphs": len(paragraphs),
+            "events_found": sum(1 for item in results if item.get("event_found")),
+            "total_s": round(elapsed, 3),
+            "paragraphs_per_s": round(len(paragraphs) / elapsed, 3) if elapsed else 0.0,
+            "peak_rss_mb": _peak_rss_mb(),
+            "stages": timings.summary(),
+            "embedding_cache": embedding_cache.stats_since(cache_stats_before),
+        }
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            output_path = Path(options["output"]).resolve()
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(payload, encoding="utf-8")
+        self.stdout.write(payload)
+
+    @staticmethod
+    def _run_sequential(timings: StageTimings, paragraphs: list[str], _options) -> list[dict]:
+        pipeline = AnalysisPipeline(timings=timings)
+        return [pipeline.process(index, paragraph) for index, paragraph in enumerate(paragraphs)]
+
+    @staticmethod
+    def _run_batched(timings: StageTimings, paragraphs: list[str], options) -> list[dict]:
+        pipeline = AnalysisPipeline(timings=timings)
+        batch_size = max(options["batch_size"], 1)
+        results: list[dict] = []
+        for offset in range(0, len(paragraphs), batch_size):
+            batch = [
+                pipeline.extract(offset + position, paragraph)
+                for position, paragraph in enumerate(paragraphs[offset : offset + batch_size])
+            ]
+            pipeline.prefetch_embeddings(batch)
+            results.extend(pipeline.match(extracted) for extracted in batch)
+        return results
+
+    @staticmethod
+    def _run_pooled(timings: StageTimings, paragraphs: list[str], options) -> list[dict]:
+        # AnalysisPipeline keeps per-paragraph state, so each thread gets its own;
+        # only the thread-safe timings are shared.
+        local = threading.local()
+
+        def process(item: tuple[int, str]) -> dict:
+            if not hasattr(local, "pipeline"):
+                local.pipeline = AnalysisPipeline(timings=timings)
+            return local.pipeline.process(*item)
+
+        with ThreadPoolExecutor(max_workers=max(options["workers"], 1)) as executor:
+            return list(executor.map(process, enumerate(paragraphs)))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from pathlib import Path
 
 from django.core.management.base import BaseCommand
 from django.db import connections, transaction
@@ -23,16 +24,22 @@ class Command(BaseCommand):
             default=10,
             help="Количество событий (минимум 6, базовые кейсы всегда включены).",
         )
+        parser.add_argument(
+            "--divisions",
+            default="",
+            help="YAML справочника подразделений (по умолчанию configs/divisions.yaml).",
+        )
 
     @transaction.atomic(using="portal")
     def handle(self, *args, **options) -> None:
         reset = options["reset"]
         scale = options["scale"]
+        divisions_path = Path(options["divisions"]) if options["divisions"] else None
         with connections["portal"].cursor() as cursor:
             self._ensure_schema(cursor)
             if reset:
                 self._reset_test_data(cursor)
-            self._seed_data(cursor, scale)
+            self._seed_data(cursor, scale, divisions_path)
         self.stdout.write(self.style.SUCCESS("Портальная тестовая БД готова."))
 
     def _ensure_schema(self, cursor) -> None:
@@ -63,8 +70,8 @@ class Command(BaseCommand):
     def _reset_test_data(self, cursor) -> None:
         cursor.execute("DELETE FROM portal_events WHERE is_test = true")
 
-    def _seed_data(self, cursor, scale: int) -> None:
-        _subdivisions, events, _docx_events = build_local_portal_seed(scale)
+    def _seed_data(self, cursor, scale: int, divisions_path: Path | None) -> None:
+        _subdivisions, events, _docx_events = build_local_portal_seed(scale, divisions_path)
 
         for event in events:
             cursor.execute(
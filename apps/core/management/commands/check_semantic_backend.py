@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import yaml
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analysis.services.semantic import generate_candidates, load_semantic_model
+
+
+def _resolve_path(path_value: str) -> Path:
+    path = Path(path_value)
+    if path.is_absolute():
+        return path
+    return Path(settings.BASE_DIR) / path
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the ONNX semantic backend with the PyTorch model on text fixtures: "
+        "embedding accuracy and encode throughput."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--fixtures",
+            default="fixtures/text",
+            help="Каталог с TXT-фикстурами (по умолчанию fixtures/text).",
+        )
+        parser.add_argument(
+            "--divisions",
+            default="configs/divisions.yaml",
+            help="YAML справочника подразделений (по умолчанию configs/divisions.yaml).",
+        )
+        parser.add_argument(
+            "--quantize",
+            action="store_true",
+            help="Проверять int8-квантованную ONNX-модель.",
+        )
+        parser.add_argument(
+            "--min-cosine",
+            type=float,
+            default=0.99,
+            help="Минимально допустимый косинус между эмбеддингами torch и ONNX.",
+        )
+        parser.add_argument(
+            "--min-top1",
+            type=float,
+            default=0.98,
+            help="Минимальная доля совпадений лучшего алиаса подразделения.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Количество прогонов для замера пропускной способности.",
+        )
+        parser.add_argument(
+            "--output",
+            default="",
+            help="Куда сохранить JSON-отчёт (по умолчанию только stdout).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        paragraphs = self._load_paragraphs(_resolve_path(options["fixtures"]))
+        aliases = self._load_aliases(_resolve_path(options["divisions"]))
+        if not paragraphs or not aliases:
+            raise CommandError("Нужны непустые фикстуры и справочник подразделений.")
+        candidates: list[str] = []
+        for paragraph in paragraphs:
+            candidates.extend(generate_candidates(paragraph[:200]))
+        texts = list(dict.fromkeys(paragraphs + candidates + aliases))
+
+        model_name = settings.SEMANTIC_MODEL_NAME
+        torch_model = load_semantic_model(model_name, backend="torch")
+        onnx_model = load_semantic_model(
+            model_name, backend="onnx", quantize=options["quantize"]
+        )
+
+        torch_embeddings = torch_model.encode(texts, normalize_embeddings=True)
+        onnx_embeddings = onnx_model.encode(texts, normalize_embeddings=True)
+        cosines = np.sum(torch_embeddings * onnx_embeddings, axis=1)
+        norms = np.linalg.norm(onnx_embeddings, axis=1)
+
+        alias_torch = torch_model.encode(aliases, normalize_embeddings=True)
+        alias_onnx = onnx_model.encode(aliases, normalize_embeddings=True)
+        candidate_torch = torch_model.encode(candidates, normalize_embeddings=True)
+        candidate_onnx = onnx_model.encode(candidates, normalize_embeddings=True)
+        top1_torch = np.argmax(candidate_torch @ alias_torch.T, axis=1)
+        top1_onnx = np.argmax(candidate_onnx @ alias_onnx.T, axis=1)
+        top1_agreement = float(np.mean(top1_torch == top1_onnx))
+
+        report = {
+            "model": model_name,
+            "quantized": options["quantize"],
+            "texts": len(texts),
+            "accuracy": {
+                "min_cosine": round(float(np.min(cosines)), 6),
+                "mean_cosine": round(float(np.mean(cosines)), 6),
+                "max_norm_error": round(float(np.max(np.abs(norms - 1.0))), 6),
+                "top1_agreement": round(top1_agreement, 4),
+            },
+            "throughput_texts_per_s": {
+                "torch": self._throughput(torch_model, texts, options["repeat"]),
+                "onnx": self._throughput(onnx_model, texts, options["repeat"]),
+            },
+        }
+        payload = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            output_path = Path(options["output"]).resolve()
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(payload, encoding="utf-8")
+        self.stdout.write(payload)
+
+        failures = []
+        if report["accuracy"]["min_cosine"] < options["min_cosine"]:
+            failures.append(
+                f"min_cosine={report['accuracy']['min_cosine']} < {options['min_cosine']}"
+            )
+        if top1_agreement < options["min_top1"]:
+            failures.append(f"top1_agreement={top1_agreement:.4f} < {options['min_top1']}")
+        if failures:
+            raise CommandError("ONNX backend regression: " + "; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("ONNX backend matches the PyTorch model."))
+
+    @staticmethod
+    def _throughput(model, texts: list[str], repeat: int) -> float:
+        model.encode(texts[:8], normalize_embeddings=True)
+        start = time.perf_counter()
+        for _ in range(max(repeat, 1)):
+            model.encode(texts, normalize_embeddings=True)
+        elapsed = time.perf_counter() - start
+        return round(len(texts) * max(repeat, 1) / elapsed, 2) if elapsed else 0.0
+
+    @staticmethod
+    def _load_paragraphs(fixtures_dir: Path) -> list[str]:
+        paragraphs: list[str] = []
+        for path in sorted(fixtures_dir.glob("*.txt")):
+            content = path.read_text(encoding="utf-8")
+            paragraphs.extend(chunk.strip() for chunk in content.split("\n\n") if chunk.strip())
+        return paragraphs
+
+    @staticmethod
+    def _load_aliases(divisions_path: Path) -> list[str]:
+        if not divisions_path.exists():
+            raise CommandError(f"Файл справочника не найден: {divisions_path}")
+        with divisions_path.open("r", encoding="utf-8") as handle:
+            data = yaml.safe_load(handle) or {}
+        aliases: list[str] = []
+        for pu_entry in data.get("pus") or []:
+            for subdivision in pu_entry.get("subdivisions") or []:
+                for value in [subdivision.get("short_name"), subdivision.get("full_name")]:
+                    if value:
+                        aliases.append(str(value))
+                aliases.extend(
+                    str(alias).strip()
+                    for alias in subdivision.get("aliases") or []
+                    if str(alias).strip()
+                )
+        return list(dict.fromkeys(aliases))
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analysis.services.history import JobHistory
+
+
+class Command(BaseCommand):
+    help = "Delete persisted analysis jobs older than the retention period."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=None,
+            help="Хранить задачи N дней (по умолчанию RESULT_RETENTION_DAYS).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        days = options["days"]
+        if days is not None and days < 0:
+            raise CommandError("--days не может быть отрицательным.")
+        jobs, items = JobHistory().purge(days)
+        self.stdout.write(f"Удалено задач: {jobs}, результатов по абзацам: {items}")
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analysis.services.staging import UploadStaging
+
+
+class Command(BaseCommand):
+    help = "Remove staged uploads left behind by crashed or lost analysis tasks."
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            default=None,
+            help="Удалять файлы старше N секунд (по умолчанию UPLOAD_STAGING_TTL_SECONDS).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        max_age = options["max_age"]
+        if max_age is not None and max_age < 0:
+            raise CommandError("--max-age не может быть отрицательным.")
+        staging = UploadStaging()
+        removed = staging.purge_stale(max_age)
+        self.stdout.write(f"Удалено файлов: {removed} ({staging.root})")
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import pstats
+from pathlib import Path
+import tracemalloc
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.analysis.services.result_store import ResultStore
+from apps.analysis.tasks import analyze_docx
+from apps.core.management.profiling import StackSampler, write_allocation_report
+
+PROFILERS = ("cprofile", "sampling")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run analyze_docx in-process under a profiler and write flamegraph-ready output "
+        "and an optional tracemalloc allocation report."
+    )
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument(
+            "--path",
+            required=True,
+            help="Сводка DOCX/RTF или TXT-фикстура (абзацы через пустую строку).",
+        )
+        parser.add_argument(
+            "--profiler",
+            choices=PROFILERS,
+            default="cprofile",
+            help="cprofile — детерминированный профиль (.prof), "
+            "sampling — сэмплирование стеков (.folded).",
+        )
+        parser.add_argument(
+            "--interval-ms",
+            type=float,
+            default=5.0,
+            help="Интервал сэмплирования для --profiler sampling (по умолчанию 5 мс).",
+        )
+        parser.add_argument(
+            "--tracemalloc",
+            action="store_true",
+            help="Снять снимки tracemalloc до и после задачи.",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=30,
+            help="Сколько строк выводить в отчётах (по умолчанию 30).",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default="/data/artifacts",
+            help="Каталог для артефактов профилирования (по умолчанию /data/artifacts).",
+        )
+
+    def handle(self, *args, **options) -> None:
+        source_path = Path(options["path"]).resolve()
+        if not source_path.exists():
+            raise CommandError(f"File not found: {source_path}")
+
+        job_id = uuid4().hex
+        output_dir = Path(options["output_dir"]).resolve() / f"profile_{job_id}"
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        store = ResultStore()
+        store.create_job(job_id)
+        top = max(options["top"], 1)
+
+        if options["tracemalloc"]:
+            tracemalloc.start(25)
+            before = tracemalloc.take_snapshot()
+
+        artifacts: list[Path] = []
+        if options["profiler"] == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.runcall(analyze_docx, job_id, str(source_path))
+            artifacts.extend(self._write_cprofile(profiler, output_dir, top))
+        else:
+            with StackSampler(interval=options["interval_ms"] / 1000) as sampler:
+                analyze_docx(job_id, str(source_path))
+            folded_path = output_dir / "profile.folded"
+            samples = sampler.write_folded(folded_path)
+            if not samples:
+                self.stderr.write("No stack samples collected; try a smaller --interval-ms.")
+            artifacts.append(folded_path)
+
+        if options["tracemalloc"]:
+            after = tracemalloc.take_snapshot()
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            allocations_path = output_dir / "allocations.txt"
+            write_allocation_report(allocations_path, before, after, peak, top)
+            artifacts.append(allocations_path)
+
+        payload = store.get(job_id)
+        store.clear(job_id)
+        if payload.get("status") != "done":
+            raise CommandError(f"Job did not finish: status={payload.get('status')}")
+        items = (payload.get("result") or {}).get("items", [])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Profiled job {job_id}: items={len(items)}; artifacts in {output_dir}"
+            )
+        )
+        for artifact in artifacts:
+            self.stdout.write(f"  {artifact}")
+
+    @staticmethod
+    def _write_cprofile(profiler: cProfile.Profile, output_dir: Path, top: int) -> list[Path]:
+        # profile.prof opens in snakeviz or converts to a flamegraph with flameprof.
+        prof_path = output_dir / "profile.prof"
+        profiler.dump_stats(prof_path)
+        report = io.StringIO()
+        stats = pstats.Stats(profiler, stream=report).strip_dirs()
+        stats.sort_stats("cumulative").print_stats(top)
+        stats.sort_stats("tottime").print_stats(top)
+        report_path = output_dir / "profile_top.txt"
+        report_path.write_text(report.getvalue(), encoding="utf-8")
+        return [prof_path, report_path]
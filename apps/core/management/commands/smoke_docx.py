@@ -6,20 +6,21 @@ from pathlib import Path
 from uuid import uuid4
 
 from django.core.management.base import BaseCommand, CommandError
-from docx import Document
 
-from apps.analysis.tasks import analyze_docx
+from apps.analysis.services.ingest import IngestService, UnsupportedFormatError
+from apps.analysis.tasks import analyze_paragraphs
 from apps.analysis.services.result_store import ResultStore
 
 
 class Command(BaseCommand):
-    help = "Run a smoke analysis on a DOCX file and save summary JSON."
+    help = "Run a smoke analysis on a summary (TXT, DOCX or RTF) and save summary JSON."
 
     def add_arguments(self, parser) -> None:
         parser.add_argument(
             "--path",
             required=True,
-            help="Path to TXT fixture (e.g. /data/fixtures/text/sample_01.txt).",
+            help="Path to a TXT fixture or a DOCX/RTF summary "
+            "(e.g. /data/fixtures/text/sample_01.txt).",
         )
         parser.add_argument(
             "--output",
@@ -39,30 +40,25 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options) -> None:
-        txt_path = Path(options["path"]).resolve()
-        if not txt_path.exists():
-            raise CommandError(f"Fixture not found: {txt_path}")
-        if txt_path.suffix.lower() != ".txt":
-            raise CommandError("Smoke fixtures must be .txt files.")
+        source_path = Path(options["path"]).resolve()
+        if not source_path.exists():
+            raise CommandError(f"Fixture not found: {source_path}")
 
         output_path = Path(options["output"]).resolve()
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        paragraphs = self._read_txt_paragraphs(txt_path)
+        paragraphs = self._read_paragraphs(source_path)
         if not paragraphs:
             raise CommandError("Smoke fixture is empty or has no paragraphs.")
 
-        docx_path = output_path.parent / f"smoke_{uuid4().hex}.docx"
-        self._write_docx(docx_path, paragraphs)
-
         job_id = uuid4().hex
         store = ResultStore()
         store.create_job(job_id)
 
         if options["use_celery"]:
-            analyze_docx.delay(job_id, str(docx_path))
+            analyze_paragraphs.delay(job_id, paragraphs)
         else:
-            analyze_docx(job_id, str(docx_path))
+            analyze_paragraphs(job_id, paragraphs)
 
         start = time.monotonic()
         result_payload: dict | None = None
@@ -102,14 +98,8 @@ class Command(BaseCommand):
             raise CommandError("Smoke test failed: no parsed items found.")
 
     @staticmethod
-    def _read_txt_paragraphs(path: Path) -> list[str]:
-        content = path.read_text(encoding="utf-8")
-        chunks = [chunk.strip() for chunk in content.split("\n\n")]
-        return [chunk for chunk in chunks if chunk]
-
-    @staticmethod
-    def _write_docx(path: Path, paragraphs: list[str]) -> None:
-        document = Document()
-        for paragraph in paragraphs:
-            document.add_paragraph(paragraph)
-        document.save(path)
+    def _read_paragraphs(path: Path) -> list[str]:
+        try:
+            return IngestService().read_paragraphs(path)
+        except UnsupportedFormatError as exc:
+            raise CommandError(str(exc)) from exc
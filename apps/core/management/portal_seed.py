@@ -43,8 +43,10 @@ class DocxSeed:
     case: str
 
 
-def build_local_portal_seed(scale: int = 10) -> tuple[list[SubdivisionSeed], list[EventSeed], list[DocxSeed]]:
-    subdivisions = _load_divisions_from_yaml()
+def build_local_portal_seed(
+    scale: int = 10, divisions_path: Path | None = None
+) -> tuple[list[SubdivisionSeed], list[EventSeed], list[DocxSeed]]:
+    subdivisions = _load_divisions_from_yaml(divisions_path)
     subdivision_lookup = {subdivision.id: subdivision.fullname for subdivision in subdivisions}
 
     base_events = [
@@ -230,8 +232,8 @@ def build_subdivision_uuid(subdivision_id: int) -> str:
     return f"00000000-0000-0000-0000-{subdivision_id:012d}"
 
 
-def _load_divisions_from_yaml() -> list[SubdivisionSeed]:
-    config_path = Path(settings.BASE_DIR) / "configs" / "divisions.yaml"
+def _load_divisions_from_yaml(config_path: Path | None = None) -> list[SubdivisionSeed]:
+    config_path = config_path or Path(settings.BASE_DIR) / "configs" / "divisions.yaml"
     if not config_path.exists():
         raise FileNotFoundError(f"Не найден файл подразделений: {config_path}")
 
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from collections import Counter
+import os
+from pathlib import Path
+import sys
+import threading
+import tracemalloc
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's Python stack on an interval and aggregates folded stacks."""
+
+    def __init__(self, interval: float = 0.005, thread_id: int | None = None) -> None:
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            labels: list[str] = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write_folded(self, path: Path) -> int:
+        """Brendan Gregg folded format, readable by flamegraph.pl and speedscope."""
+        lines = [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+        path.write_text("\n".join(lines) + ("\n" if lines else ""), encoding="utf-8")
+        return sum(self.stacks.values())
+
+
+def write_allocation_report(
+    path: Path,
+    before: tracemalloc.Snapshot,
+    after: tracemalloc.Snapshot,
+    peak_bytes: int,
+    top: int,
+) -> None:
+    ignored = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    )
+    before = before.filter_traces(ignored)
+    after = after.filter_traces(ignored)
+    lines = [f"Peak traced memory: {peak_bytes / 1024 / 1024:.1f} MiB", ""]
+    lines.append(f"Top {top} allocation sites at job end:")
+    for stat in after.statistics("lineno")[:top]:
+        lines.append(f"  {stat}")
+    lines.append("")
+    lines.append(f"Top {top} growth since job start:")
+    for stat in after.compare_to(before, "lineno")[:top]:
+        lines.append(f"  {stat}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
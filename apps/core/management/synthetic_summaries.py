@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+import random
+from typing import Any
+
+import yaml
+
+from apps.core.management.portal_seed import EventSeed, OffenderSeed, build_local_portal_seed
+
+PHRASES = (
+    "{timestamp} службой {alias} выявлены: {offenders}",
+    "{timestamp} на участке {alias} задержан: {offenders}",
+    "{timestamp} нарядом {alias} установлены лица: {offenders}",
+    "{timestamp} {alias} сообщает о задержании: {offenders}",
+)
+# Shifts keep part of the paragraphs inside the ±window match instead of exact hits.
+TIME_SHIFTS_MINUTES = (0, 0, 0, 7, -4)
+
+
+def load_subdivision_aliases(divisions_path: Path) -> dict[int, list[str]]:
+    with divisions_path.open("r", encoding="utf-8") as handle:
+        data: dict[str, Any] = yaml.safe_load(handle) or {}
+    aliases: dict[int, list[str]] = {}
+    for pu_entry in data.get("pus") or []:
+        for subdivision in pu_entry.get("subdivisions") or []:
+            if subdivision.get("id") is None:
+                continue
+            values = [str(alias).strip() for alias in subdivision.get("aliases") or []]
+            aliases[int(subdivision["id"])] = [value for value in values if value]
+    return aliases
+
+
+def load_fixture_paragraphs(fixtures_dir: Path) -> list[str]:
+    paragraphs: list[str] = []
+    for path in sorted(fixtures_dir.glob("*.txt")):
+        content = path.read_text(encoding="utf-8")
+        paragraphs.extend(chunk.strip() for chunk in content.split("\n\n") if chunk.strip())
+    return paragraphs
+
+
+def _format_offender(offender: OffenderSeed) -> str:
+    name = f"{offender.last_name} {offender.first_name} {offender.middle_name}"
+    if offender.date_of_birth:
+        return f"{name} {offender.date_of_birth:%d.%m.%Y}"
+    if offender.birth_year:
+        return f"{name}, {offender.birth_year} г.р."
+    return name
+
+
+def _render_event(event: EventSeed, aliases: list[str], rng: random.Random) -> str:
+    timestamp = event.date_detection + timedelta(minutes=rng.choice(TIME_SHIFTS_MINUTES))
+    alias = rng.choice(aliases) if aliases else event.subdivision_fullname
+    offenders = ", ".join(_format_offender(offender) for offender in event.offenders)
+    return rng.choice(PHRASES).format(
+        timestamp=f"{timestamp:%d.%m.%Y %H:%M}", alias=alias, offenders=offenders
+    )
+
+
+def build_synthetic_summary(
+    paragraphs: int,
+    divisions_path: Path,
+    fixtures_dir: Path,
+    fixture_ratio: float = 0.1,
+    seed: int = 0,
+) -> list[str]:
+    """Paragraphs rendered from the local portal seed of the same scale plus fixture noise."""
+    rng = random.Random(seed)
+    aliases = load_subdivision_aliases(divisions_path)
+    fixtures = load_fixture_paragraphs(fixtures_dir)
+    _subdivisions, events, _docx_events = build_local_portal_seed(paragraphs, divisions_path)
+    result: list[str] = []
+    for index in range(paragraphs):
+        if fixtures and rng.random() < fixture_ratio:
+            result.append(fixtures[index % len(fixtures)])
+            continue
+        event = events[index % len(events)]
+        result.append(_render_event(event, aliases.get(event.subdivision_id, []), rng))
+    return result
@@ -17,6 +17,9 @@ from django.views.decorators.http import require_http_methods
 from markdown import markdown
 import redis
 
+from apps.analysis.services.inference_threads import worker_thread_configs
+from apps.analysis.services.metrics import render_metrics
+
 
 @require_http_methods(["GET", "POST"])
 def login_view(request: HttpRequest) -> HttpResponse:
@@ -121,7 +124,9 @@ def health_view(request: HttpRequest) -> JsonResponse:
         )
         return {
             "model_name": settings.SEMANTIC_MODEL_NAME,
+            "backend": os.environ.get("SEMANTIC_MODEL_BACKEND", "torch"),
             "offline": offline,
+            "threads": worker_thread_configs(),
         }
 
     record("semantic_model", semantic_info)
@@ -141,3 +146,11 @@ def health_view(request: HttpRequest) -> JsonResponse:
     }
     status = 200 if ok else 503
     return JsonResponse(payload, status=status)
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=403)
+    payload, content_type = render_metrics()
+    return HttpResponse(payload, content_type=content_type)
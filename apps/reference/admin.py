@@ -1,4 +1,5 @@
 from django.contrib import admin, messages
+from django.db import transaction
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
 from django.urls import path
@@ -6,16 +7,33 @@ from django.urls import path
 from .forms import EventTypeImportForm
 from .models import EventType, EventTypePattern, Pu, SubdivisionRef
 from .services.event_type_import import import_event_types_from_xlsx
+from .services.subdivision_version import bump_subdivisions_version
+
+
+class SubdivisionVersionAdminMixin:
+    """Bumps the subdivision reference version after admin edits, so workers reload it."""
+
+    def save_model(self, request, obj, form, change) -> None:
+        super().save_model(request, obj, form, change)
+        transaction.on_commit(bump_subdivisions_version)
+
+    def delete_model(self, request, obj) -> None:
+        super().delete_model(request, obj)
+        transaction.on_commit(bump_subdivisions_version)
+
+    def delete_queryset(self, request, queryset) -> None:
+        super().delete_queryset(request, queryset)
+        transaction.on_commit(bump_subdivisions_version)
 
 
 @admin.register(Pu)
-class PuAdmin(admin.ModelAdmin):
+class PuAdmin(SubdivisionVersionAdminMixin, admin.ModelAdmin):
     list_display = ("short_name", "full_name")
     search_fields = ("short_name", "full_name")
 
 
 @admin.register(SubdivisionRef)
-class SubdivisionRefAdmin(admin.ModelAdmin):
+class SubdivisionRefAdmin(SubdivisionVersionAdminMixin, admin.ModelAdmin):
     list_display = ("code", "short_name", "full_name", "pu")
     search_fields = ("code", "short_name", "full_name")
     list_filter = ("pu",)
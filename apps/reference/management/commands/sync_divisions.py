@@ -8,7 +8,12 @@ from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 
-from apps.reference.models import Pu, SubdivisionRef
+from apps.reference.services.division_sync import (
+    BULK_BATCH_SIZE,
+    DivisionSyncError,
+    sync_divisions,
+)
+from apps.reference.services.subdivision_version import bump_subdivisions_version
 
 
 def _resolve_path(path_value: str) -> Path:
@@ -18,34 +23,6 @@ def _resolve_path(path_value: str) -> Path:
     return Path(settings.BASE_DIR) / path
 
 
-def _format_locality(locality: dict[str, Any] | None) -> str:
-    if not locality:
-        return ""
-    kind = str(locality.get("kind") or "").strip()
-    name = str(locality.get("name") or "").strip()
-    if not kind or not name:
-        return ""
-    return f"{kind} {name}"
-
-
-def _build_short_name(div_type: str, number: int | None, name: str | None) -> str:
-    if number is not None:
-        return f"{div_type} №{number}"
-    if name:
-        return f"{div_type} «{name}»"
-    return div_type
-
-
-def _build_full_name(
-    div_type: str, number: int | None, name: str | None, locality: dict[str, Any] | None
-) -> str:
-    short_name = _build_short_name(div_type, number, name)
-    locality_label = _format_locality(locality)
-    if locality_label:
-        return f"{short_name} ({locality_label})"
-    return short_name
-
-
 class Command(BaseCommand):
     help = "Sync subdivision reference data from a YAML file."
 
@@ -55,8 +32,18 @@ class Command(BaseCommand):
             default="configs/divisions.yaml",
             help="Путь к YAML с подразделениями (по умолчанию configs/divisions.yaml).",
         )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Показать, что изменится, без сохранения изменений.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BULK_BATCH_SIZE,
+            help=f"Строк в одном INSERT/UPDATE (по умолчанию {BULK_BATCH_SIZE}).",
+        )
 
-    @transaction.atomic
     def handle(self, *args, **options) -> None:
         config_path = _resolve_path(options["file"])
         if not config_path.exists():
@@ -65,73 +52,24 @@ class Command(BaseCommand):
         with config_path.open("r", encoding="utf-8") as handle:
             data: dict[str, Any] = yaml.safe_load(handle) or {}
 
-        pus = data.get("pus") or []
-        created = 0
-        updated = 0
-        alias_count = 0
+        dry_run = options["dry_run"]
+        try:
+            report = sync_divisions(data, dry_run=dry_run, batch_size=options["batch_size"])
+        except DivisionSyncError as exc:
+            raise CommandError(str(exc)) from exc
 
-        for pu_entry in pus:
-            pu_name = pu_entry.get("name")
-            if not pu_name:
-                raise CommandError("Каждое ПУ должно содержать поле 'name'.")
-            pu_full_name = pu_entry.get("full_name") or pu_name
-            pu, _ = Pu.objects.update_or_create(
-                short_name=pu_name,
-                defaults={"full_name": pu_full_name},
-            )
-
-            subdivisions = pu_entry.get("subdivisions") or []
-            for subdivision in subdivisions:
-                div_type = subdivision.get("type")
-                if not div_type:
-                    raise CommandError("Подразделение должно содержать поле 'type'.")
-
-                number = subdivision.get("number")
-                name = subdivision.get("name")
-                locality = subdivision.get("locality") or {}
-                full_name = subdivision.get("fullname") or subdivision.get("full_name")
-                if not full_name:
-                    full_name = _build_full_name(div_type, number, name, locality)
-                short_name = subdivision.get("short_name")
-                if not short_name:
-                    short_name = _build_short_name(div_type, number, name)
-
-                code = subdivision.get("code")
-                raw_aliases = subdivision.get("aliases") or []
-                aliases = [
-                    str(alias).strip()
-                    for alias in raw_aliases
-                    if str(alias).strip()
-                ]
-                alias_count += len(aliases)
-
-                defaults = {
-                    "pu": pu,
-                    "short_name": short_name,
-                    "full_name": full_name,
-                    "aliases": aliases,
-                    "code": code,
-                }
+        if report.changed and not dry_run:
+            # Workers pick up the new reference without a restart.
+            transaction.on_commit(bump_subdivisions_version)
 
-                if code:
-                    _, created_flag = SubdivisionRef.objects.update_or_create(
-                        code=code,
-                        defaults=defaults,
-                    )
-                else:
-                    _, created_flag = SubdivisionRef.objects.update_or_create(
-                        full_name=full_name,
-                        defaults=defaults,
-                    )
-
-                if created_flag:
-                    created += 1
-                else:
-                    updated += 1
-
-        self.stdout.write(
-            self.style.SUCCESS(
-                "Справочник подразделений синхронизирован. "
-                f"Создано: {created}, обновлено: {updated}, алиасов: {alias_count}."
-            )
+        summary = (
+            f"ПУ создано: {report.pus_created}, обновлено: {report.pus_updated}. "
+            f"Подразделений создано: {report.created}, обновлено: {report.updated}, "
+            f"без изменений: {report.unchanged}, алиасов: {report.alias_count}."
         )
+        if dry_run:
+            self.stdout.write(f"Пробный запуск, изменения не сохранены. {summary}")
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f"Справочник подразделений синхронизирован. {summary}")
+            )
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from django.db import transaction
+
+from apps.reference.models import Pu, SubdivisionRef
+
+BULK_BATCH_SIZE = 500
+VALUE_FIELDS = ("short_name", "full_name", "aliases", "code")
+
+
+class DivisionSyncError(ValueError):
+    pass
+
+
+@dataclass
+class DivisionSyncReport:
+    pus_created: int = 0
+    pus_updated: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    alias_count: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.pus_created or self.pus_updated or self.created or self.updated)
+
+
+def _format_locality(locality: dict[str, Any] | None) -> str:
+    if not locality:
+        return ""
+    kind = str(locality.get("kind") or "").strip()
+    name = str(locality.get("name") or "").strip()
+    if not kind or not name:
+        return ""
+    return f"{kind} {name}"
+
+
+def _build_short_name(div_type: str, number: int | None, name: str | None) -> str:
+    if number is not None:
+        return f"{div_type} №{number}"
+    if name:
+        return f"{div_type} «{name}»"
+    return div_type
+
+
+def _build_full_name(
+    div_type: str, number: int | None, name: str | None, locality: dict[str, Any] | None
+) -> str:
+    short_name = _build_short_name(div_type, number, name)
+    locality_label = _format_locality(locality)
+    if locality_label:
+        return f"{short_name} ({locality_label})"
+    return short_name
+
+
+def _subdivision_values(subdivision: dict[str, Any]) -> dict[str, Any]:
+    div_type = subdivision.get("type")
+    if not div_type:
+        raise DivisionSyncError("Подразделение должно содержать поле 'type'.")
+    number = subdivision.get("number")
+    name = subdivision.get("name")
+    locality = subdivision.get("locality") or {}
+    full_name = subdivision.get("fullname") or subdivision.get("full_name")
+    if not full_name:
+        full_name = _build_full_name(div_type, number, name, locality)
+    short_name = subdivision.get("short_name")
+    if not short_name:
+        short_name = _build_short_name(div_type, number, name)
+    raw_aliases = subdivision.get("aliases") or []
+    return {
+        "short_name": short_name,
+        "full_name": full_name,
+        "aliases": [str(alias).strip() for alias in raw_aliases if str(alias).strip()],
+        "code": subdivision.get("code"),
+    }
+
+
+def _sync_pus(
+    pu_entries: list[dict[str, Any]], report: DivisionSyncReport, batch_size: int
+) -> dict[str, Pu]:
+    pus: dict[str, Pu] = {}
+    for pu in Pu.objects.order_by("pk"):
+        pus.setdefault(pu.short_name, pu)
+    to_create: dict[str, Pu] = {}
+    to_update: dict[str, Pu] = {}
+    for pu_entry in pu_entries:
+        pu_name = pu_entry.get("name")
+        if not pu_name:
+            raise DivisionSyncError("Каждое ПУ должно содержать поле 'name'.")
+        full_name = pu_entry.get("full_name") or pu_name
+        pu = pus.get(pu_name)
+        if pu is None:
+            pu = pus[pu_name] = to_create[pu_name] = Pu(short_name=pu_name)
+        elif pu.full_name != full_name and pu_name not in to_create:
+            to_update[pu_name] = pu
+        pu.full_name = full_name
+    Pu.objects.bulk_create(to_create.values(), batch_size=batch_size)
+    Pu.objects.bulk_update(to_update.values(), ["full_name"], batch_size=batch_size)
+    report.pus_created = len(to_create)
+    report.pus_updated = len(to_update)
+    return pus
+
+
+def sync_divisions(
+    data: dict[str, Any], *, dry_run: bool = False, batch_size: int = BULK_BATCH_SIZE
+) -> DivisionSyncReport:
+    """Upsert Pu and SubdivisionRef rows from a divisions YAML document.
+
+    Existing rows are read in one query per model and diffed in memory; only new and
+    changed rows are written, with ``bulk_create``/``bulk_update`` in batches.
+    Subdivisions are matched by ``code`` or, without one, by ``full_name``.
+    """
+    report = DivisionSyncReport()
+    pu_entries = data.get("pus") or []
+    with transaction.atomic():
+        pus = _sync_pus(pu_entries, report, batch_size)
+
+        by_code: dict[str, SubdivisionRef] = {}
+        by_full_name: dict[str, SubdivisionRef] = {}
+        for row in SubdivisionRef.objects.order_by("pk"):
+            if row.code:
+                by_code.setdefault(row.code, row)
+            by_full_name.setdefault(row.full_name, row)
+
+        to_create: list[SubdivisionRef] = []
+        pending: set[int] = set()
+        to_update: dict[int, SubdivisionRef] = {}
+        for pu_entry in pu_entries:
+            pu = pus[pu_entry["name"]]
+            for subdivision in pu_entry.get("subdivisions") or []:
+                values = {"pu": pu, **_subdivision_values(subdivision)}
+                report.alias_count += len(values["aliases"])
+                code = values["code"]
+                row = by_code.get(code) if code else by_full_name.get(values["full_name"])
+                if row is None:
+                    row = SubdivisionRef(**values)
+                    to_create.append(row)
+                    pending.add(id(row))
+                    report.created += 1
+                elif row.pu_id == pu.pk and all(
+                    getattr(row, field) == values[field] for field in VALUE_FIELDS
+                ):
+                    report.unchanged += 1
+                else:
+                    for field, value in values.items():
+                        setattr(row, field, value)
+                    if id(row) not in pending:
+                        to_update[row.pk] = row
+                    report.updated += 1
+                # Later entries with the same key update this row, as update_or_create did.
+                if code:
+                    by_code[code] = row
+                else:
+                    by_full_name[values["full_name"]] = row
+
+        SubdivisionRef.objects.bulk_create(to_create, batch_size=batch_size)
+        SubdivisionRef.objects.bulk_update(
+            to_update.values(), ["pu", *VALUE_FIELDS], batch_size=batch_size
+        )
+        if dry_run:
+            transaction.set_rollback(True)
+    return report
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import logging
+import uuid
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "reference:subdivisions:version"
+
+
+def _client() -> redis.Redis:
+    return redis.Redis.from_url(settings.REDIS_URL)
+
+
+def subdivisions_version() -> str | None:
+    """Current subdivision reference version, or None if unknown or Redis is down."""
+    try:
+        value = _client().get(VERSION_KEY)
+    except redis.RedisError as exc:
+        logger.warning("Subdivision reference version unavailable: %s", exc)
+        return None
+    return value.decode("utf-8") if value is not None else None
+
+
+def bump_subdivisions_version() -> str | None:
+    """Mark the subdivision reference as changed so workers reload it.
+
+    The version is a random token rather than a counter: a flushed Redis must not
+    hand out a number a worker already has cached.
+    """
+    version = uuid.uuid4().hex
+    try:
+        _client().set(VERSION_KEY, version)
+    except redis.RedisError as exc:
+        logger.warning("Could not bump subdivision reference version: %s", exc)
+        return None
+    logger.info("Subdivision reference version bumped to %s", version)
+    return version
@@ -1,9 +1,61 @@
 import os
 
 from celery import Celery
+from celery.signals import (
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 app = Celery("analiz_svodok")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
+
+_worker_concurrency: int | None = None
+_worker_hostname: str | None = None
+
+
+@worker_init.connect
+def remember_worker_concurrency(sender=None, **_kwargs) -> None:
+    global _worker_concurrency, _worker_hostname
+    _worker_concurrency = getattr(sender, "concurrency", None)
+    _worker_hostname = getattr(sender, "hostname", None)
+
+
+@worker_init.connect
+def start_metrics_exporter(**_kwargs) -> None:
+    from django.conf import settings
+
+    from apps.analysis.services.metrics import start_worker_exporter
+
+    start_worker_exporter(settings.METRICS_WORKER_PORT)
+
+
+@worker_process_init.connect
+def configure_inference_threads(**_kwargs) -> None:
+    from apps.analysis.services.inference_threads import (
+        apply_thread_config,
+        publish_thread_config,
+    )
+
+    config = apply_thread_config(concurrency=_worker_concurrency)
+    if _worker_hostname:
+        publish_thread_config(_worker_hostname, config)
+
+
+@worker_process_shutdown.connect
+def release_process_metrics(pid=None, **_kwargs) -> None:
+    from apps.analysis.services.metrics import mark_process_dead
+
+    mark_process_dead(pid or os.getpid())
+
+
+@worker_shutdown.connect
+def forget_inference_threads(sender=None, **_kwargs) -> None:
+    from apps.analysis.services.inference_threads import forget_worker_threads
+
+    if _worker_hostname:
+        forget_worker_threads(_worker_hostname)
@@ -110,11 +110,70 @@ LOGIN_REDIRECT_URL = "/upload"
 
 REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
 RESULT_TTL_SECONDS = int(os.environ.get("RESULT_TTL_SECONDS", "1800"))
+RESULT_ENCODING = os.environ.get("RESULT_ENCODING", "msgpack")
+# Optional job history in app_db; Redis keeps serving fresh results.
+RESULT_PERSIST = os.environ.get("RESULT_PERSIST", "false").lower() in {"1", "true", "yes"}
+RESULT_RETENTION_DAYS = int(os.environ.get("RESULT_RETENTION_DAYS", "90"))
+HISTORY_PAGE_SIZE = int(os.environ.get("HISTORY_PAGE_SIZE", "25"))
+
+# JSON API (/api/jobs) for programmatic submission; disabled while API_TOKEN is empty.
+API_TOKEN = os.environ.get("API_TOKEN", "")
+API_MAX_FILES_PER_REQUEST = int(os.environ.get("API_MAX_FILES_PER_REQUEST", "50"))
+
+# Uploads are handed to workers through a volume shared with web (or Redis for small files).
+UPLOAD_STAGING_BACKEND = os.environ.get("UPLOAD_STAGING_BACKEND", "auto")
+UPLOAD_STAGING_DIR = os.environ.get("UPLOAD_STAGING_DIR", "/data/uploads")
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_STAGING_REDIS_MAX_BYTES = int(
+    os.environ.get("UPLOAD_STAGING_REDIS_MAX_BYTES", str(1024 * 1024))
+)
+UPLOAD_STAGING_TTL_SECONDS = int(os.environ.get("UPLOAD_STAGING_TTL_SECONDS", "86400"))
 
 CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", REDIS_URL)
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", REDIS_URL)
 CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 60 * 15
+# Tasks are acknowledged after they finish, so a job whose worker died (OOM, redeploy)
+# is redelivered and resumes from its chunk checkpoints. Redis redelivers unacknowledged
+# tasks after the visibility timeout, which must exceed the longest task.
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+# A job whose task was delivered more times than this (each time its worker died) fails.
+ANALYSIS_MAX_DELIVERIES = int(os.environ.get("ANALYSIS_MAX_DELIVERIES", "3"))
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "visibility_timeout": int(
+        os.environ.get("CELERY_VISIBILITY_TIMEOUT", str(CELERY_TASK_TIME_LIMIT + 300))
+    )
+}
+CELERY_WORKER_CONCURRENCY = int(os.environ.get("CELERY_WORKER_CONCURRENCY", "0")) or None
+# Jobs are routed to the "small" or "large" queue by paragraph count; one process per job.
+CELERY_TASK_DEFAULT_QUEUE = "small"
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Progress writes and cancellation checks happen once per chunk of paragraphs.
+ANALYSIS_CHUNK_PARAGRAPHS = int(os.environ.get("ANALYSIS_CHUNK_PARAGRAPHS", "10"))
+ANALYSIS_LARGE_JOB_PARAGRAPHS = int(os.environ.get("ANALYSIS_LARGE_JOB_PARAGRAPHS", "300"))
+# Running jobs per user (0 = unlimited); extra jobs wait and retry every DEFER seconds.
+ANALYSIS_USER_MAX_RUNNING = int(os.environ.get("ANALYSIS_USER_MAX_RUNNING", "2"))
+ANALYSIS_USER_DEFER_SECONDS = int(os.environ.get("ANALYSIS_USER_DEFER_SECONDS", "5"))
+
+# 0 = auto: intra-op threads are split evenly between worker processes.
+TORCH_INTRA_OP_THREADS = int(os.environ.get("TORCH_INTRA_OP_THREADS", "0"))
+TORCH_INTER_OP_THREADS = int(os.environ.get("TORCH_INTER_OP_THREADS", "0"))
+TOKENIZERS_PARALLELISM = os.environ.get("TOKENIZERS_PARALLELISM", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+
+# Prometheus: /metrics on the web app, a separate exporter port on workers (0 = off).
+# Multi-process workers need PROMETHEUS_MULTIPROC_DIR set before start.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_WORKER_PORT = int(os.environ.get("METRICS_WORKER_PORT", "0"))
+METRICS_QUEUE_NAMES = [
+    name.strip()
+    for name in os.environ.get("METRICS_QUEUE_NAMES", "small,large").split(",")
+    if name.strip()
+]
 
 DOCS_DIR = BASE_DIR / "docs"
 
@@ -122,6 +181,15 @@ SEMANTIC_MODEL_NAME = os.environ.get(
     "SEMANTIC_MODEL_NAME", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
 )
 EVENT_TYPE_MATCH_THRESHOLD = float(os.environ.get("EVENT_TYPE_MATCH_THRESHOLD", "0.78"))
+SEMANTIC_EMBEDDING_CACHE_SIZE = int(os.environ.get("SEMANTIC_EMBEDDING_CACHE_SIZE", "20000"))
+SEMANTIC_EMBEDDING_CACHE_REDIS = os.environ.get(
+    "SEMANTIC_EMBEDDING_CACHE_REDIS", ""
+).lower() in {"1", "true", "yes"}
+SEMANTIC_EMBEDDING_CACHE_REDIS_TTL = int(
+    os.environ.get("SEMANTIC_EMBEDDING_CACHE_REDIS_TTL", str(60 * 60 * 24 * 7))
+)
+# Workers reload the subdivision index when sync_divisions or the admin bump its version.
+SUBDIVISION_VERSION_CHECK_SECONDS = int(os.environ.get("SUBDIVISION_VERSION_CHECK_SECONDS", "30"))
 
 APP_ADMIN_LOGIN = os.environ.get("APP_ADMIN_LOGIN", "admin")
 APP_ADMIN_PASSWORD = os.environ.get("APP_ADMIN_PASSWORD", "admin")
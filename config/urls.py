@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import path
 
 from apps.core import views as core_views
+from apps.analysis import api as analysis_api
 from apps.analysis import views as analysis_views
 
 urlpatterns = [
@@ -12,7 +13,17 @@ urlpatterns = [
     path("upload", analysis_views.upload_view, name="upload"),
     path("jobs/<uuid:job_id>/progress", analysis_views.progress_view, name="progress"),
     path("jobs/<uuid:job_id>/result", analysis_views.result_view, name="result"),
+    path(
+        "jobs/<uuid:job_id>/export.json",
+        analysis_views.result_export_view,
+        name="result_export",
+    ),
     path("jobs/<uuid:job_id>/clear", analysis_views.clear_view, name="clear"),
+    path("history", analysis_views.history_view, name="history"),
+    path("api/jobs", analysis_api.jobs_view, name="api_jobs"),
+    path("api/jobs/<uuid:job_id>", analysis_api.job_detail_view, name="api_job_detail"),
+    path("api/jobs/<uuid:job_id>/items", analysis_api.job_items_view, name="api_job_items"),
     path("help", core_views.help_view, name="help"),
     path("health", core_views.health_view, name="health"),
+    path("metrics", core_views.metrics_view, name="metrics"),
 ]
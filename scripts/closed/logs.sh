@@ -15,4 +15,4 @@ if [[ -z "${TAG:-}" ]]; then
   exit 1
 fi
 
-docker compose -f "$COMPOSE_FILE" logs -f --tail=200 ${*:-web celery}
+docker compose -f "$COMPOSE_FILE" logs -f --tail=200 ${*:-web celery-small celery-large}
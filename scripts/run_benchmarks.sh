@@ -0,0 +1,25 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Usage:
+#   scripts/run_benchmarks.sh check   # compare with the latest stored baseline, fail on regression
+#   scripts/run_benchmarks.sh save    # store a new baseline for this machine
+MODE="${1:-check}"
+STORAGE="file://tests/benchmarks/baselines"
+THRESHOLD="${BENCH_FAIL_THRESHOLD:-min:25%}"
+
+case "$MODE" in
+  save)
+    python -m pytest tests/benchmarks --benchmark-only \
+      --benchmark-storage="$STORAGE" --benchmark-save=baseline
+    ;;
+  check)
+    python -m pytest tests/benchmarks --benchmark-only \
+      --benchmark-storage="$STORAGE" --benchmark-compare \
+      --benchmark-compare-fail="$THRESHOLD"
+    ;;
+  *)
+    echo "Unknown mode: $MODE (expected check or save)" >&2
+    exit 1
+    ;;
+esac
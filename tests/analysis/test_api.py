@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import io
+import json
+from types import SimpleNamespace
+import zipfile
+
+import pytest
+
+from docx import Document
+
+from apps.analysis import jobs
+from apps.analysis.services.result_store import ResultStore
+
+
+def _docx_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Document().save(buffer)
+    return buffer.getvalue()
+
+
+DOCX_BYTES = _docx_bytes()
+
+
+@pytest.fixture(autouse=True)
+def _api_token(settings):
+    settings.API_TOKEN = "secret"
+
+
+@pytest.fixture
+def queued(monkeypatch, settings, tmp_path):
+    settings.UPLOAD_STAGING_BACKEND = "filesystem"
+    settings.UPLOAD_STAGING_DIR = str(tmp_path)
+    calls: list[tuple[str, str]] = []
+
+    def apply_async(args, queue):
+        calls.append(args)
+        return SimpleNamespace(id=f"task-{len(calls)}")
+
+    monkeypatch.setattr(jobs.analyze_docx, "apply_async", apply_async)
+    monkeypatch.setattr(jobs.analyze_paragraphs, "apply_async", apply_async)
+    return calls
+
+
+def _auth() -> dict[str, str]:
+    return {"HTTP_AUTHORIZATION": "Bearer secret"}
+
+
+def test_api_requires_token(client, fake_redis) -> None:
+    assert client.post("/api/jobs").status_code == 401
+    assert client.post("/api/jobs", HTTP_AUTHORIZATION="Bearer wrong").status_code == 401
+
+
+def test_post_jobs_accepts_multiple_files_and_replays_idempotency_key(
+    client, fake_redis, queued
+) -> None:
+    files = [io.BytesIO(DOCX_BYTES), io.BytesIO(DOCX_BYTES)]
+    files[0].name, files[1].name = "a.docx", "b.docx"
+
+    response = client.post(
+        "/api/jobs", {"files": files}, HTTP_IDEMPOTENCY_KEY="batch-1", **_auth()
+    )
+
+    assert response.status_code == 202
+    created = response.json()["jobs"]
+    assert [job["filename"] for job in created] == ["a.docx", "b.docx"]
+    assert [job_id for job_id, _path in queued] == [job["job_id"] for job in created]
+    assert created[0]["status_url"] == f"/api/jobs/{created[0]['job_id']}"
+
+    retry = client.post(
+        "/api/jobs",
+        {"files": [io.BytesIO(DOCX_BYTES)]},
+        HTTP_IDEMPOTENCY_KEY="batch-1",
+        **_auth(),
+    )
+
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["jobs"] == created
+    assert len(queued) == 2
+
+
+def test_failed_submission_cancels_queued_jobs_and_frees_idempotency_key(
+    client, fake_redis, queued, monkeypatch, tmp_path
+) -> None:
+    queue_one = jobs.analyze_docx.apply_async
+    monkeypatch.setattr(jobs.analyze_docx.app.control, "revoke", lambda task_id: None)
+
+    def broker_down_on_second(args, queue):
+        if queued:
+            raise OSError("broker unavailable")
+        return queue_one(args, queue=queue)
+
+    monkeypatch.setattr(jobs.analyze_docx, "apply_async", broker_down_on_second)
+    files = [io.BytesIO(DOCX_BYTES), io.BytesIO(DOCX_BYTES)]
+    files[0].name, files[1].name = "a.docx", "b.docx"
+
+    with pytest.raises(OSError):
+        client.post("/api/jobs", {"files": files}, HTTP_IDEMPOTENCY_KEY="batch-2", **_auth())
+
+    assert ResultStore().get_submission("batch-2") is None
+    assert ResultStore().is_cancelled(queued[0][0])
+    assert [path.name for path in tmp_path.iterdir()] == [f"{queued[0][0]}.upload"]
+
+    monkeypatch.setattr(jobs.analyze_docx, "apply_async", queue_one)
+    files = [io.BytesIO(DOCX_BYTES)]
+    files[0].name = "a.docx"
+    retry = client.post("/api/jobs", {"files": files}, HTTP_IDEMPOTENCY_KEY="batch-2", **_auth())
+    assert retry.status_code == 202
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+def test_post_jobs_accepts_raw_body_and_rejects_unknown_format(client, fake_redis, queued) -> None:
+    response = client.post(
+        "/api/jobs",
+        DOCX_BYTES,
+        content_type="application/octet-stream",
+        HTTP_X_FILENAME="summary.docx",
+        **_auth(),
+    )
+    assert response.status_code == 202
+    assert response.json()["jobs"][0]["filename"] == "summary.docx"
+
+    rejected = client.post(
+        "/api/jobs", b"\x00\x01binary", content_type="application/octet-stream", **_auth()
+    )
+    assert rejected.status_code == 415
+    assert len(queued) == 1
+    staged_path = queued[0][1].removeprefix("file:")
+    assert open(staged_path, "rb").read() == DOCX_BYTES
+
+
+def test_api_and_upload_form_reject_pdf_and_other_zip_files(
+    client, fake_redis, queued, django_user_model, tmp_path
+) -> None:
+    pdf = b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n1 0 obj << /Type /Catalog >>"
+    rejected = client.post(
+        "/api/jobs", pdf, content_type="application/octet-stream", **_auth()
+    )
+    not_docx = io.BytesIO()
+    with zipfile.ZipFile(not_docx, "w") as archive:
+        archive.writestr("xl/workbook.xml", "<workbook/>")
+    zip_body = client.post(
+        "/api/jobs", not_docx.getvalue(), content_type="application/octet-stream", **_auth()
+    )
+    client.force_login(django_user_model.objects.create_user("ivanov", "secret"))
+    upload = io.BytesIO(pdf)
+    upload.name = "summary.docx"
+    form = client.post("/upload", {"docx": upload})
+
+    assert rejected.status_code == 415
+    assert zip_body.status_code == 415
+    assert form.status_code == 415
+    assert queued == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_post_jobs_rejects_oversized_upload(client, fake_redis, queued, settings) -> None:
+    settings.UPLOAD_MAX_BYTES = 8
+
+    response = client.post(
+        "/api/jobs", DOCX_BYTES, content_type="application/octet-stream", **_auth()
+    )
+
+    assert response.status_code == 413
+    assert queued == []
+
+
+def test_post_jobs_accepts_paragraph_lists(client, fake_redis, queued) -> None:
+    response = client.post(
+        "/api/jobs",
+        {"documents": [{"filename": "svodka", "paragraphs": ["Абзац 1", "Абзац 2"]}]},
+        content_type="application/json",
+        **_auth(),
+    )
+
+    assert response.status_code == 202
+    assert response.json()["jobs"][0]["filename"] == "svodka"
+    assert queued[0][1] == ["Абзац 1", "Абзац 2"]
+    job_id = response.json()["jobs"][0]["job_id"]
+    queue = client.get(f"/api/jobs/{job_id}", **_auth()).json()["queue"]
+    assert queue["queue"] == "small"
+    assert queue["position"] == 1
+    invalid = client.post(
+        "/api/jobs", {"documents": [{"paragraphs": [1]}]}, content_type="application/json", **_auth()
+    )
+    assert invalid.status_code == 400
+
+
+def test_delete_job_cancels_and_revokes_task(client, fake_redis, queued, monkeypatch) -> None:
+    revoked: list[str] = []
+    monkeypatch.setattr(jobs.analyze_docx.app.control, "revoke", revoked.append)
+    response = client.post(
+        "/api/jobs", {"paragraphs": ["Абзац"]}, content_type="application/json", **_auth()
+    )
+    job_id = response.json()["jobs"][0]["job_id"]
+
+    cancelled = client.delete(f"/api/jobs/{job_id}", **_auth())
+
+    assert cancelled.status_code == 200
+    assert revoked == ["task-1"]
+    assert ResultStore().is_cancelled(job_id)
+    assert client.get(f"/api/jobs/{job_id}", **_auth()).status_code == 404
+
+
+def test_job_status_and_paginated_items(client, fake_redis) -> None:
+    store = ResultStore()
+    store.create_job("7d9f5b9e-3c55-4a3b-9a52-0d3c1a2f4b10")
+    store.set_result(
+        "7d9f5b9e-3c55-4a3b-9a52-0d3c1a2f4b10",
+        {"items": [{"paragraph": index} for index in range(5)], "metrics": {"paragraphs": 5}},
+    )
+    base = "/api/jobs/7d9f5b9e-3c55-4a3b-9a52-0d3c1a2f4b10"
+
+    status = client.get(base, **_auth()).json()
+    page = client.get(f"{base}/items?page=2&page_size=2", **_auth()).json()
+
+    assert status["status"] == "done"
+    assert status["items_count"] == 5
+    assert page["count"] == 5
+    assert page["num_pages"] == 3
+    assert [item["paragraph"] for item in page["items"]] == [2, 3]
+    assert page["next"] == f"{base}/items?page=3&page_size=2"
+    assert page["previous"] == f"{base}/items?page=1&page_size=2"
+    assert client.get(f"{base}/items?page=0", **_auth()).status_code == 400
+    missing = client.get("/api/jobs/00000000-0000-0000-0000-000000000000", **_auth())
+    assert missing.status_code == 404
+    assert json.loads(missing.content)["error"]
@@ -5,11 +5,13 @@ from apps.analysis.services.compare import (
     dedupe_offenders,
     evaluate_time,
     jaccard_similarity,
+    locate_span,
     normalize_name,
     normalize_offenders,
     rule_two_of_three,
 )
 from apps.analysis.dto import ExtractedEvent, Offender, PortalEvent
+from apps.analysis.services.presentation import render_item
 
 
 def test_normalize_name_replaces_yo():
@@ -88,7 +90,17 @@ def test_compare_offenders_diff_and_status():
     result = CompareService().compare(extracted_event, [portal_event], 0.8, 30)
     offenders_status = result["attributes"]["offenders"]
     assert offenders_status["status"] == "!"
-    assert "Несовпадение ДР" in " ".join(result["explanation"])
+    assert offenders_status["diff"]["mismatch"] == [
+        {
+            "name": "иванов иван",
+            "status": "mismatch",
+            "extracted_dob": "1991",
+            "stored_dobs": ["1992-01-01"],
+        }
+    ]
+    assert "Несовпадение ДР для иванов иван: извлечено 1991, в БД 1992-01-01" in (
+        render_item(result)["explanation"]
+    )
 
 
 def test_dedupe_offenders_in_output():
@@ -116,3 +128,100 @@ def test_dedupe_offenders_in_output():
     result = CompareService().compare(extracted_event, [portal_event], 0.8, 30)
     offenders_status = result["attributes"]["offenders"]
     assert offenders_status["value"].count("Иванов") == 1
+
+
+def test_offender_caches_normalized_name_and_key():
+    offender = Offender(
+        first_name="Пётр", middle_name=None, last_name="  Иванов ", date_of_birth=date(1990, 5, 5)
+    )
+    assert offender.normalized_name == "иванов петр"
+    assert offender.key == "иванов петр|1990-05-05"
+    assert not hasattr(offender, "__dict__")
+    assert offender == Offender(
+        first_name="Пётр", middle_name=None, last_name="  Иванов ", date_of_birth=date(1990, 5, 5)
+    )
+
+
+def test_compare_dedupes_only_matched_candidates():
+    offender = Offender(first_name="Иван", middle_name=None, last_name="Иванов", birth_year=1991)
+    extracted_event = ExtractedEvent(
+        paragraph_index=0,
+        raw_text="Текст",
+        timestamp=datetime(2024, 1, 1, 12, 0),
+        timestamp_has_time=True,
+        timestamp_text="01.01.2024 12:00",
+        subdivision_text="Отдел А",
+        subdivision_name="Отдел А",
+        subdivision_similarity=0.9,
+        offenders=[offender],
+    )
+    matched = PortalEvent(
+        event_id="1",
+        date_detection=datetime(2024, 1, 1, 12, 0),
+        subdivision_name="Отдел А",
+        subdivision_short_name="Отдел А",
+        subdivision_full_name="Отдел А",
+        offenders=[offender, offender],
+    )
+    unmatched = PortalEvent(
+        event_id="2",
+        date_detection=datetime(2024, 1, 3, 12, 0),
+        subdivision_name="Отдел Б",
+        subdivision_short_name="Отдел Б",
+        subdivision_full_name="Отдел Б",
+        offenders=[offender, offender],
+    )
+    result = CompareService().compare(extracted_event, [matched, unmatched], 0.8, 30)
+
+    assert result["primary_match_id"] == "1"
+    assert result["matches"][0]["offenders"] == [offender.display_name()]
+
+
+def test_compare_skips_offenders_that_cannot_change_primary():
+    offender = Offender(first_name="Иван", middle_name=None, last_name="Иванов")
+    extracted_event = ExtractedEvent(
+        paragraph_index=0,
+        raw_text="Текст",
+        timestamp=datetime(2024, 1, 1, 12, 0),
+        timestamp_has_time=True,
+        timestamp_text="01.01.2024 12:00",
+        subdivision_text="Отдел А",
+        subdivision_name="Отдел А",
+        subdivision_similarity=0.9,
+        offenders=[offender],
+    )
+    candidates = [
+        PortalEvent(
+            event_id=str(minutes),
+            date_detection=datetime(2024, 1, 1, 12, minutes),
+            subdivision_name="Отдел А",
+            subdivision_short_name="Отдел А",
+            subdivision_full_name="Отдел А",
+            offenders=[offender],
+        )
+        for minutes in (0, 5, 10)
+    ]
+    far_away = PortalEvent(
+        event_id="far",
+        date_detection=datetime(2024, 1, 5, 12, 0),
+        subdivision_name="Отдел Б",
+        subdivision_short_name="Отдел Б",
+        subdivision_full_name="Отдел Б",
+        offenders=[offender],
+    )
+    service = CompareService()
+
+    result = service.compare(extracted_event, [*candidates, far_away], 0.8, 30)
+
+    assert result["primary_match_id"] == "0"
+    assert result["duplicates_count"] == 3
+    assert service.offender_evaluations == {"evaluated": 1, "skipped": 3}
+
+
+def test_locate_span_falls_back_to_text_search():
+    text = "ПОГЗ №2 задержан Тестов"
+
+    assert locate_span(text, "Тестов", (17, 23)) == (17, 23)
+    assert locate_span(text, "Тестов", (0, 6)) == (17, 23)
+    assert locate_span(text, "Петров", None) is None
+    assert locate_span(text, None, (0, 6)) is None
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+
+from apps.analysis.services.embedding_cache import CachedEncoder, EmbeddingCache
+from apps.analysis.services.semantic import embedding_namespace
+
+
+class CountingModel:
+    def __init__(self) -> None:
+        self.encoded: list[list[str]] = []
+
+    def encode(self, texts, normalize_embeddings=False):
+        self.encoded.append(list(texts))
+        vectors = np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+        if normalize_embeddings:
+            vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+def test_cached_encoder_encodes_each_text_once():
+    model = CountingModel()
+    encoder = CachedEncoder(model, "model:torch", EmbeddingCache(max_entries=100))
+
+    first = encoder.encode(["ПЗ-2", "ОПК Центральное"], normalize_embeddings=True)
+    second = encoder.encode(["ПЗ-2", "ПЗ-2", "ПОГЗ №5"], normalize_embeddings=True)
+
+    assert model.encoded == [["ПЗ-2", "ОПК Центральное"], ["ПОГЗ №5"]]
+    assert np.allclose(first[0], second[0])
+    assert second.shape == (3, 2)
+
+
+def test_cached_encoder_keeps_single_text_shape_and_normalize_flag():
+    model = CountingModel()
+    encoder = CachedEncoder(model, "model:torch", EmbeddingCache(max_entries=100))
+
+    raw = encoder.encode("ПЗ-2")
+    normalized = encoder.encode("ПЗ-2", normalize_embeddings=True)
+
+    assert raw.shape == (2,)
+    assert np.allclose(raw, [4.0, 1.0])
+    assert np.isclose(np.linalg.norm(normalized), 1.0)
+    assert len(model.encoded) == 2
+
+
+def test_embedding_cache_evicts_least_recently_used():
+    cache = EmbeddingCache(max_entries=2)
+    encoder = CachedEncoder(CountingModel(), "model:torch", cache)
+
+    encoder.encode(["a", "b"])
+    encoder.encode(["a"])
+    encoder.encode(["c"])
+
+    assert set(cache.get_many("model:torch", ["a", "b", "c"], False)) == {"a", "c"}
+
+
+def test_embedding_cache_stats_since_reports_hit_rate():
+    cache = EmbeddingCache(max_entries=10)
+    encoder = CachedEncoder(CountingModel(), "model:torch", cache)
+    before = cache.stats()
+
+    encoder.encode(["a", "b"])
+    encoder.encode(["a", "b"])
+
+    stats = cache.stats_since(before)
+    assert stats["misses"] == 2
+    assert stats["local_hits"] == 2
+    assert stats["hit_rate"] == 0.5
+
+
+def test_shared_tier_reuses_embeddings_between_processes(fake_redis):
+    shared = fake_redis
+    first_cache = EmbeddingCache(max_entries=10)
+    first_cache.client = shared
+    second_cache = EmbeddingCache(max_entries=10)
+    second_cache.client = shared
+    first_model = CountingModel()
+    second_model = CountingModel()
+
+    CachedEncoder(first_model, "model:torch", first_cache).encode(["ПЗ-2"])
+    vector = CachedEncoder(second_model, "model:torch", second_cache).encode("ПЗ-2")
+
+    assert second_model.encoded == []
+    assert np.allclose(vector, [4.0, 1.0])
+    assert second_cache.stats()["shared_hits"] == 1
+
+
+def test_namespace_changes_with_model_revision_path_and_quantization(monkeypatch, tmp_path):
+    lock_file = tmp_path / "model_lock.json"
+    monkeypatch.setenv("SEMANTIC_MODEL_LOCK_FILE", str(lock_file))
+    monkeypatch.setenv("SEMANTIC_MODEL_BACKEND", "onnx")
+    monkeypatch.delenv("SEMANTIC_MODEL_PATH", raising=False)
+    monkeypatch.delenv("SEMANTIC_MODEL_ONNX_QUANTIZE", raising=False)
+    namespaces = []
+    for revision in ("aaa", "bbb"):
+        lock_file.write_text(json.dumps({"models": [{"repo_id": "org/model", "revision": revision}]}))
+        namespaces.append(embedding_namespace("org/model"))
+    monkeypatch.setenv("SEMANTIC_MODEL_PATH", str(tmp_path))
+    namespaces.append(embedding_namespace("org/model"))
+    monkeypatch.setenv("SEMANTIC_MODEL_ONNX_QUANTIZE", "true")
+    namespaces.append(embedding_namespace("org/model"))
+
+    assert len(set(namespaces)) == 4
+    assert namespaces[0].startswith("org/model:onnx:")
+    assert namespaces[3].startswith("org/model:onnx-int8:")
@@ -182,6 +182,22 @@ def test_extract_subdivision_window_trims_noise():
     assert result.subdivision_text == "службой ПЗ-2"
 
 
+def test_extract_reports_character_spans():
+    service = ExtractService()
+    text = (
+        "В 10.00 31.01.2026 произошло происшествие подразделения ПЗ-1 "
+        "при участии Иванов Иван Иванович, 10.05.1991 г.р., по адресу."
+    )
+
+    result = service.extract(text)
+
+    assert text[slice(*result.timestamp_span)] == result.timestamp_text
+    assert text[slice(*result.subdivision_span)] == result.subdivision_text
+    offender = result.offenders[0]
+    assert offender.span is not None
+    assert text[slice(*offender.span)] == offender.raw
+
+
 def test_extract_date_then_time_with_colon():
     service = ExtractService()
     text = "02.02.2026 в 15:05 произошло событие."
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+from datetime import timedelta
+import io
+import uuid
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.analysis import jobs
+from apps.analysis.models import AnalysisFact, AnalysisItem, AnalysisJob
+from apps.analysis.services.analytics import aggregate
+from apps.analysis.services.history import JobHistory, load_job_data
+from apps.analysis.services.result_store import ResultStore
+from apps.core.models import AppUser
+
+
+def _result(count: int) -> dict:
+    return {
+        "items": [
+            {"paragraph_index": index, "event_found": index % 2 == 0, "text": f"Абзац {index}"}
+            for index in range(count)
+        ],
+        "metrics": {"paragraphs": count},
+    }
+
+
+@pytest.fixture
+def history(settings) -> JobHistory:
+    settings.RESULT_PERSIST = True
+    return JobHistory()
+
+
+@pytest.mark.django_db
+def test_save_and_load_result_round_trip(history) -> None:
+    job_id = str(uuid.uuid4())
+
+    assert history.save(job_id, _result(3), owner="ivanov", filename="svodka.docx")
+    assert history.save(job_id, _result(3), owner="ivanov")
+
+    job = AnalysisJob.objects.get(id=job_id)
+    assert (job.owner, job.filename, job.paragraphs, job.events_found) == (
+        "ivanov",
+        "svodka.docx",
+        3,
+        2,
+    )
+    assert history.load_result(job_id) == _result(3)
+    assert history.load_result(str(uuid.uuid4())) is None
+
+
+@pytest.mark.django_db
+def test_load_job_data_falls_back_to_history_and_warms_redis(history, fake_redis) -> None:
+    job_id = str(uuid.uuid4())
+    history.save(job_id, _result(2))
+    store = ResultStore()
+
+    data = load_job_data(store, job_id)
+
+    assert data["status"] == "done"
+    assert data["result"]["items"] == _result(2)["items"]
+    assert store.get(job_id)["result"] == data["result"]
+
+
+@pytest.mark.django_db
+def test_purge_removes_jobs_past_retention(history) -> None:
+    old_id, fresh_id = str(uuid.uuid4()), str(uuid.uuid4())
+    history.save(old_id, _result(2))
+    history.save(fresh_id, _result(1))
+    AnalysisJob.objects.filter(id=old_id).update(finished_at=timezone.now() - timedelta(days=40))
+
+    assert history.purge(30) == (1, 2)
+    assert list(AnalysisJob.objects.values_list("id", flat=True)) == [uuid.UUID(fresh_id)]
+    assert AnalysisItem.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_history_page_shows_own_jobs_paginated(client, history, settings) -> None:
+    settings.HISTORY_PAGE_SIZE = 2
+    for index in range(3):
+        history.save(str(uuid.uuid4()), _result(1), owner="ivanov", filename=f"own_{index}.docx")
+    history.save(str(uuid.uuid4()), _result(1), owner="petrov", filename="other.docx")
+    client.force_login(AppUser.objects.create_user("ivanov", "secret"))
+
+    first = client.get("/history")
+    second = client.get("/history?page=2")
+
+    assert first.context["page"].paginator.count == 3
+    assert len(first.context["page"].object_list) == 2
+    assert len(second.context["page"].object_list) == 1
+    assert "other.docx" not in first.content.decode() + second.content.decode()
+
+
+def _matched_item(index: int, subdivision: str, offenders_status: str) -> dict:
+    return {
+        "paragraph_index": index,
+        "event_found": True,
+        "primary_match_id": "e1",
+        "primary_match": {"time_delta": 4.0},
+        "matches": [{"event_id": "e1", "subdivision_name": subdivision}],
+        "attributes": {
+            "timestamp": {"status": "!", "percent": None},
+            "subdivision": {"status": "+", "percent": 100.0, "value": subdivision},
+            "offenders": {"status": offenders_status, "percent": 50.0},
+        },
+        "event_type": {"stored": "Нарушение режима", "detected": None, "status": "stored_only"},
+    }
+
+
+@pytest.mark.django_db
+def test_facts_are_written_with_the_job_and_aggregated_in_sql(history) -> None:
+    items = [
+        _matched_item(0, "ПУ Север", "+"),
+        _matched_item(1, "ПУ Север", "-"),
+        _matched_item(2, "ПУ Юг", "+"),
+        {"paragraph_index": 3, "event_found": False, "attributes": {}},
+    ]
+    history.save(str(uuid.uuid4()), {"items": items, "metrics": {}}, owner="ivanov")
+
+    rows = {row["key"]: row for row in aggregate("subdivision")}
+
+    assert AnalysisFact.objects.count() == 4
+    assert rows["ПУ Север"]["found"] == 2
+    assert rows["ПУ Север"]["mismatched"] == 1
+    assert rows["ПУ Север"]["mismatch_rate"] == 50.0
+    assert rows["ПУ Север"]["avg_time_delta"] == 4.0
+    assert rows["ПУ Юг"]["mismatch_rate"] == 0.0
+    assert rows[""]["found"] == 0
+    assert rows[""]["mismatch_rate"] is None
+    by_day = list(aggregate("day", since=timezone.now().date()))
+    assert [row["paragraphs"] for row in by_day] == [4]
+
+    out = io.StringIO()
+    call_command("analytics_report", "--by", "event_type", "--format", "csv", stdout=out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("key,paragraphs,found,mismatched,mismatch_rate")
+    assert lines[1].startswith("не определено,1,0,0,,")
+    assert lines[2].startswith("Нарушение режима,3,3,1,33.3")
+
+
+@pytest.mark.django_db
+def test_cancelled_job_is_not_restored_from_history(history, fake_redis, monkeypatch) -> None:
+    monkeypatch.setattr(jobs.analyze_docx.app.control, "revoke", lambda task_id: None)
+    job_id = str(uuid.uuid4())
+    history.save(job_id, _result(2), owner="ivanov")
+
+    jobs.cancel_job(job_id)
+
+    assert load_job_data(ResultStore(), job_id)["status"] is None
+    assert not AnalysisJob.objects.filter(id=job_id).exists()
+    assert not AnalysisFact.objects.filter(job_id=job_id).exists()
+
+
+@pytest.mark.django_db
+def test_history_fallback_serves_only_the_owners_jobs(client, history, fake_redis) -> None:
+    job_id = str(uuid.uuid4())
+    history.save(job_id, _result(1), owner="petrov")
+    client.force_login(AppUser.objects.create_user("ivanov", "secret"))
+
+    assert client.get(f"/jobs/{job_id}/export.json").status_code == 404
+    assert client.get(f"/jobs/{job_id}/result").context["data"]["result"] is None
+    assert ResultStore().get(job_id)["status"] is None
+
+    client.force_login(AppUser.objects.create_user("boss", "secret", is_superuser=True))
+    assert client.get(f"/jobs/{job_id}/export.json").status_code == 200
+
+
+@pytest.mark.django_db
+def test_only_the_owner_can_clear_a_job(client, history, fake_redis, monkeypatch) -> None:
+    monkeypatch.setattr(jobs.analyze_docx.app.control, "revoke", lambda task_id: None)
+    live_job, stored_job = str(uuid.uuid4()), str(uuid.uuid4())
+    ResultStore().create_job(live_job, owner="petrov")
+    history.save(stored_job, _result(1), owner="petrov")
+    client.force_login(AppUser.objects.create_user("ivanov", "secret"))
+
+    assert client.get(f"/jobs/{live_job}/clear").status_code == 405
+    assert client.post(f"/jobs/{live_job}/clear").status_code == 404
+    assert client.post(f"/jobs/{stored_job}/clear").status_code == 404
+    assert ResultStore().get(live_job)["status"] == "pending"
+    assert AnalysisJob.objects.filter(id=stored_job).exists()
+
+    client.force_login(AppUser.objects.create_user("petrov", "secret"))
+    assert client.post(f"/jobs/{live_job}/clear").status_code == 302
+    assert client.post(f"/jobs/{stored_job}/clear").status_code == 302
+    assert ResultStore().is_cancelled(live_job)
+    assert not AnalysisJob.objects.filter(id=stored_job).exists()
@@ -0,0 +1,36 @@
+from apps.analysis.services import inference_threads
+
+
+def test_auto_threads_split_cpus_between_workers(monkeypatch, settings):
+    monkeypatch.setattr(inference_threads, "_cpu_count", lambda: 8)
+    settings.TORCH_INTRA_OP_THREADS = 0
+    settings.TORCH_INTER_OP_THREADS = 0
+
+    config = inference_threads.resolve_thread_config(concurrency=4)
+
+    assert config.intra_op_threads == 2
+    assert config.inter_op_threads == 1
+    assert config.auto is True
+
+
+def test_auto_threads_never_drop_below_one(monkeypatch, settings):
+    monkeypatch.setattr(inference_threads, "_cpu_count", lambda: 2)
+    settings.TORCH_INTRA_OP_THREADS = 0
+
+    config = inference_threads.resolve_thread_config(concurrency=6)
+
+    assert config.intra_op_threads == 1
+
+
+def test_explicit_threads_override_auto(monkeypatch, settings):
+    monkeypatch.setattr(inference_threads, "_cpu_count", lambda: 16)
+    settings.TORCH_INTRA_OP_THREADS = 3
+    settings.TORCH_INTER_OP_THREADS = 2
+    settings.CELERY_WORKER_CONCURRENCY = 2
+
+    config = inference_threads.resolve_thread_config()
+
+    assert config.intra_op_threads == 3
+    assert config.inter_op_threads == 2
+    assert config.worker_concurrency == 2
+    assert config.auto is False
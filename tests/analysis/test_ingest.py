@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import io
+import zipfile
+
+from docx import Document
+import pytest
+
+from apps.analysis.services.ingest import (
+    IngestService,
+    UnsupportedFormatError,
+    detect_format,
+    detect_upload,
+    rtf_to_text,
+    text_paragraphs,
+)
+
+RTF_SAMPLE = (
+    b"{\\rtf1\\ansi\\ansicpg1251{\\fonttbl{\\f0 Times New Roman;}}{\\*\\generator Writer;}"
+    b"\\f0 \\'c2 12.00 31.01.2026 \\u1055?\\u1047?-1\\par\\par "
+    b"\\'c8\\'e2\\'e0\\'ed\\'ee\\'e2 \\'c8.\\'c8.\\tab 1991\\par}"
+)
+
+
+def _docx_bytes(paragraphs: list[str]) -> bytes:
+    document = Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def test_detect_format_sniffs_content_not_extension() -> None:
+    assert detect_format(_docx_bytes(["x"])[:512]).name == "docx"
+    assert detect_format(b"  " + RTF_SAMPLE[:64]).name == "rtf"
+    assert detect_format("Сводка".encode("cp1251")).name == "txt"
+    assert detect_format("Сводка".encode("utf-8")[:-1]).name == "txt"
+    assert detect_format(b"\x00\x01\x02") is None
+    assert detect_format(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n1 0 obj") is None
+    assert detect_format(b"\xff\xd8\xff\xe0\x10JFIF\x01\x01") is None
+    assert detect_format(b"\xc0\xc1\x05\x8a\x1b\xee\x7f\x02") is None
+    assert detect_format("Сводка\tза\r\nсутки\f".encode("cp1251")).name == "txt"
+
+
+def test_detect_upload_accepts_only_zip_archives_that_are_docx() -> None:
+    other_zip = io.BytesIO()
+    with zipfile.ZipFile(other_zip, "w") as archive:
+        archive.writestr("xl/workbook.xml", "<workbook/>")
+    source = io.BytesIO(_docx_bytes(["Абзац"]))
+
+    assert detect_upload(source).name == "docx"
+    assert source.tell() == 0
+    for data in (other_zip.getvalue(), b"PK\x03\x04 truncated archive"):
+        with pytest.raises(UnsupportedFormatError):
+            detect_upload(io.BytesIO(data))
+
+
+def test_text_paragraphs_split_on_blank_lines_or_lines() -> None:
+    assert text_paragraphs("Первый\nабзац\r\n\r\nВторой\n") == ["Первый абзац", "Второй"]
+    assert text_paragraphs("Первый\nВторой\n") == ["Первый", "Второй"]
+
+
+def test_rtf_to_text_decodes_codepage_and_unicode_escapes() -> None:
+    assert text_paragraphs(rtf_to_text(RTF_SAMPLE), per_line=True) == [
+        "В 12.00 31.01.2026 ПЗ-1",
+        "Иванов И.И. 1991",
+    ]
+
+
+def test_ingest_service_reads_each_format(tmp_path) -> None:
+    service = IngestService()
+    docx_path = tmp_path / "upload"
+    docx_path.write_bytes(_docx_bytes(["Абзац 1", " ", "Абзац 2"]))
+    txt_path = tmp_path / "summary.docx"
+    txt_path.write_bytes("Абзац 1\n\nАбзац 2".encode("cp1251"))
+
+    assert service.read_paragraphs(docx_path) == ["Абзац 1", "Абзац 2"]
+    assert service.read_paragraphs(txt_path) == ["Абзац 1", "Абзац 2"]
+    assert service.read_bytes(RTF_SAMPLE)[0] == "В 12.00 31.01.2026 ПЗ-1"
+    assert service.timings.summary()["ingest"]["calls"] == 3
+    with pytest.raises(UnsupportedFormatError):
+        service.read_bytes(b"\x00binary")
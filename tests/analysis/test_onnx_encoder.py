@@ -0,0 +1,108 @@
+import fcntl
+import os
+
+import numpy as np
+import pytest
+
+from apps.analysis.services import semantic
+from apps.analysis.services.onnx_encoder import OnnxSentenceEncoder, onnx_export_dir
+
+
+class FakeTokenizer:
+    def __call__(self, texts, **kwargs):
+        lengths = [len(text.split()) for text in texts]
+        width = max(lengths)
+        input_ids = np.zeros((len(texts), width), dtype=np.int64)
+        attention_mask = np.zeros((len(texts), width), dtype=np.int64)
+        for row, length in enumerate(lengths):
+            input_ids[row, :length] = np.arange(1, length + 1)
+            attention_mask[row, :length] = 1
+        return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def run(self, _outputs, feed):
+        self.calls += 1
+        input_ids = feed["input_ids"].astype(np.float32)
+        # Padding positions get a large value so a wrong mask would skew the mean.
+        hidden = np.where(feed["attention_mask"] == 1, input_ids, 100.0)
+        return [np.stack([hidden, np.ones_like(hidden)], axis=-1)]
+
+
+def _encoder() -> OnnxSentenceEncoder:
+    return OnnxSentenceEncoder(
+        session=FakeSession(),
+        tokenizer=FakeTokenizer(),
+        input_names=["input_ids", "attention_mask"],
+    )
+
+
+def test_onnx_encoder_mean_pooling_ignores_padding():
+    embeddings = _encoder().encode(["а б в", "а"])
+
+    assert embeddings.shape == (2, 2)
+    assert np.allclose(embeddings[0], [2.0, 1.0])
+    assert np.allclose(embeddings[1], [1.0, 1.0])
+
+
+def test_onnx_encoder_normalizes_and_keeps_single_text_shape():
+    encoder = _encoder()
+
+    single = encoder.encode("а б в", normalize_embeddings=True)
+    batch = encoder.encode(["а б в"], normalize_embeddings=True)
+
+    assert single.shape == (2,)
+    assert np.isclose(np.linalg.norm(single), 1.0)
+    assert np.allclose(single, batch[0])
+
+
+def test_onnx_encoder_splits_batches():
+    encoder = _encoder()
+
+    embeddings = encoder.encode(["а"] * 5, batch_size=2)
+
+    assert embeddings.shape == (5, 2)
+    assert encoder.session.calls == 3
+
+
+def test_load_semantic_model_uses_onnx_backend(monkeypatch, tmp_path):
+    export_dirs = []
+
+    def fake_from_directory(export_dir, quantize, *args, **kwargs):
+        export_dirs.append((export_dir, quantize))
+        return _encoder()
+
+    monkeypatch.setenv("SEMANTIC_MODEL_BACKEND", "onnx")
+    monkeypatch.setenv("SEMANTIC_MODEL_ONNX_QUANTIZE", "true")
+    monkeypatch.setenv("SEMANTIC_MODEL_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("SEMANTIC_MODEL_LOCK_FILE", str(tmp_path / "missing.json"))
+    monkeypatch.setattr(semantic, "export_is_ready", lambda *_: True)
+    monkeypatch.setattr(semantic.OnnxSentenceEncoder, "from_directory", fake_from_directory)
+
+    model = semantic.load_semantic_model("org/model")
+
+    assert isinstance(model, OnnxSentenceEncoder)
+    assert export_dirs == [(onnx_export_dir(tmp_path, "org/model", None), True)]
+
+
+def test_onnx_export_lock_survives_dead_holders_and_never_runs_unlocked(tmp_path):
+    export_dir = tmp_path / "model"
+    lock_path = tmp_path / "model.lock"
+    # A lock file left by a crashed process holds no lock.
+    lock_path.touch()
+
+    with semantic._onnx_export_lock(export_dir, timeout=0):
+        holder = os.open(lock_path, os.O_RDWR)
+        with pytest.raises(BlockingIOError):
+            fcntl.flock(holder, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    fcntl.flock(holder, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    try:
+        with pytest.raises(TimeoutError):
+            with semantic._onnx_export_lock(export_dir, timeout=0):
+                pass
+    finally:
+        os.close(holder)
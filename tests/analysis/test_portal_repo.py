@@ -0,0 +1,92 @@
+from contextlib import contextmanager
+from datetime import datetime
+import json
+
+from apps.analysis.dto import ExtractedEvent, LazyOffenders, Offender
+from apps.analysis.services import portal_repo
+from apps.analysis.services.compare import CompareService
+
+
+class FakeCursor:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+
+    def execute(self, *_args, **_kwargs) -> None:
+        return None
+
+    def fetchall(self):
+        return self.rows
+
+
+def _payload(last_name: str) -> str:
+    return json.dumps(
+        [
+            {"last_name": last_name, "first_name": "Иван", "middle_name": "Иванович"},
+            {"last_name": last_name, "first_name": "Иван", "middle_name": "Иванович"},
+        ],
+        ensure_ascii=False,
+    )
+
+
+def _fetch(monkeypatch, rows):
+    @contextmanager
+    def cursor():
+        yield FakeCursor(rows)
+
+    class FakeConnection:
+        def cursor(self):
+            return cursor()
+
+    monkeypatch.setattr(portal_repo, "connections", {"portal": FakeConnection()})
+    monkeypatch.setattr(portal_repo, "get_portal_query", lambda _name: "SELECT 1")
+    return portal_repo.PortalRepository().fetch_candidates(datetime(2024, 1, 1, 12, 0), 30)
+
+
+def test_fetch_candidates_interns_names_and_defers_offender_parsing(monkeypatch):
+    # Separate str objects, as a DB driver would return them per row.
+    rows = [
+        (
+            index,
+            datetime(2024, 1, 1, 12, index),
+            10,
+            "".join(["ПОГЗ №2 ", "(с. Васильки)"]),
+            _payload(last_name),
+            "".join(["Незаконный ", "переход"]),
+        )
+        for index, last_name in enumerate(["Иванов", "Петров"])
+    ]
+    assert rows[0][3] is not rows[1][3]
+
+    events = _fetch(monkeypatch, rows)
+
+    assert events[0].subdivision_name is events[1].subdivision_name
+    assert events[0].event_type_name is events[1].event_type_name
+    assert isinstance(events[0].offenders, LazyOffenders)
+    assert not events[0].offenders.parsed
+    assert [offender.last_name for offender in events[0].offenders] == ["Иванов"]
+    assert events[0].offenders.parsed
+
+
+def test_compare_skips_offender_parsing_for_rejected_candidates(monkeypatch):
+    rows = [
+        (1, datetime(2024, 1, 1, 12, 0), 10, "Отдел А", _payload("Иванов"), None),
+        (2, datetime(2024, 1, 3, 12, 0), 11, "Отдел Б", _payload("Иванов"), None),
+    ]
+    events = _fetch(monkeypatch, rows)
+    extracted = ExtractedEvent(
+        paragraph_index=0,
+        raw_text="Текст",
+        timestamp=datetime(2024, 1, 1, 12, 0),
+        timestamp_has_time=True,
+        timestamp_text="01.01.2024 12:00",
+        subdivision_text="Отдел А",
+        subdivision_name="Отдел А",
+        subdivision_similarity=0.9,
+        offenders=[Offender(first_name="Иван", middle_name="Иванович", last_name="Иванов")],
+    )
+
+    result = CompareService().compare(extracted, events, 0.8, 30)
+
+    assert result["primary_match_id"] == "1"
+    assert result["attributes"]["offenders"]["status"] == "+"
+    assert not events[1].offenders.parsed
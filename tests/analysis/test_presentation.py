@@ -0,0 +1,119 @@
+from apps.analysis.services.presentation import highlight_spans, render_item
+
+
+def test_highlight_spans_escapes_and_wraps_in_order():
+    text = "12:00 <ПЗ-1> Иванов"
+
+    html = highlight_spans(text, [((13, 19), "-"), ((0, 5), "+"), ((6, 12), "!")])
+
+    assert html == (
+        '<span class="highlight highlight-plus">12:00</span> '
+        '<span class="highlight highlight-warn">&lt;ПЗ-1&gt;</span> '
+        '<span class="highlight highlight-fail">Иванов</span>'
+    )
+
+
+def test_highlight_spans_does_not_nest_overlaps():
+    text = "ПЗ-1 Иванов Иван"
+
+    html = highlight_spans(text, [((5, 11), "-"), ((0, 11), "+"), ((8, 16), "!"), ((0, 4), None)])
+
+    assert html.count("<span") == 2
+    assert html == (
+        '<span class="highlight highlight-plus">ПЗ-1 Иванов</span>'
+        '<span class="highlight highlight-warn"> Иван</span>'
+    )
+
+
+def _stored_item(**overrides):
+    item = {
+        "extracted": {
+            "paragraph_index": 0,
+            "raw_text": "12:00 ПЗ-1 Иванов Иван",
+            "subdivision_text": "ПЗ-1",
+            "offenders": ["Иванов Иван"],
+            "spans": {"timestamp": [0, 5], "subdivision": [6, 10], "offenders": [[11, 22]]},
+        },
+        "attributes": {
+            "timestamp": {"status": "+"},
+            "subdivision": {"status": "!"},
+            "offenders": {"status": "-", "percent": 0.0, "diff": {"extra": ["иванов иван"]}},
+        },
+        "event_found": True,
+        "duplicates_count": 2,
+        "primary_match_id": "42",
+        "primary_match": {
+            "time_match": True,
+            "subdivision_match": True,
+            "offenders_match": False,
+            "time_delta": 4.4,
+        },
+        "offenders_overlap": {"matched": 0, "total": 1},
+        "subdivision_below_threshold": False,
+        "matches": [{"event_id": "42", "offenders": ["Петров Петр"]}],
+        "event_type": {"detected": None, "stored": None, "status": "none"},
+    }
+    item.update(overrides)
+    return item
+
+
+def test_render_item_builds_html_and_explanation_from_facts():
+    rendered = render_item(_stored_item())
+
+    assert rendered["highlighted_text"] == (
+        '<span class="highlight highlight-plus">12:00</span> '
+        '<span class="highlight highlight-warn">ПЗ-1</span> '
+        '<span class="highlight highlight-fail">Иванов Иван</span>'
+    )
+    assert rendered["match_lines"] == [
+        "Определено по: time, subdivision",
+        "Δt: 4 мин",
+        "Нарушители в БД портала (event_id=42): Петров Петр",
+    ]
+    assert rendered["notes"] == [
+        "Нарушители в сводке: Иванов Иван",
+        "Совпадение нарушителей: 0.0% (совпало 0 из 1)",
+        "Возможная ошибка внесения нарушителей в БД (0% совпадения)",
+        "Лишние в извлечении: иванов иван",
+    ]
+    assert rendered["explanation"] == rendered["match_lines"] + rendered["notes"]
+    assert rendered["message"] == "Найдено несколько записей: 2"
+    assert rendered["event_type"]["message"] == "Не удалось идентифицировать"
+
+
+def test_render_item_keeps_items_rendered_by_worker():
+    legacy = {"highlighted_text": "<b>x</b>", "notes": ["old"], "match_lines": []}
+
+    assert render_item(legacy) is legacy
+
+
+def test_render_item_words_attribute_facts_and_keeps_legacy_sentences():
+    attributes = {
+        "timestamp": {"status": "!", "value": "2024-01-01 00:00", "time_missing": True},
+        "subdivision": {"status": "-", "percent": 0.0, "value": None},
+        "offenders": {
+            "status": "!",
+            "value": "Иванов Иван",
+            "diff": {
+                "mismatch": [
+                    {
+                        "name": "иванов иван",
+                        "status": "missing_portal",
+                        "extracted_dob": "1991",
+                        "stored_dobs": [],
+                    },
+                    "петров петр: в сводке ДР не указана",
+                ]
+            },
+        },
+    }
+
+    rendered = render_item(_stored_item(attributes=attributes))
+
+    assert rendered["attributes"]["timestamp"]["value"] == "2024-01-01 00:00 (время отсутствует)"
+    assert rendered["attributes"]["subdivision"]["value"] == "не определено"
+    assert "иванов иван: в БД ДР не указана; петров петр: в сводке ДР не указана" in (
+        rendered["notes"]
+    )
+    empty = render_item(_stored_item(attributes={"offenders": {"status": None, "value": None}}))
+    assert empty["attributes"]["offenders"]["value"] == "не указаны/не обнаружены"
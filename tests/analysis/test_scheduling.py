@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from apps.analysis.services.result_store import ResultStore
+from apps.analysis.services.scheduling import LARGE_QUEUE, SMALL_QUEUE, JobScheduler, queue_for
+
+
+@pytest.fixture
+def scheduler(settings, fake_redis) -> JobScheduler:
+    settings.ANALYSIS_USER_MAX_RUNNING = 1
+    return JobScheduler(ResultStore())
+
+
+def test_queue_for_routes_by_paragraph_count(settings) -> None:
+    settings.ANALYSIS_LARGE_JOB_PARAGRAPHS = 300
+
+    assert queue_for(20) == SMALL_QUEUE
+    assert queue_for(300) == SMALL_QUEUE
+    assert queue_for(2000) == LARGE_QUEUE
+
+
+def test_queue_position_advances_as_jobs_start(scheduler) -> None:
+    for job_id in ("a", "b", "c"):
+        scheduler.store.create_job(job_id)
+        scheduler.enqueue(job_id, SMALL_QUEUE)
+
+    assert [scheduler.queue_info(job_id)["position"] for job_id in "abc"] == [1, 2, 3]
+
+    assert scheduler.acquire("a")
+    info = scheduler.queue_info("a")
+    assert info["position"] is None
+    assert info["wait_seconds"] >= 0
+    assert scheduler.queue_info("c")["position"] == 2
+    assert scheduler.queue_info("missing") is None
+
+
+def test_per_user_cap_defers_until_a_slot_is_released(scheduler) -> None:
+    for job_id, owner in (("a", "ivanov"), ("b", "ivanov"), ("c", "petrov")):
+        scheduler.store.create_job(job_id, owner=owner)
+        scheduler.enqueue(job_id, SMALL_QUEUE)
+
+    assert scheduler.acquire("a")
+    assert not scheduler.acquire("b")
+    assert scheduler.acquire("c")
+    assert scheduler.queue_info("b")["position"] == 1
+
+    scheduler.release("a")
+    assert scheduler.acquire("b")
+    scheduler.release("b")
+    scheduler.release("c")
+    assert scheduler.client.zcard("running:ivanov") == 0
+
+
+def test_leaked_slot_expires_despite_deferred_retries(scheduler) -> None:
+    for job_id in ("a", "b"):
+        scheduler.store.create_job(job_id, owner="ivanov")
+        scheduler.enqueue(job_id, SMALL_QUEUE)
+    scheduler.running_ttl = 0.05
+    # "a" keeps its slot, as if its worker was killed before releasing it.
+    assert scheduler.acquire("a")
+    assert not scheduler.acquire("b")
+
+    time.sleep(0.06)
+
+    assert scheduler.acquire("b")
+    assert scheduler.acquire("a") is False
+
+
+def test_redelivered_job_reuses_its_own_slot(scheduler) -> None:
+    scheduler.store.create_job("a", owner="ivanov")
+    scheduler.enqueue("a", SMALL_QUEUE)
+
+    assert scheduler.acquire("a")
+    assert JobScheduler(scheduler.store).acquire("a")
+    assert scheduler.client.zcard("running:ivanov") == 1
+
+
+def test_cancelled_and_redelivered_jobs_do_not_skew_positions(scheduler) -> None:
+    for job_id in ("a", "b", "c", "d"):
+        scheduler.store.create_job(job_id)
+        scheduler.enqueue(job_id, SMALL_QUEUE)
+
+    assert scheduler.dequeue("b")
+    assert scheduler.acquire("a")
+    scheduler.release("a")
+    # A task redelivered after its worker died starts the same job again.
+    assert scheduler.acquire("a")
+
+    assert scheduler.queue_info("c")["position"] == 1
+    assert scheduler.queue_info("d")["position"] == 2
+
+    scheduler.enqueue("c", LARGE_QUEUE)
+    assert scheduler.queue_info("d")["position"] == 1
+    moved = scheduler.queue_info("c")
+    assert (moved["queue"], moved["position"]) == (LARGE_QUEUE, 1)
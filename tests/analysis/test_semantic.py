@@ -1,3 +1,5 @@
+from types import SimpleNamespace
+
 import numpy as np
 from apps.analysis.services import semantic
 
@@ -198,3 +200,121 @@ def test_match_glued_subdivision_code(monkeypatch):
     result = service.match("службой ПЗ1 при патрулировании выявлен ...")
 
     assert result.subdivision is sub_one
+
+
+def test_build_number_index_maps_numbers_to_rows():
+    index = semantic.build_number_index(
+        ["Пограничная застава №2", "ПЗ-12", "ПОГЗ №2 (с. Васильки)", "ОПК Центральное"]
+    )
+
+    assert index["2"] == frozenset({0, 2})
+    assert index["12"] == frozenset({1})
+    assert "1" not in index
+
+
+def test_match_number_filter_uses_whole_numbers(monkeypatch):
+    class NumberModel:
+        def encode(self, text, **kwargs):
+            if isinstance(text, list):
+                return np.array([[0.0] for _ in text])
+            return np.array([0.0])
+
+    monkeypatch.setattr(semantic, "SentenceTransformer", lambda _: NumberModel())
+    monkeypatch.setattr(semantic.util, "cos_sim", lambda _, embedding: float(embedding[0]))
+
+    class DummySubdivision:
+        def __init__(self, short_name: str, full_name: str) -> None:
+            self.short_name = short_name
+            self.full_name = full_name
+            self.aliases = []
+
+    sub_two = DummySubdivision("ПЗ-2", "Пограничная застава №2")
+    sub_twelve = DummySubdivision("ПЗ-12", "Пограничная застава №12")
+
+    semantic.SubdivisionSemanticService._cached_subdivisions = [sub_two, sub_twelve]
+    semantic.SubdivisionSemanticService._cached_embeddings = np.array([[0.1], [0.9]])
+    semantic.SubdivisionSemanticService._cached_embedding_entries = [sub_two, sub_twelve]
+    semantic.SubdivisionSemanticService._cached_embedding_texts = [
+        "Пограничная застава №2",
+        "Пограничная застава №12",
+    ]
+    semantic.SubdivisionSemanticService._cached_normalized_entries = []
+
+    service = semantic.SubdivisionSemanticService("dummy-model")
+    result = service.match("ПЗ №2")
+
+    assert result.subdivision is sub_two
+    assert result.similarity == 0.1
+
+
+def test_reload_encodes_only_new_texts_and_swaps_index(monkeypatch):
+    encoded: list[str] = []
+
+    class CountingModel:
+        def encode(self, text, **kwargs):
+            texts = text if isinstance(text, list) else [text]
+            encoded.extend(texts)
+            return np.array([[float(len(item))] for item in texts])
+
+    monkeypatch.setattr(semantic, "SentenceTransformer", lambda _: CountingModel())
+    monkeypatch.setattr(semantic, "subdivisions_version", lambda: "v1")
+
+    class DummySubdivision:
+        def __init__(self, short_name: str, full_name: str, aliases: list[str]) -> None:
+            self.short_name = short_name
+            self.full_name = full_name
+            self.aliases = aliases
+
+    old = DummySubdivision("ПЗ-1", "Пограничная застава №1", [])
+    service_cls = semantic.SubdivisionSemanticService
+    monkeypatch.setattr(service_cls, "_cached_subdivisions", [old])
+    monkeypatch.setattr(service_cls, "_cached_embeddings", np.array([[4.0], [22.0]]))
+    monkeypatch.setattr(service_cls, "_cached_embedding_entries", [old, old])
+    monkeypatch.setattr(service_cls, "_cached_embedding_texts", [old.short_name, old.full_name])
+    monkeypatch.setattr(service_cls, "_cached_normalized_entries", None)
+    monkeypatch.setattr(service_cls, "_cached_number_index", None)
+    monkeypatch.setattr(service_cls, "_cached_number_index_texts", None)
+    monkeypatch.setattr(service_cls, "_cached_version", "v1")
+    monkeypatch.setattr(service_cls, "_version_checked_at", None)
+
+    service = service_cls("dummy-model")
+    encoded.clear()
+    updated = DummySubdivision("ПЗ-1", "Пограничная застава №1", ["первая застава"])
+
+    class Objects:
+        @staticmethod
+        def all():
+            return [updated]
+
+    monkeypatch.setattr(semantic.SubdivisionRef, "objects", Objects)
+
+    assert service._reload("v2") == 1
+    assert encoded == ["первая застава"]
+    assert service_cls._cached_version == "v2"
+    assert service_cls._cached_embedding_texts == [
+        "ПЗ-1",
+        "Пограничная застава №1",
+        "первая застава",
+    ]
+    assert service_cls._cached_embeddings.shape == (3, 1)
+    assert service.match("Первая застава").subdivision is updated
+
+
+def test_stale_version_starts_background_reload(monkeypatch, settings):
+    settings.SUBDIVISION_VERSION_CHECK_SECONDS = 30
+    service_cls = semantic.SubdivisionSemanticService
+    service = object.__new__(service_cls)
+    reloaded: list[str] = []
+    monkeypatch.setattr(service_cls, "_reload", lambda self, version: reloaded.append(version))
+    monkeypatch.setattr(semantic, "connection", SimpleNamespace(close=lambda: None))
+    monkeypatch.setattr(semantic, "subdivisions_version", lambda: "v2")
+    monkeypatch.setattr(service_cls, "_cached_version", "v1")
+    monkeypatch.setattr(service_cls, "_version_checked_at", None)
+    monkeypatch.setattr(service_cls, "_reload_thread", None)
+
+    service._refresh_if_stale()
+    service_cls._reload_thread.join(timeout=5)
+    # Checked again within the interval: no second reload.
+    service._refresh_if_stale()
+
+    assert reloaded == ["v2"]
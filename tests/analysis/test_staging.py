@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from apps.analysis.services.staging import UploadStaging, UploadTooLargeError
+
+
+@pytest.fixture
+def staging(settings, tmp_path, fake_redis) -> UploadStaging:
+    settings.UPLOAD_STAGING_BACKEND = "auto"
+    settings.UPLOAD_STAGING_DIR = str(tmp_path / "uploads")
+    settings.UPLOAD_MAX_BYTES = 100
+    settings.UPLOAD_STAGING_REDIS_MAX_BYTES = 10
+    return UploadStaging()
+
+
+def test_large_or_unsized_uploads_are_streamed_to_the_shared_directory(staging) -> None:
+    ref = staging.stage("job-1", iter([b"abc", b"def"]))
+
+    assert ref == f"file:{staging.root / 'job-1.upload'}"
+    assert staging.read(ref) == b"abcdef"
+    assert not (staging.root / "job-1.part").exists()
+
+    staging.discard(ref)
+    assert not (staging.root / "job-1.upload").exists()
+
+
+def test_small_uploads_go_to_redis(staging) -> None:
+    ref = staging.stage("job-2", iter([b"abc", b"def"]), size=6)
+
+    assert ref == "redis:upload:job-2"
+    assert staging.read(ref) == b"abcdef"
+
+    staging.discard(ref)
+    with pytest.raises(FileNotFoundError):
+        staging.read(ref)
+
+
+def test_oversized_uploads_are_rejected_while_streaming(staging) -> None:
+    with pytest.raises(UploadTooLargeError):
+        staging.stage("job-3", iter([b"x" * 60, b"x" * 60]))
+
+    assert list(staging.root.iterdir()) == []
+    with pytest.raises(UploadTooLargeError):
+        staging.stage("job-3", iter([]), size=101)
+
+
+def test_bare_paths_are_read_but_never_discarded(staging, tmp_path) -> None:
+    source = tmp_path / "summary.txt"
+    source.write_bytes(b"text")
+
+    assert staging.read(str(source)) == b"text"
+    staging.discard(str(source))
+    assert source.exists()
+
+
+def test_purge_stale_removes_only_old_files(staging) -> None:
+    old_ref = staging.stage("old", iter([b"a"]))
+    staging.stage("fresh", iter([b"b"]))
+    old_path = staging.root / "old.upload"
+    stale = time.time() - 3600
+    os.utime(old_path, (stale, stale))
+
+    assert staging.purge_stale(max_age_seconds=60) == 1
+    assert not old_path.exists()
+    assert (staging.root / "fresh.upload").exists()
+    assert old_ref.startswith("file:")
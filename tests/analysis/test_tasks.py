@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from apps.analysis import tasks
+from apps.analysis.services.result_store import ResultStore
+from apps.analysis.services.staging import UploadStaging
+
+
+class StubPipeline:
+    processed: list[int] = []
+    on_process = None
+
+    def __init__(self, timings=None) -> None:
+        self.match_service = SimpleNamespace(
+            compare_service=SimpleNamespace(offender_evaluations={})
+        )
+
+    def process(self, index: int, paragraph: str) -> dict:
+        StubPipeline.processed.append(index)
+        if StubPipeline.on_process is not None:
+            StubPipeline.on_process(index)
+        return {"paragraph_index": index, "text": paragraph}
+
+
+@pytest.fixture
+def redis_client(monkeypatch, settings, fake_redis):
+    settings.ANALYSIS_CHUNK_PARAGRAPHS = 2
+    monkeypatch.setattr(tasks, "AnalysisPipeline", StubPipeline)
+    StubPipeline.processed = []
+    StubPipeline.on_process = None
+    return fake_redis
+
+
+class WorkerLost(BaseException):
+    """Stands in for a killed worker: no ``except Exception`` handler sees it."""
+
+
+def _paragraphs(count: int):
+    return lambda timings: [f"Абзац {index}" for index in range(count)]
+
+
+def test_run_analysis_stores_result(redis_client) -> None:
+    ResultStore().create_job("job")
+
+    tasks.run_analysis("job", _paragraphs(5))
+
+    data = ResultStore().get("job")
+    assert data["status"] == "done"
+    assert [item["paragraph_index"] for item in data["result"]["items"]] == [0, 1, 2, 3, 4]
+
+
+def test_cancel_stops_at_next_chunk_and_leaves_no_result(redis_client) -> None:
+    store = ResultStore()
+    store.create_job("job")
+    StubPipeline.on_process = lambda index: index == 0 and store.cancel("job")
+
+    tasks.run_analysis("job", _paragraphs(10))
+
+    assert StubPipeline.processed == [0, 1]
+    assert store.get("job")["status"] is None
+    assert store.is_cancelled("job")
+
+
+def test_cancelled_job_never_starts(redis_client) -> None:
+    store = ResultStore()
+    store.create_job("job")
+    store.cancel("job")
+
+    tasks.run_analysis("job", _paragraphs(3))
+
+    assert StubPipeline.processed == []
+    assert redis_client.hgetall("job") == {}
+
+
+def test_rerun_after_crash_resumes_from_checkpoints(redis_client) -> None:
+    store = ResultStore()
+    store.create_job("job")
+
+    def crash(index: int) -> None:
+        if index == 3:
+            raise WorkerLost
+
+    StubPipeline.on_process = crash
+    with pytest.raises(WorkerLost):
+        tasks.run_analysis("job", _paragraphs(5))
+
+    StubPipeline.processed = []
+    StubPipeline.on_process = None
+    tasks.run_analysis("job", _paragraphs(5))
+
+    data = store.get("job")
+    assert StubPipeline.processed == [2, 3, 4]
+    assert [item["paragraph_index"] for item in data["result"]["items"]] == [0, 1, 2, 3, 4]
+    assert data["result"]["metrics"]["resumed_paragraphs"] == 2
+    assert redis_client.hgetall("checkpoint:job") == {}
+
+
+def test_job_fails_after_too_many_deliveries(redis_client, settings) -> None:
+    settings.ANALYSIS_MAX_DELIVERIES = 2
+    store = ResultStore()
+    store.create_job("job")
+
+    def crash(index: int) -> None:
+        raise WorkerLost
+
+    StubPipeline.on_process = crash
+    for _delivery in range(2):
+        with pytest.raises(WorkerLost):
+            tasks.run_analysis("job", _paragraphs(3))
+
+    StubPipeline.processed = []
+    tasks.run_analysis("job", _paragraphs(3))
+
+    assert StubPipeline.processed == []
+    assert store.get("job")["status"] == "failed"
+    assert store.job_meta("job")["deliveries"] == "3"
+
+
+def test_error_marks_job_failed_and_drops_checkpoints(redis_client) -> None:
+    store = ResultStore()
+    store.create_job("job")
+
+    def fail(index: int) -> None:
+        if index == 3:
+            raise RuntimeError("broken paragraph")
+
+    StubPipeline.on_process = fail
+    with pytest.raises(RuntimeError):
+        tasks.run_analysis("job", _paragraphs(5))
+
+    assert store.get("job")["status"] == "failed"
+    assert redis_client.hgetall("checkpoint:job") == {}
+
+
+def test_checkpoints_from_another_chunk_size_are_ignored(redis_client, settings) -> None:
+    store = ResultStore()
+    store.save_chunk("job", 5, 0, [{"paragraph_index": 0}])
+
+    assert store.load_chunks("job", 2) == {}
+    assert store.load_chunks("job", 5) == {0: [{"paragraph_index": 0}]}
+
+
+def test_upload_read_is_timed_as_its_own_stage(redis_client, settings, tmp_path) -> None:
+    settings.UPLOAD_STAGING_BACKEND = "filesystem"
+    settings.UPLOAD_STAGING_DIR = str(tmp_path)
+    ResultStore().create_job("job")
+    upload_ref = UploadStaging().stage("job", ["Абзац 1\nАбзац 2".encode("utf-8")])
+
+    tasks.analyze_docx.run("job", upload_ref)
+
+    stages = ResultStore().get("job")["result"]["metrics"]["stages"]
+    assert list(stages)[:2] == ["staging", "ingest"]
@@ -0,0 +1,55 @@
+import json
+import logging
+
+from apps.analysis.services.timings import StageTimings, log_job_metrics, percentile
+
+
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_stage_timings_summary_orders_pipeline_stages():
+    timings = StageTimings()
+    timings.record("compare", 0.004, items=200)
+    timings.record("ner", 0.010)
+    timings.record("ner", 0.030)
+    timings.record("custom", 0.001)
+
+    summary = timings.summary()
+
+    assert list(summary) == ["ner", "compare", "custom"]
+    assert summary["ner"]["calls"] == 2
+    assert summary["ner"]["total_ms"] == 40.0
+    assert summary["ner"]["p50_ms"] == 10.0
+    assert summary["ner"]["max_ms"] == 30.0
+    assert summary["compare"]["items"] == 200
+
+
+def test_stage_context_manager_records_on_error():
+    timings = StageTimings()
+
+    try:
+        with timings.stage("portal_query"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    assert timings.summary()["portal_query"]["calls"] == 1
+
+
+def test_log_job_metrics_emits_json_lines(caplog):
+    timings = StageTimings()
+    timings.record("ingest", 0.002, items=3)
+    metrics = {"paragraphs": 3, "stages": timings.summary()}
+
+    with caplog.at_level(logging.INFO, logger="apps.analysis.metrics"):
+        log_job_metrics("job-1", metrics)
+
+    lines = [json.loads(record.getMessage()) for record in caplog.records]
+    assert lines[0]["event"] == "job_stage"
+    assert lines[0]["stage"] == "ingest"
+    assert lines[-1] == {"event": "job_metrics", "job_id": "job-1", "paragraphs": 3}
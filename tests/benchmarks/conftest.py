@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+from django.conf import settings
+
+from apps.analysis.dto import ExtractedEvent, Offender, PortalEvent
+from apps.analysis.services import semantic
+from apps.analysis.services.extract import ExtractService
+from apps.core.management.portal_seed import build_local_portal_seed
+from apps.core.management.synthetic_summaries import (
+    build_synthetic_summary,
+    load_subdivision_aliases,
+)
+
+BASE_DIR = Path(settings.BASE_DIR)
+
+
+class StubEncoder:
+    """Deterministic trigram-hash vectors: no model download, realistic cosine work."""
+
+    dimensions = 64
+
+    def encode(self, sentences, normalize_embeddings: bool = False, **_kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            padded = f"  {text.lower()} "
+            for position in range(len(padded) - 2):
+                digest = hashlib.blake2b(padded[position : position + 3].encode(), digest_size=2)
+                vectors[row, int.from_bytes(digest.digest(), "little") % self.dimensions] += 1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1.0, norms)
+        return vectors[0] if single else vectors
+
+
+@dataclass
+class StubSubdivision:
+    short_name: str
+    full_name: str
+    aliases: list[str] = field(default_factory=list)
+
+
+@pytest.fixture(scope="session")
+def summary_paragraphs() -> list[str]:
+    return build_synthetic_summary(
+        50, BASE_DIR / "configs" / "divisions.yaml", BASE_DIR / "fixtures" / "text"
+    )
+
+
+@pytest.fixture(scope="session")
+def extract_service() -> ExtractService:
+    return ExtractService()
+
+
+@pytest.fixture
+def subdivision_service(monkeypatch) -> semantic.SubdivisionSemanticService:
+    aliases = load_subdivision_aliases(BASE_DIR / "configs" / "divisions.yaml")
+    subdivisions, _events, _docx = build_local_portal_seed(6)
+    refs = [
+        StubSubdivision(
+            short_name=subdivision.fullname.split(" (")[0],
+            full_name=subdivision.fullname,
+            aliases=aliases.get(subdivision.id, []),
+        )
+        for subdivision in subdivisions
+    ]
+    service_cls = semantic.SubdivisionSemanticService
+    for name in (
+        "_cached_embeddings",
+        "_cached_embedding_entries",
+        "_cached_embedding_texts",
+        "_cached_normalized_entries",
+        "_cached_number_index",
+        "_cached_number_index_texts",
+    ):
+        monkeypatch.setattr(service_cls, name, None)
+    monkeypatch.setattr(service_cls, "_cached_subdivisions", refs)
+    monkeypatch.setattr(semantic, "load_semantic_model", lambda *_args, **_kwargs: StubEncoder())
+    return service_cls("stub-model")
+
+
+def _offender(index: int) -> Offender:
+    return Offender(
+        first_name="Иван",
+        middle_name="Иванович",
+        last_name=f"Иванов{index}",
+        date_of_birth=date(1980 + index % 20, 1 + index % 12, 1 + index % 28),
+    )
+
+
+@pytest.fixture
+def compare_inputs() -> tuple[ExtractedEvent, list[PortalEvent]]:
+    timestamp = datetime(2024, 1, 10, 12, 0)
+    extracted = ExtractedEvent(
+        paragraph_index=0,
+        raw_text="10.01.2024 12:00 службой ПОГЗ №2 выявлены: Иванов3 Иван Иванович",
+        timestamp=timestamp,
+        timestamp_has_time=True,
+        timestamp_text="10.01.2024 12:00",
+        subdivision_text="ПОГЗ №2",
+        subdivision_name="ПОГЗ №2 (с. Васильки)",
+        subdivision_similarity=0.92,
+        offenders=[_offender(3), _offender(7)],
+    )
+    candidates = [
+        PortalEvent(
+            event_id=str(index),
+            date_detection=timestamp + timedelta(minutes=(index % 40) - 20),
+            subdivision_name="ПОГЗ №2 (с. Васильки)" if index % 5 == 0 else "ОПК «Центральное»",
+            subdivision_short_name=None,
+            subdivision_full_name=None,
+            offenders=[_offender(index), _offender(index + 1)],
+            event_type_name="Незаконный переход",
+        )
+        for index in range(200)
+    ]
+    return extracted, candidates
+
+
+@pytest.fixture
+def offenders_payload() -> str:
+    import json
+
+    return json.dumps(
+        [
+            {
+                "last_name": f"Петров{index}",
+                "first_name": "Петр",
+                "middle_name": "Петрович",
+                "birth_date": f"19{60 + index % 40}-0{1 + index % 9}-1{index % 10}",
+                "birth_year": 1960 + index % 40,
+            }
+            for index in range(20)
+        ],
+        ensure_ascii=False,
+    )
@@ -0,0 +1,74 @@
+from apps.analysis.services.compare import CompareService, locate_span
+from apps.analysis.services.portal_repo import PortalRepository
+from apps.analysis.services.presentation import highlight_spans
+from apps.analysis.services.semantic import generate_candidates, normalize_subdivision
+
+SUBDIVISION_TEXTS = [
+    "службой ПОГЗ №2 (с. Васильки)",
+    "на посту ОПК «Центральное» (г. Южный)",
+    "в районе ПОГК «Северная» (пгт Северный)",
+    "ПЗ-1",
+    "пограничная застава в с. Васильки",
+]
+
+
+def test_bench_extract(benchmark, extract_service, summary_paragraphs):
+    paragraphs = summary_paragraphs[:10]
+
+    results = benchmark(lambda: [extract_service.extract(paragraph) for paragraph in paragraphs])
+
+    assert any(result.timestamp for result in results)
+
+
+def test_bench_normalize_subdivision(benchmark):
+    results = benchmark(lambda: [normalize_subdivision(text) for text in SUBDIVISION_TEXTS])
+
+    assert all(results)
+
+
+def test_bench_generate_candidates(benchmark, summary_paragraphs):
+    paragraphs = [paragraph[:200] for paragraph in summary_paragraphs[:20]]
+
+    results = benchmark(lambda: [generate_candidates(paragraph) for paragraph in paragraphs])
+
+    assert all(results)
+
+
+def test_bench_subdivision_match(benchmark, subdivision_service):
+    results = benchmark(lambda: [subdivision_service.match(text) for text in SUBDIVISION_TEXTS])
+
+    assert all(result.subdivision is not None for result in results)
+
+
+def test_bench_compare_200_candidates(benchmark, compare_inputs):
+    extracted, candidates = compare_inputs
+    service = CompareService()
+
+    result = benchmark(service.compare, extracted, candidates, 0.78, 30)
+
+    assert result["primary_match_id"] is not None
+
+
+def test_bench_highlight_spans(benchmark, summary_paragraphs):
+    raw_text = " ".join(summary_paragraphs[:5])
+    highlights = [
+        (locate_span(raw_text, text, None), status)
+        for text, status in (
+            (summary_paragraphs[0][:16], "+"),
+            ("ПОГЗ №2", "!"),
+            ("Тестов1", "-"),
+            ("Тест", "+"),
+        )
+    ]
+
+    html = benchmark(highlight_spans, raw_text, highlights)
+
+    assert "highlight" in html
+
+
+def test_bench_parse_offenders(benchmark, offenders_payload):
+    repository = PortalRepository()
+
+    offenders = benchmark(repository._parse_offenders, offenders_payload)
+
+    assert len(offenders) == 20
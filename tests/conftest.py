@@ -0,0 +1,191 @@
+import importlib.util
+
+import pytest
+import redis
+
+from apps.analysis.services.embedding_cache import reset_embedding_cache
+
+# Benchmarks need the pytest-benchmark plugin; skip collecting them without it.
+collect_ignore_glob = (
+    [] if importlib.util.find_spec("pytest_benchmark") else ["benchmarks/*"]
+)
+
+
+class FakeRedis:
+    """In-memory stand-in for the binary (``decode_responses=False``) redis-py client.
+
+    Keys may hold strings, hashes or sorted sets; values come back as bytes and
+    return values follow redis-py. Expiry is accepted but not simulated.
+    """
+
+    def __init__(self) -> None:
+        self.data: dict[str, object] = {}
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def _typed(self, key: str, kind: type, create: bool = False):
+        value = self.data.get(key)
+        if value is None:
+            if not create:
+                return None
+            value = self.data[key] = kind()
+        if not isinstance(value, kind):
+            raise redis.ResponseError(
+                "WRONGTYPE Operation against a key holding the wrong kind of value"
+            )
+        return value
+
+    # Keys
+    def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if key in self.data)
+
+    def delete(self, *keys: str) -> int:
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def expire(self, key: str, ttl: int) -> bool:
+        return key in self.data
+
+    def ping(self) -> bool:
+        return True
+
+    # Strings
+    def get(self, key: str) -> bytes | None:
+        return self._typed(key, bytes)
+
+    def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self.get(key) for key in keys]
+
+    def set(
+        self, key: str, value, ex: int | None = None, nx: bool = False, xx: bool = False
+    ) -> bool | None:
+        if (nx and key in self.data) or (xx and key not in self.data):
+            return None
+        self.data[key] = self._encode(value)
+        return True
+
+    def append(self, key: str, value) -> int:
+        current = self._typed(key, bytes) or b""
+        self.data[key] = current + self._encode(value)
+        return len(self.data[key])
+
+    def incr(self, key: str, amount: int = 1) -> int:
+        value = int(self._typed(key, bytes) or 0) + amount
+        self.data[key] = self._encode(value)
+        return value
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        return self.incr(key, -amount)
+
+    # Hashes
+    def hset(self, key: str, field=None, value=None, mapping: dict | None = None) -> int:
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        fields = self._typed(key, dict, create=True)
+        added = 0
+        for name, item in items.items():
+            added += self._encode(name) not in fields
+            fields[self._encode(name)] = self._encode(item)
+        return added
+
+    def hget(self, key: str, field) -> bytes | None:
+        return (self._typed(key, dict) or {}).get(self._encode(field))
+
+    def hgetall(self, key: str) -> dict[bytes, bytes]:
+        return dict(self._typed(key, dict) or {})
+
+    def hdel(self, key: str, *fields) -> int:
+        hash_ = self._typed(key, dict) or {}
+        removed = sum(1 for field in fields if hash_.pop(self._encode(field), None) is not None)
+        if key in self.data and not hash_:
+            del self.data[key]
+        return removed
+
+    def hincrby(self, key: str, field, amount: int = 1) -> int:
+        fields = self._typed(key, dict, create=True)
+        value = int(fields.get(self._encode(field), 0)) + amount
+        fields[self._encode(field)] = self._encode(value)
+        return value
+
+    # Sorted sets
+    def zadd(self, key: str, mapping: dict, nx: bool = False) -> int:
+        members = self._typed(key, dict, create=True)
+        added = 0
+        for member, score in mapping.items():
+            name = self._encode(member)
+            if name in members and nx:
+                continue
+            added += name not in members
+            members[name] = float(score)
+        return added
+
+    def zrem(self, key: str, *members) -> int:
+        zset = self._typed(key, dict) or {}
+        removed = sum(1 for member in members if zset.pop(self._encode(member), None) is not None)
+        if key in self.data and not zset:
+            del self.data[key]
+        return removed
+
+    def zremrangebyscore(self, key: str, min_score, max_score) -> int:
+        zset = self._typed(key, dict) or {}
+        low, high = float(min_score), float(max_score)
+        stale = [member for member, score in zset.items() if low <= score <= high]
+        for member in stale:
+            del zset[member]
+        if key in self.data and not zset:
+            del self.data[key]
+        return len(stale)
+
+    def zrank(self, key: str, member) -> int | None:
+        zset = self._typed(key, dict) or {}
+        name = self._encode(member)
+        if name not in zset:
+            return None
+        return sorted(zset, key=lambda item: (zset[item], item)).index(name)
+
+    def zscore(self, key: str, member) -> float | None:
+        return (self._typed(key, dict) or {}).get(self._encode(member))
+
+    def zcard(self, key: str) -> int:
+        return len(self._typed(key, dict) or {})
+
+    # Lists
+    def llen(self, key: str) -> int:
+        return len(self._typed(key, list) or [])
+
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client: FakeRedis) -> None:
+        self.client = client
+        self.commands: list[tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs) -> "FakePipeline":
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self) -> list:
+        commands, self.commands = self.commands, []
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> FakeRedis:
+    """Every ``redis.Redis.from_url`` client in the test talks to one FakeRedis."""
+    client = FakeRedis()
+    monkeypatch.setattr(redis.Redis, "from_url", lambda *_args, **_kwargs: client)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def _isolate_embedding_cache():
+    reset_embedding_cache()
+    yield
+    reset_embedding_cache()
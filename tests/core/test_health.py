@@ -1,19 +1,10 @@
 import pytest
 
-from apps.core import views
-
-
-class DummyRedisClient:
-    def ping(self) -> bool:
-        return True
+from apps.analysis.services import inference_threads
 
 
 @pytest.mark.django_db
-def test_health_ok(client, monkeypatch, settings) -> None:
-    def dummy_from_url(*_args, **_kwargs) -> DummyRedisClient:
-        return DummyRedisClient()
-
-    monkeypatch.setattr(views.redis.Redis, "from_url", staticmethod(dummy_from_url))
+def test_health_ok(client, fake_redis, settings) -> None:
     settings.DATABASES = {"default": settings.DATABASES["default"]}
 
     response = client.get("/health")
@@ -22,3 +13,21 @@ def test_health_ok(client, monkeypatch, settings) -> None:
     payload = response.json()
     assert payload["ok"] is True
     assert payload["checks"]["db_default"]["ok"] is True
+
+
+@pytest.mark.django_db
+def test_health_reports_threads_published_by_workers(client, fake_redis, settings) -> None:
+    settings.DATABASES = {"default": settings.DATABASES["default"]}
+    settings.TORCH_INTRA_OP_THREADS = 2
+    config = inference_threads.resolve_thread_config(concurrency=4)
+    inference_threads.publish_thread_config("celery@worker-1", config)
+    settings.TORCH_INTRA_OP_THREADS = 8
+
+    threads = client.get("/health").json()["checks"]["semantic_model"]["threads"]
+
+    assert list(threads) == ["celery@worker-1"]
+    assert threads["celery@worker-1"]["intra_op_threads"] == 2
+    assert threads["celery@worker-1"]["worker_concurrency"] == 4
+
+    inference_threads.forget_worker_threads("celery@worker-1")
+    assert client.get("/health").json()["checks"]["semantic_model"]["threads"] == {}
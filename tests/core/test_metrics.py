@@ -0,0 +1,68 @@
+import redis
+
+from apps.analysis.services import metrics
+
+
+class DummyBrokerClient:
+    def llen(self, queue: str) -> int:
+        return {"small": 7}.get(queue, 0)
+
+
+def _sample(name: str, labels: dict[str, str] | None = None) -> float:
+    return metrics.REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+def test_metrics_endpoint_exposes_pipeline_and_queue_depth(client, monkeypatch) -> None:
+    monkeypatch.setattr(
+        metrics.redis.Redis, "from_url", staticmethod(lambda *_a, **_k: DummyBrokerClient())
+    )
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.content.decode()
+    assert 'analysis_queue_depth{queue="small"} 7.0' in body
+    assert "analysis_stage_duration_seconds" in body
+    assert "semantic_embedding_cache_lookups_total" in body
+
+
+def test_metrics_endpoint_survives_broker_outage(client, monkeypatch) -> None:
+    def broken_from_url(*_args, **_kwargs):
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(metrics.redis.Redis, "from_url", staticmethod(broken_from_url))
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "analysis_jobs_total" in response.content.decode()
+
+
+def test_metrics_endpoint_requires_token_when_configured(client, settings, monkeypatch) -> None:
+    monkeypatch.setattr(
+        metrics.redis.Redis, "from_url", staticmethod(lambda *_a, **_k: DummyBrokerClient())
+    )
+    settings.METRICS_TOKEN = "secret"
+
+    assert client.get("/metrics").status_code == 403
+    response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+    assert response.status_code == 200
+
+
+def test_observe_job_records_counts_and_stage_latency() -> None:
+    jobs_before = _sample("analysis_jobs_total", {"status": "success"})
+    paragraphs_before = _sample("analysis_paragraphs_total")
+    stage_before = _sample("analysis_stage_duration_seconds_count", {"stage": "compare"})
+
+    metrics.observe_job(
+        "success",
+        {"paragraphs": 4, "total_ms": 2000.0, "paragraphs_per_s": 2.0},
+        {"compare": [0.01, 0.02, 0.03]},
+    )
+
+    assert _sample("analysis_jobs_total", {"status": "success"}) == jobs_before + 1
+    assert _sample("analysis_paragraphs_total") == paragraphs_before + 4
+    assert (
+        _sample("analysis_stage_duration_seconds_count", {"stage": "compare"})
+        == stage_before + 3
+    )
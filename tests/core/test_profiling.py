@@ -0,0 +1,42 @@
+import time
+import tracemalloc
+
+from apps.core.management.profiling import StackSampler, write_allocation_report
+
+
+def _busy_loop(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    counter = 0
+    while time.perf_counter() < deadline:
+        counter += 1
+    return counter
+
+
+def test_stack_sampler_writes_folded_stacks(tmp_path) -> None:
+    with StackSampler(interval=0.001) as sampler:
+        _busy_loop(0.1)
+
+    path = tmp_path / "profile.folded"
+    samples = sampler.write_folded(path)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert samples > 0
+    assert any("_busy_loop (test_profiling.py" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_allocation_report_lists_top_sites(tmp_path) -> None:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    payload = [bytearray(1024) for _ in range(200)]
+    after = tracemalloc.take_snapshot()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    path = tmp_path / "allocations.txt"
+    write_allocation_report(path, before, after, peak, top=5)
+
+    report = path.read_text(encoding="utf-8")
+    assert len(payload) == 200
+    assert "Peak traced memory" in report
+    assert "test_profiling.py" in report
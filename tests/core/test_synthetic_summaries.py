@@ -0,0 +1,47 @@
+from pathlib import Path
+
+from django.conf import settings
+import yaml
+
+from apps.core.management.portal_seed import build_local_portal_seed
+from apps.core.management.synthetic_summaries import build_synthetic_summary
+
+
+def _build(paragraphs: int, seed: int = 0) -> list[str]:
+    base_dir = Path(settings.BASE_DIR)
+    return build_synthetic_summary(
+        paragraphs,
+        base_dir / "configs" / "divisions.yaml",
+        base_dir / "fixtures" / "text",
+        seed=seed,
+    )
+
+
+def test_synthetic_summary_has_requested_size_and_is_deterministic() -> None:
+    first = _build(50)
+
+    assert len(first) == 50
+    assert first == _build(50)
+    assert first != _build(50, seed=1)
+
+
+def test_synthetic_summary_paragraphs_carry_timestamp_and_offender() -> None:
+    paragraphs = _build(20)
+
+    rendered = [paragraph for paragraph in paragraphs if "Тестов" in paragraph]
+    assert rendered
+    assert all(paragraph[:2].isdigit() for paragraph in rendered)
+
+
+def test_portal_seed_reads_the_given_divisions_file(tmp_path) -> None:
+    base_dir = Path(settings.BASE_DIR)
+    data = yaml.safe_load((base_dir / "configs" / "divisions.yaml").read_text(encoding="utf-8"))
+    for pu_entry in data["pus"]:
+        for subdivision in pu_entry.get("subdivisions") or []:
+            subdivision["fullname"] = f"Отдел {subdivision['id']}"
+    divisions_path = tmp_path / "divisions.yaml"
+    divisions_path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+
+    _subdivisions, events, _docx = build_local_portal_seed(6, divisions_path)
+
+    assert all(event.subdivision_fullname == f"Отдел {event.subdivision_id}" for event in events)
@@ -0,0 +1,68 @@
+from io import StringIO
+
+import pytest
+import yaml
+from django.core.management import call_command
+
+from apps.reference.models import Pu, SubdivisionRef
+
+
+def _write_divisions(tmp_path, subdivisions, pu_name="ПУ-1"):
+    path = tmp_path / "divisions.yaml"
+    path.write_text(
+        yaml.safe_dump(
+            {"pus": [{"name": pu_name, "subdivisions": subdivisions}]}, allow_unicode=True
+        ),
+        encoding="utf-8",
+    )
+    return path
+
+
+def _subdivisions(count, aliases=None):
+    return [
+        {"code": f"C{index}", "type": "ПОГЗ", "number": index, "aliases": aliases or []}
+        for index in range(count)
+    ]
+
+
+def _sync(path, *args):
+    out = StringIO()
+    call_command("sync_divisions", "--file", str(path), *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db
+def test_sync_divisions_creates_updates_and_skips_unchanged(
+    tmp_path, django_assert_max_num_queries
+):
+    path = _write_divisions(tmp_path, _subdivisions(50))
+    with django_assert_max_num_queries(10):
+        output = _sync(path, "--batch-size", "20")
+
+    assert "Подразделений создано: 50, обновлено: 0, без изменений: 0" in output
+    assert SubdivisionRef.objects.count() == 50
+    assert SubdivisionRef.objects.get(code="C3").short_name == "ПОГЗ №3"
+
+    changed = _subdivisions(50)
+    changed[3]["aliases"] = ["ПЗ-3"]
+    changed.append({"type": "ОПК", "name": "Северное"})
+    path = _write_divisions(tmp_path, changed)
+    output = _sync(path)
+
+    assert "создано: 1, обновлено: 1, без изменений: 49" in output
+    assert SubdivisionRef.objects.get(code="C3").aliases == ["ПЗ-3"]
+    assert SubdivisionRef.objects.get(full_name="ОПК «Северное»").code is None
+    assert "создано: 0, обновлено: 0, без изменений: 51" in _sync(path)
+
+
+@pytest.mark.django_db
+def test_sync_divisions_dry_run_reports_without_writing(tmp_path):
+    path = _write_divisions(tmp_path, _subdivisions(3))
+
+    output = _sync(path, "--dry-run")
+
+    assert "Пробный запуск" in output
+    assert "ПУ создано: 1" in output
+    assert "Подразделений создано: 3" in output
+    assert not Pu.objects.exists()
+    assert not SubdivisionRef.objects.exists()
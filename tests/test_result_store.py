@@ -4,23 +4,19 @@ import json
 from datetime import date, datetime
 from uuid import UUID
 
-from apps.analysis.services.result_store import ResultStore
+import pytest
 
+from apps.analysis.services.result_store import RESULT_MAGIC, ResultStore
 
-class FakeRedis:
-    def __init__(self) -> None:
-        self.data: dict[str, dict[str, str]] = {}
 
-    def hset(self, key: str, mapping: dict[str, str]) -> None:
-        self.data.setdefault(key, {}).update(mapping)
-
-    def expire(self, key: str, ttl: int) -> None:
-        return None
+def _store(encoding: str = "msgpack") -> ResultStore:
+    store = ResultStore()
+    store.encoding = encoding
+    return store
 
 
-def test_set_result_serializes_datetime_date_uuid() -> None:
-    store = ResultStore()
-    store.client = FakeRedis()
+def test_set_result_serializes_datetime_date_uuid(fake_redis) -> None:
+    store = _store()
 
     payload = {
         "timestamp": datetime(2024, 1, 2, 3, 4, 5),
@@ -30,9 +26,40 @@ def test_set_result_serializes_datetime_date_uuid() -> None:
 
     store.set_result("job-1", payload)
 
-    stored_payload = store.client.data["job-1"]["result"]
+    stored_payload = store.client.data["job-1"][b"result"]
+    assert stored_payload.startswith(RESULT_MAGIC)
+    assert store.get("job-1") == {
+        "status": "done",
+        "progress": 100,
+        "result": {
+            "timestamp": "2024-01-02 03:04:05",
+            "day": "2024-01-02",
+            "identifier": "12345678-1234-5678-1234-567812345678",
+        },
+    }
+
+
+def test_json_encoding_and_legacy_results_stay_readable(fake_redis) -> None:
+    store = _store(encoding="json")
+    result = {"items": [{"extracted": {"raw_text": "Текст", "spans": {"timestamp": (0, 5)}}}]}
+
+    store.set_result("job-1", result)
+
+    stored_payload = store.client.data["job-1"][b"result"]
     assert json.loads(stored_payload) == {
-        "timestamp": "2024-01-02 03:04:05",
-        "day": "2024-01-02",
-        "identifier": "12345678-1234-5678-1234-567812345678",
+        "items": [{"extracted": {"raw_text": "Текст", "spans": {"timestamp": [0, 5]}}}]
     }
+    store.encoding = "msgpack"
+    assert store.get("job-1")["result"] == json.loads(stored_payload)
+
+
+def test_export_json_and_unknown_schema_version(fake_redis) -> None:
+    store = _store()
+    store.set_result("job-1", {"items": [{"event_found": True}], "metrics": {"paragraphs": 1}})
+
+    exported = store.export_json("job-1")
+
+    assert json.loads(exported) == {"items": [{"event_found": True}], "metrics": {"paragraphs": 1}}
+    assert store.export_json("missing") is None
+    with pytest.raises(ValueError):
+        ResultStore.decode_result(RESULT_MAGIC + bytes([99]) + b"")